@@ -0,0 +1,11 @@
+import os
+import sys
+
+# the compiler modules import each other by bare name (from _lexer import ...)
+PACKAGE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "the_supa_awesome_compiler",
+)
+
+if PACKAGE_DIR not in sys.path:
+    sys.path.insert(0, PACKAGE_DIR)
@@ -0,0 +1,43 @@
+import argparse
+import json
+
+
+def load_results(path: str) -> dict[tuple[str, int, str], dict]:
+    with open(path) as f:
+        report = json.load(f)
+
+    return {
+        (result["shape"], result["size"], phase): metrics
+        for result in report["results"]
+        for phase, metrics in result["phases"].items()
+    }
+
+
+def main() -> None:
+    argument_parser = argparse.ArgumentParser(
+        description="Compare two benchmarks.frontend result files."
+    )
+    argument_parser.add_argument("baseline")
+    argument_parser.add_argument("candidate")
+    arguments = argument_parser.parse_args()
+
+    baseline = load_results(arguments.baseline)
+    candidate = load_results(arguments.candidate)
+
+    print(
+        f"{'shape':<11} {'size':>8} {'phase':<8} {'base s':>10} {'new s':>10}"
+        f" {'speedup':>8} {'peak':>8}"
+    )
+    for key in sorted(baseline.keys() & candidate.keys()):
+        shape, size, phase = key
+        old, new = baseline[key], candidate[key]
+
+        print(
+            f"{shape:<11} {size:>8} {phase:<8} {old['seconds']:>10.4f}"
+            f" {new['seconds']:>10.4f} {old['seconds'] / new['seconds']:>7.2f}x"
+            f" {new['peak_bytes'] / old['peak_bytes']:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable
+
+from benchmarks import PACKAGE_DIR
+from benchmarks.generator import SHAPES, ProgramGenerator
+
+from _AST import Node, Program
+from _compiler import Compiler
+from _lexer import Lexer
+from _parser import Parser
+from _token_buffer import TokenBuffer
+
+
+DEFAULT_SIZES = (100, 1_000, 10_000)
+
+
+def count_nodes(root: Node) -> int:
+    count = 0
+    stack: list[Any] = [root]
+
+    while stack:
+        item = stack.pop()
+
+        if isinstance(item, Node):
+            count += 1
+            stack.extend(getattr(item, name) for name in type(item).__slots__)
+        elif isinstance(item, list):
+            stack.extend(item)
+
+    return count
+
+
+def best_time(run: Callable[[], Any], repeat: int) -> tuple[float, Any]:
+    best, result = float("inf"), None
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = run()
+        best = min(best, time.perf_counter() - start)
+
+    return best, result
+
+
+def peak_memory(run: Callable[[], Any]) -> int:
+    tracemalloc.start()
+    try:
+        run()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def lex(source: str) -> TokenBuffer:
+    return Lexer(source).tokenize()
+
+
+def parse(buffer: TokenBuffer) -> Program:
+    parser = Parser(buffer)
+    program = parser.parse_program()
+
+    if parser.errors:
+        raise RuntimeError(f"generated program does not parse: {parser.errors[:3]}")
+
+    return program
+
+
+def compile_program(program: Program, ssa: bool) -> Compiler:
+    compiler = Compiler(ssa=ssa)
+    compiler.compile(program)
+    return compiler
+
+
+def measure(
+    shape: str, size: int, seed: int, repeat: int, run_compiler: bool, ssa: bool
+):
+    source = ProgramGenerator(seed).generate(shape, size)
+
+    lex_seconds, tokens = best_time(lambda: lex(source), repeat)
+    parse_seconds, program = best_time(lambda: parse(tokens), repeat)
+
+    token_count = len(tokens)
+    node_count = count_nodes(program)
+
+    phases = {
+        "lex": {
+            "seconds": lex_seconds,
+            "tokens_per_second": token_count / lex_seconds,
+            "peak_bytes": peak_memory(lambda: lex(source)),
+        },
+        "parse": {
+            # over the lex phase's TokenBuffer, so lexing is not included
+            "seconds": parse_seconds,
+            "tokens_per_second": token_count / parse_seconds,
+            "nodes_per_second": node_count / parse_seconds,
+            "peak_bytes": peak_memory(lambda: parse(tokens)),
+        },
+    }
+
+    if run_compiler:
+        compile_seconds, _ = best_time(lambda: compile_program(program, ssa), repeat)
+        phases["compile"] = {
+            "seconds": compile_seconds,
+            "nodes_per_second": node_count / compile_seconds,
+            "peak_bytes": peak_memory(lambda: compile_program(program, ssa)),
+        }
+
+    return {
+        "shape": shape,
+        "size": size,
+        "seed": seed,
+        "bytes": len(source.encode()),
+        "tokens": token_count,
+        "nodes": node_count,
+        "phases": phases,
+    }
+
+
+def current_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=PACKAGE_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_row(result: dict) -> None:
+    phases = result["phases"]
+    columns = [
+        f"{result['shape']:<11}",
+        f"{result['size']:>8}",
+        f"{result['tokens']:>9} tok",
+        f"lex {phases['lex']['tokens_per_second']:>12,.0f} tok/s",
+        f"parse {phases['parse']['nodes_per_second']:>11,.0f} nodes/s",
+    ]
+    if "compile" in phases:
+        columns.append(
+            f"compile {phases['compile']['nodes_per_second']:>10,.0f} nodes/s"
+        )
+    columns.append(
+        f"peak {max(p['peak_bytes'] for p in phases.values()) / 1e6:>8.1f} MB"
+    )
+    print("  ".join(columns), flush=True)
+
+
+def main() -> None:
+    argument_parser = argparse.ArgumentParser(
+        description="Measure Lexer, Parser and Compiler throughput on generated programs."
+    )
+    argument_parser.add_argument("--shapes", nargs="+", choices=SHAPES, default=SHAPES)
+    argument_parser.add_argument(
+        "--sizes", nargs="+", type=int, default=list(DEFAULT_SIZES)
+    )
+    argument_parser.add_argument("--seed", type=int, default=0)
+    argument_parser.add_argument("--repeat", type=int, default=3)
+    argument_parser.add_argument("--no-compile", action="store_true")
+    argument_parser.add_argument(
+        "--ssa",
+        action="store_true",
+        help="compile variables to SSA form with phis instead of allocas",
+    )
+    argument_parser.add_argument(
+        "--output", help="write the results as JSON to this file"
+    )
+    arguments = argument_parser.parse_args()
+
+    # the parser and the compiler both recurse on the tree
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 10_000))
+
+    results = []
+    for shape in arguments.shapes:
+        for size in arguments.sizes:
+            result = measure(
+                shape,
+                size,
+                arguments.seed,
+                arguments.repeat,
+                not arguments.no_compile,
+                arguments.ssa,
+            )
+            print_row(result)
+            results.append(result)
+
+    if arguments.output:
+        report = {
+            "meta": {
+                "commit": current_commit(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "timestamp": time.time(),
+                "repeat": arguments.repeat,
+                "ssa": arguments.ssa,
+            },
+            "results": results,
+        }
+        with open(arguments.output, "w") as f:
+            json.dump(report, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
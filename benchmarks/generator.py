@@ -0,0 +1,208 @@
+import argparse
+import random
+from typing import Callable
+
+
+SHAPES = ("functions", "nested", "arithmetic", "arrays", "ranges")
+
+ARITHMETIC_OPERATORS = ("+", "-", "*", "/", "%", "^", "|", "&")
+COMPARISON_OPERATORS = ("<", ">", "<=", ">=", "==")
+
+
+def name_suffix(index: int) -> str:
+    # identifiers cannot contain digits, so number them in base 26 instead
+    suffix = ""
+
+    while True:
+        index, letter = divmod(index, 26)
+        suffix = chr(ord("a") + letter) + suffix
+        if not index:
+            return suffix
+
+
+class ProgramGenerator:
+    # Seeded generator for valid Marsh programs. Every program compiles with
+    # Compiler and has a main() -> int. The meaning of size depends on the
+    # shape: the number of functions, nesting levels, operators, array
+    # elements or for loops.
+    def __init__(self, seed: int = 0, chain: int = 64, depth: int = 24) -> None:
+        self.rng = random.Random(seed)
+
+        # operators per expression and nesting levels per function. Bigger
+        # programs repeat these units instead of growing them, the parser and
+        # the compiler both recurse on the tree.
+        self.chain = chain
+        self.depth = depth
+
+        self.__shapes: dict[str, Callable[[int], str]] = {
+            "functions": self.__functions,
+            "nested": self.__nested,
+            "arithmetic": self.__arithmetic,
+            "arrays": self.__arrays,
+            "ranges": self.__ranges,
+        }
+
+    def generate(self, shape: str, size: int) -> str:
+        return self.__shapes[shape](max(size, 1))
+
+    def __literal(self, low: int = 1, high: int = 99) -> str:
+        return str(self.rng.randint(low, high))
+
+    def __operand(self, names: list[str]) -> str:
+        roll = self.rng.random()
+
+        if roll < 0.45:
+            return self.rng.choice(names)
+        if roll < 0.9:
+            return self.__literal()
+        return f"({self.rng.choice(names)} + {self.__literal()})"
+
+    def __expression(self, names: list[str], operators: int) -> str:
+        parts = [self.__operand(names)]
+
+        for _ in range(operators):
+            operator = self.rng.choice(ARITHMETIC_OPERATORS)
+            # never divide by something that could be zero
+            operand = self.__literal() if operator in "/%" else self.__operand(names)
+            parts.append(f"{operator} {operand}")
+
+        return " ".join(parts)
+
+    def __condition(self, names: list[str]) -> str:
+        operator = self.rng.choice(COMPARISON_OPERATORS)
+        return f"{self.rng.choice(names)} {operator} {self.__literal()}"
+
+    def __functions(self, size: int) -> str:
+        functions = []
+
+        for index in range(size):
+            names = ["a", "b", "x"]
+            call = f"f_{name_suffix(index - 1)}(x, a)" if index else "x"
+
+            functions.append(
+                f"function f_{name_suffix(index)}(a: int, b: int) -> int{{\n"
+                f"    let x: int = {self.__expression(['a', 'b'], 3)};\n"
+                f"    if {self.__condition(names)}{{\n"
+                f"        x = {self.__expression(names, 2)};\n"
+                f"    }}\n"
+                f"    else{{\n"
+                f"        x = {self.__expression(names, 2)};\n"
+                f"    }}\n"
+                f"    return {call};\n"
+                f"}}\n"
+            )
+
+        functions.append(
+            f"function main() -> int{{\n"
+            f"    return f_{name_suffix(size - 1)}(1, 2);\n"
+            f"}}\n"
+        )
+        return "\n".join(functions)
+
+    def __nested_block(self, level: int, indent: str) -> str:
+        if level == self.depth:
+            return f"{indent}acc = {self.__expression(['acc', 'n'], 2)};\n"
+
+        inner = self.__nested_block(level + 1, indent + "    ")
+        counter = f"v_{name_suffix(level)}"
+
+        if level % 2:
+            return (
+                f"{indent}if {self.__condition(['acc', 'n'])}{{\n"
+                f"{inner}"
+                f"{indent}}}\n"
+                f"{indent}else{{\n"
+                f"{indent}    acc = acc + {self.__literal()};\n"
+                f"{indent}}}\n"
+            )
+
+        return (
+            f"{indent}let {counter}: int = 0;\n"
+            f"{indent}while {counter} < {self.__literal(2, 4)}{{\n"
+            f"{inner}"
+            f"{indent}    {counter} = {counter} + 1;\n"
+            f"{indent}}}\n"
+        )
+
+    def __nested(self, size: int) -> str:
+        functions = []
+        count = max(size // self.depth, 1)
+
+        for index in range(count):
+            functions.append(
+                f"function nest_{name_suffix(index)}(n: int) -> int{{\n"
+                f"    let acc: int = n;\n"
+                f"{self.__nested_block(0, '    ')}"
+                f"    return acc;\n"
+                f"}}\n"
+            )
+
+        functions.append("function main() -> int{\n    return nest_a(3);\n}\n")
+        return "\n".join(functions)
+
+    def __arithmetic(self, size: int) -> str:
+        statements = []
+        names = ["n"]
+
+        for index in range(max(size // self.chain, 1)):
+            name = f"e_{name_suffix(index)}"
+            statements.append(
+                f"    let {name}: int = {self.__expression(names, self.chain)};\n"
+            )
+            names.append(name)
+
+        return (
+            f"function chains(n: int) -> int{{\n"
+            f"{''.join(statements)}"
+            f"    return {names[-1]};\n"
+            f"}}\n\n"
+            f"function main() -> int{{\n    return chains(7);\n}}\n"
+        )
+
+    def __arrays(self, size: int) -> str:
+        values = ", ".join(self.__literal(0, 1 << 16) for _ in range(size))
+
+        return (
+            f"function lookup(i: int) -> int{{\n"
+            f"    let table: [int, {size}] = [{values}];\n"
+            f"    return table[i];\n"
+            f"}}\n\n"
+            f"function main() -> int{{\n    return lookup({size - 1});\n}}\n"
+        )
+
+    def __ranges(self, size: int) -> str:
+        loops = []
+
+        for index in range(size):
+            end = self.rng.randint(1_000, 1_000_000)
+            counter = f"i_{name_suffix(index)}"
+            loops.append(
+                f"    for {counter} in 0..{end}{{\n"
+                f"        total = total + {counter} % {self.__literal()};\n"
+                f"    }}\n"
+            )
+
+        return (
+            f"function loops() -> int{{\n"
+            f"    let total: int = 0;\n"
+            f"{''.join(loops)}"
+            f"    return total;\n"
+            f"}}\n\n"
+            f"function main() -> int{{\n    return loops();\n}}\n"
+        )
+
+
+def generate_program(shape: str, size: int, seed: int = 0) -> str:
+    return ProgramGenerator(seed).generate(shape, size)
+
+
+if __name__ == "__main__":
+    argument_parser = argparse.ArgumentParser(
+        description="Write a generated Marsh program to stdout."
+    )
+    argument_parser.add_argument("shape", choices=SHAPES)
+    argument_parser.add_argument("size", type=int)
+    argument_parser.add_argument("--seed", type=int, default=0)
+    arguments = argument_parser.parse_args()
+
+    print(generate_program(arguments.shape, arguments.size, arguments.seed))
@@ -0,0 +1,111 @@
+import argparse
+import json
+import platform
+import sys
+import time
+
+from benchmarks.frontend import best_time, count_nodes, current_commit, peak_memory
+from benchmarks.generator import SHAPES, ProgramGenerator
+
+from _lexer import Lexer
+from _parser import Parser
+from _token_buffer import TokenBuffer
+
+
+DEFAULT_SIZES = (1_000, 10_000, 50_000)
+
+
+def parse_buffer(buffer: TokenBuffer, hash_cons: bool = False):
+    parser = Parser(buffer, hash_cons=hash_cons)
+    program = parser.parse_program()
+
+    if parser.errors:
+        raise RuntimeError(f"generated program does not parse: {parser.errors[:3]}")
+
+    return program
+
+
+def measure(
+    shape: str, size: int, seed: int, repeat: int, hash_cons: bool = False
+) -> dict:
+    source = ProgramGenerator(seed).generate(shape, size)
+
+    # lexed once up front, so only the parser's own per-token work is timed
+    buffer = Lexer(source).tokenize()
+    seconds, program = best_time(lambda: parse_buffer(buffer, hash_cons), repeat)
+
+    token_count = len(buffer)
+
+    return {
+        "shape": shape,
+        "size": size,
+        "seed": seed,
+        "bytes": len(source.encode()),
+        "tokens": token_count,
+        "nodes": count_nodes(program),
+        "phases": {
+            "parse": {
+                "seconds": seconds,
+                "ns_per_token": seconds / token_count * 1e9,
+                "tokens_per_second": token_count / seconds,
+                "peak_bytes": peak_memory(lambda: parse_buffer(buffer, hash_cons)),
+            },
+        },
+    }
+
+
+def main() -> None:
+    argument_parser = argparse.ArgumentParser(
+        description="Measure the Parser alone on pre-lexed generated programs."
+    )
+    argument_parser.add_argument("--shapes", nargs="+", choices=SHAPES, default=SHAPES)
+    argument_parser.add_argument(
+        "--sizes", nargs="+", type=int, default=list(DEFAULT_SIZES)
+    )
+    argument_parser.add_argument("--seed", type=int, default=0)
+    argument_parser.add_argument("--repeat", type=int, default=5)
+    argument_parser.add_argument(
+        "--hash-cons",
+        action="store_true",
+        help="share structurally equal expressions while parsing",
+    )
+    argument_parser.add_argument(
+        "--output", help="write the results as JSON to this file"
+    )
+    arguments = argument_parser.parse_args()
+
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 10_000))
+
+    results = []
+    for shape in arguments.shapes:
+        for size in arguments.sizes:
+            result = measure(
+                shape, size, arguments.seed, arguments.repeat, arguments.hash_cons
+            )
+            parse = result["phases"]["parse"]
+            print(
+                f"{shape:<11} {size:>8} {result['tokens']:>9} tok"
+                f"  {parse['ns_per_token']:>8.0f} ns/tok"
+                f"  {parse['tokens_per_second']:>12,.0f} tok/s",
+                flush=True,
+            )
+            results.append(result)
+
+    if arguments.output:
+        report = {
+            "meta": {
+                "commit": current_commit(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "timestamp": time.time(),
+                "repeat": arguments.repeat,
+                "hash_cons": arguments.hash_cons,
+            },
+            "results": results,
+        }
+        with open(arguments.output, "w") as f:
+            json.dump(report, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+import io
+import os
+import re
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "the_supa_awesome_compiler"))
+
+from benchmarks.generator import SHAPES, generate_program  # noqa: E402
+
+from _AST import (  # noqa: E402
+    ArrayLiteral,
+    ExpressionStatement,
+    IntegerLiteral,
+    Node,
+    Program,
+    iter_child_nodes,
+)
+from _ast_arena import ASTArena, FORMAT_VERSION, HEADER  # noqa: E402
+from _lexer import Lexer  # noqa: E402
+from _parser import Parser  # noqa: E402
+from _symbols import SYMBOLS  # noqa: E402
+
+
+def sources() -> list[str]:
+    with open(os.path.join(ROOT, "README.md")) as f:
+        blocks = re.findall(r"```\n(.*?)```", f.read(), re.DOTALL)
+    texts = [block for block in blocks if block.lstrip().startswith("function")]
+
+    with open(os.path.join(ROOT, "tests", "func.marsh")) as f:
+        texts.append(f.read())
+
+    texts.extend(generate_program(shape, 8) for shape in SHAPES)
+
+    return texts
+
+
+def parse(text: str, hash_cons: bool = False) -> Program:
+    parser = Parser(Lexer(text), hash_cons=hash_cons)
+    program = parser.parse_program()
+    assert parser.errors == []
+    return program
+
+
+def dump(node: Node) -> bytes:
+    fp = io.BytesIO()
+    ASTArena.from_node(node).dump(fp)
+    return fp.getvalue()
+
+
+def load(data: bytes) -> Node:
+    return ASTArena.load(io.BytesIO(data)).to_node()
+
+
+def with_version(data: bytes, version: int) -> bytes:
+    header = list(HEADER.unpack_from(data))
+    header[1] = version
+    return HEADER.pack(*header) + data[HEADER.size :]
+
+
+def test_programs_round_trip():
+    for text in sources():
+        program = parse(text)
+        data = dump(program)
+        loaded = load(data)
+
+        assert loaded.json_repr() == program.json_repr()
+        assert dump(loaded) == data
+
+
+def test_program_dump_and_load():
+    program = parse(sources()[0])
+    fp = io.BytesIO()
+    program.dump(fp)
+    fp.seek(0)
+
+    assert Program.load(fp).json_repr() == program.json_repr()
+
+
+def test_loaded_names_are_interned():
+    loaded = load(dump(parse(sources()[0])))
+
+    function = loaded.statements[0]
+    assert function.return_type is SYMBOLS.intern("int")
+    name = function.function_name.identifier_literal
+    assert name is SYMBOLS.intern("".join(name))
+
+
+def test_shared_nodes_are_stored_once():
+    text = "function main() -> int{ let x: int = 1; return (x + 1) * (x + 1); }"
+    program = parse(text, hash_cons=True)
+
+    arena = ASTArena.from_node(program)
+    loaded = load(dump(program))
+
+    product = loaded.statements[0].body.statements[1].return_value
+    assert product.left_node is product.right_node
+    assert loaded.json_repr() == program.json_repr()
+
+    # one node per distinct object, however often it is referenced
+    distinct = set()
+    stack: list[Node] = [program]
+    while stack:
+        node = stack.pop()
+        if id(node) not in distinct:
+            distinct.add(id(node))
+            stack.extend(iter_child_nodes(node))
+    assert len(arena) == len(distinct)
+
+
+def test_ints_outside_int64_round_trip():
+    program = Program()
+    for value in (1 << 63, -(1 << 63) - 1, 1 << 100, (1 << 63) - 1, -(1 << 63)):
+        program.statements.append(ExpressionStatement(IntegerLiteral(value)))
+
+    loaded = load(dump(program))
+
+    assert [statement.expression.int_literal for statement in loaded.statements] == [
+        1 << 63,
+        -(1 << 63) - 1,
+        1 << 100,
+        (1 << 63) - 1,
+        -(1 << 63),
+    ]
+
+
+def test_nested_lists_round_trip():
+    # no node has a list of lists today, the arena stores them all the same
+    array_literal = ArrayLiteral(
+        [[IntegerLiteral(1), [IntegerLiteral(2)]], IntegerLiteral(3), [], [[]]]
+    )
+    program = Program()
+    program.statements.append(ExpressionStatement(array_literal))
+
+    def ints(value):
+        if type(value) is list:
+            return [ints(item) for item in value]
+        return value.int_literal
+
+    expected = [[1, [2]], 3, [], [[]]]
+    arena = ASTArena.from_node(program)
+
+    assert ints(arena.view().statements[0].expression.values) == expected
+    assert ints(load(dump(program)).statements[0].expression.values) == expected
+
+
+def test_version_1_files_with_a_for_loop_are_rejected():
+    with_loop = dump(parse("function main() -> int{ for i in 0..3{ } return 0; }"))
+    with pytest.raises(ValueError, match="version 1"):
+        load(with_version(with_loop, 1))
+
+    without_loop = parse("function main() -> int{ return 0; }")
+    loaded = load(with_version(dump(without_loop), 1))
+    assert loaded.json_repr() == without_loop.json_repr()
+
+
+def test_newer_versions_are_rejected():
+    data = with_version(dump(parse("function main() -> int{ return 0; }")), 9)
+
+    with pytest.raises(ValueError, match=f"newer than {FORMAT_VERSION}"):
+        load(data)
+
+
+def test_bad_magic_is_rejected():
+    data = dump(parse("function main() -> int{ return 0; }"))
+
+    with pytest.raises(ValueError, match="wrong magic"):
+        load(b"JSON" + data[4:])
+
+    with pytest.raises(ValueError, match="too short"):
+        load(data[: HEADER.size - 1])
+
+    # an AST written as JSON instead
+    with pytest.raises(ValueError, match="wrong magic"):
+        load(b'{"type": "Program", "statements": []}')
@@ -0,0 +1,93 @@
+import io
+import json
+import os
+import re
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "the_supa_awesome_compiler"))
+
+from benchmarks.generator import SHAPES, generate_program  # noqa: E402
+
+from _AST import (  # noqa: E402
+    BooleanLiteral,
+    ExpressionStatement,
+    FloatLiteral,
+    IntegerLiteral,
+    Node,
+    Program,
+)
+from _ast_json import write_json  # noqa: E402
+from _lexer import Lexer  # noqa: E402
+from _parser import Parser  # noqa: E402
+
+INDENTS = (None, 0, 2, 4)
+
+
+def sources() -> list[str]:
+    with open(os.path.join(ROOT, "README.md")) as f:
+        blocks = re.findall(r"```\n(.*?)```", f.read(), re.DOTALL)
+    texts = [block for block in blocks if block.lstrip().startswith("function")]
+
+    with open(os.path.join(ROOT, "tests", "func.marsh")) as f:
+        texts.append(f.read())
+
+    texts.extend(generate_program(shape, 8) for shape in SHAPES)
+
+    return texts
+
+
+def parse(text: str, hash_cons: bool = False) -> Program:
+    parser = Parser(Lexer(text), hash_cons=hash_cons)
+    program = parser.parse_program()
+    assert parser.errors == []
+    return program
+
+
+def assert_writes_like_json_dump(node: Node) -> None:
+    for indent in INDENTS:
+        expected = io.StringIO()
+        json.dump(node.json_repr(), expected, indent=indent)
+
+        written = io.StringIO()
+        write_json(node, written, indent)
+
+        assert written.getvalue() == expected.getvalue(), indent
+
+
+def test_programs_are_written_like_json_dump():
+    for text in sources():
+        assert_writes_like_json_dump(parse(text))
+
+
+def test_program_write_json():
+    program = parse(sources()[0])
+    fp = io.StringIO()
+    program.write_json(fp, indent=4)
+
+    assert fp.getvalue() == json.dumps(program.json_repr(), indent=4)
+
+
+def test_shared_nodes_are_written_at_every_use():
+    text = "function main() -> int{ let x: int = 1; return (x + 1) * (x + 1); }"
+    assert_writes_like_json_dump(parse(text, hash_cons=True))
+
+
+def test_scalars_are_written_like_json_dump():
+    program = Program()
+    for literal in (
+        IntegerLiteral(1 << 100),
+        IntegerLiteral(-(1 << 70)),
+        FloatLiteral(0.1),
+        FloatLiteral(1e300),
+        FloatLiteral(-0.0),
+        BooleanLiteral(True),
+        BooleanLiteral(False),
+    ):
+        program.statements.append(ExpressionStatement(literal))
+
+    assert_writes_like_json_dump(program)
+
+
+def test_empty_program():
+    assert_writes_like_json_dump(Program())
@@ -0,0 +1,199 @@
+import os
+import sys
+from ctypes import CFUNCTYPE, c_int
+
+import llvmlite.binding as llvm
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "the_supa_awesome_compiler"))
+
+from _AST import (  # noqa: E402
+    AssignmentStatement,
+    BooleanLiteral,
+    Expression,
+    IfStatement,
+    InfixExpression,
+    IntegerLiteral,
+    Program,
+    ReassignmentStatement,
+    ReturnStatement,
+    Statement,
+)
+from _compiler import Compiler  # noqa: E402
+from _constant_folder import ConstantFolder  # noqa: E402
+from _lexer import Lexer  # noqa: E402
+from _parser import Parser  # noqa: E402
+
+llvm.initialize()
+llvm.initialize_native_target()
+llvm.initialize_native_asmprinter()
+
+
+def parse(text: str) -> Program:
+    parser = Parser(Lexer(text))
+    program = parser.parse_program()
+    assert parser.errors == []
+    return program
+
+
+def folded_body(text: str) -> list[Statement]:
+    # the statements of the only function, main, after folding
+    (main,) = ConstantFolder().fold(parse(text)).statements
+    return main.body.statements
+
+
+def folded_return(expression: str) -> Expression:
+    (statement,) = folded_body(f"function main() -> int {{ return {expression}; }}")
+    assert type(statement) is ReturnStatement
+    return statement.return_value
+
+
+def run(text: str, fold_constants: bool = True) -> int:
+    compiler = Compiler(fold_constants=fold_constants)
+    compiler.compile(parse(text))
+
+    module = llvm.parse_assembly(str(compiler.module))
+    module.verify()
+
+    target_machine = llvm.Target.from_default_triple().create_target_machine()
+    engine = llvm.create_mcjit_compiler(module, target_machine)
+    engine.finalize_object()
+
+    return CFUNCTYPE(c_int)(engine.get_function_address("main"))()
+
+
+def test_long_infix_chain_folds_as_deep_as_it_compiles():
+    # one nested InfixExpression per operator; folding must not need more
+    # stack than resolving and compiling the chain does
+    operators = 400
+    chain = " + ".join(["x"] * (operators + 1))
+    text = f"function main() -> int {{ let x: int = 1; return {chain}; }}"
+
+    assert run(text, fold_constants=False) == operators + 1
+    assert run(text) == operators + 1
+
+
+def test_else_branch_keeps_the_scope_it_shares_with_the_consequence():
+    # the x in the else branch is the consequence's let, not the outer x
+    text = (
+        "function main() -> int { let x: int = 0;"
+        " if 1 > 2 { let x: int = 1; } else { x = 5; } return x; }"
+    )
+
+    assert run(text, fold_constants=False) == 0
+    assert run(text) == 0
+
+
+def assert_folds_to(expression: str, value: int) -> None:
+    folded = folded_return(expression)
+    assert type(folded) is IntegerLiteral
+    assert folded.int_literal == value
+
+    text = f"function main() -> int {{ return {expression}; }}"
+    assert run(text, fold_constants=False) == value
+
+
+def test_division_truncates_towards_zero():
+    assert_folds_to("(0 - 7) / 2", -3)
+    assert_folds_to("7 / (0 - 2)", -3)
+    assert_folds_to("(0 - 7) / (0 - 2)", 3)
+
+
+def test_remainder_takes_the_sign_of_the_dividend():
+    assert_folds_to("(0 - 7) % 2", -1)
+    assert_folds_to("7 % (0 - 2)", 1)
+    assert_folds_to("(0 - 7) % (0 - 2)", -1)
+
+
+def test_arithmetic_wraps_like_i32():
+    assert_folds_to("2147483647 + 1", -2147483648)
+    assert_folds_to("(0 - 2147483647) - 2", 2147483647)
+    assert_folds_to("65536 * 65536", 0)
+    assert_folds_to("~2147483647", -2147483648)
+
+
+def test_undefined_divisions_are_left_to_the_compiler():
+    for expression in ("1 / 0", "1 % 0", "((0 - 2147483647) - 1) / (0 - 1)"):
+        folded = folded_return(expression)
+        assert type(folded) is InfixExpression
+        assert type(folded.right_node) is IntegerLiteral
+
+
+def test_comparisons_fold_to_booleans():
+    folded = folded_return("3 <= 2")
+    assert type(folded) is BooleanLiteral
+    assert folded.boolean_value is False
+
+
+def assert_folds_statements(text: str, statement_types: list[type]) -> None:
+    assert [type(statement) for statement in folded_body(text)] == statement_types
+    assert run(text) == run(text, fold_constants=False)
+
+
+def test_constant_if_is_replaced_by_the_branch_that_runs():
+    for condition, result in (("1 < 2", 1), ("1 > 2", 2)):
+        text = (
+            "function main() -> int { let x: int = 0;"
+            f" if {condition} {{ x = 1; }} else {{ x = 2; }} return x; }}"
+        )
+        assert_folds_statements(
+            text, [AssignmentStatement, ReassignmentStatement, ReturnStatement]
+        )
+        assert run(text) == result
+
+
+def test_constant_if_without_else():
+    taken = "function main() -> int { let x: int = 0; if 1 < 2 { x = 1; } return x; }"
+    assert_folds_statements(
+        taken, [AssignmentStatement, ReassignmentStatement, ReturnStatement]
+    )
+
+    skipped = "function main() -> int { let x: int = 0; if 1 > 2 { x = 1; } return x; }"
+    assert_folds_statements(skipped, [AssignmentStatement, ReturnStatement])
+
+
+def test_branch_with_a_return_keeps_its_block():
+    text = (
+        "function main() -> int { let x: int = 0;"
+        " if 1 < 2 { x = 1; return x; } return 2; }"
+    )
+    assert_folds_statements(text, [AssignmentStatement, IfStatement, ReturnStatement])
+
+    (_, statement, _) = folded_body(text)
+    assert type(statement.condition) is BooleanLiteral
+    assert statement.condition.boolean_value is True
+    assert run(text) == 1
+
+
+def test_branch_with_a_top_level_let_keeps_its_scope():
+    text = (
+        "function main() -> int { let x: int = 0;"
+        " if 1 < 2 { let x: int = 5; x = x + 1; } return x; }"
+    )
+    # the outer x is a constant and goes; the inner one needs the if's scope
+    assert_folds_statements(text, [IfStatement, ReturnStatement])
+    assert run(text) == 0
+
+
+def test_reassigned_let_is_not_propagated():
+    text = (
+        "function main() -> int { let x: int = 3; let y: int = x;"
+        " x = 4; return x + y; }"
+    )
+    assert_folds_statements(
+        text,
+        [
+            AssignmentStatement,
+            AssignmentStatement,
+            ReassignmentStatement,
+            ReturnStatement,
+        ],
+    )
+    assert run(text) == 7
+
+
+def test_single_constant_let_is_propagated():
+    text = "function main() -> int { let x: int = 3; return x * 2; }"
+    (statement,) = folded_body(text)
+    assert type(statement.return_value) is IntegerLiteral
+    assert statement.return_value.int_literal == 6
@@ -0,0 +1,199 @@
+import os
+import re
+import sys
+from ctypes import CFUNCTYPE, c_int
+
+import llvmlite.binding as llvm
+from llvmlite import ir
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "the_supa_awesome_compiler"))
+
+from _compiler import Compiler  # noqa: E402
+from _lexer import Lexer  # noqa: E402
+from _llvm_pipeline import OptimizationLevel, Pipeline  # noqa: E402
+from _parser import Parser  # noqa: E402
+
+llvm.initialize()
+llvm.initialize_native_target()
+llvm.initialize_native_asmprinter()
+
+SUM_EVERY = """
+function sum_every(n: int, k: int) -> int{
+    let x: int = 0;
+
+    ATTRIBUTES
+    for i in k - 1..n * 2 step k{
+        x = x + i;
+    }
+    return x;
+}
+"""
+
+ATTRIBUTES = {
+    "": [],
+    "#[unroll]": ['!{ !"llvm.loop.unroll.enable" }'],
+    "#[unroll(1)]": ['!{ !"llvm.loop.unroll.disable" }'],
+    "#[unroll(4)]": ['!{ !"llvm.loop.unroll.count", i32 4 }'],
+    "#[vectorize]": ['!{ !"llvm.loop.vectorize.enable", i1 1 }'],
+    "#[vectorize(1)]": ['!{ !"llvm.loop.vectorize.enable", i1 0 }'],
+    "#[vectorize(8)]": [
+        '!{ !"llvm.loop.vectorize.enable", i1 1 }',
+        '!{ !"llvm.loop.vectorize.width", i32 8 }',
+    ],
+    "#[unroll(4)] #[vectorize]": [
+        '!{ !"llvm.loop.unroll.count", i32 4 }',
+        '!{ !"llvm.loop.vectorize.enable", i1 1 }',
+    ],
+}
+
+# the back edge of a loop and the loop ID it carries, in LLVM's own printing
+BACK_EDGE = re.compile(r"br label %for_loop_header[.\d]*, !llvm\.loop (![0-9]+)")
+
+
+def compile_module(text: str) -> Compiler:
+    parser = Parser(Lexer(text))
+    program = parser.parse_program()
+    assert parser.errors == []
+
+    compiler = Compiler(fold_constants=False)
+    compiler.compile(program)
+    assert compiler.errors == []
+
+    return compiler
+
+
+def jit(ir_text: str, level: OptimizationLevel) -> tuple[llvm.ModuleRef, object]:
+    module = llvm.parse_assembly(ir_text)
+    module.verify()
+
+    pipeline = Pipeline(level)
+    pipeline.run(module, pipeline.target_machine())
+
+    engine = llvm.create_mcjit_compiler(module, pipeline.target_machine())
+    engine.finalize_object()
+
+    return module, engine
+
+
+def test_for_loops_are_lowered_to_canonical_loops():
+    compiler = compile_module(SUM_EVERY.replace("ATTRIBUTES", ""))
+    function = compiler.module.get_global("sum_every")
+    entry, header, body, latch, exit_block = function.blocks
+
+    assert [block.name for block in function.blocks] == [
+        "sum_every_entry",
+        "for_loop_header",
+        "for_loop_body",
+        "for_loop_latch",
+        "for_loop_exit",
+    ]
+
+    # preheader -> header, which holds the only exit test
+    assert isinstance(entry.terminator, ir.Branch)
+    assert entry.terminator.operands == [header]
+    assert isinstance(header.terminator, ir.ConditionalBranch)
+    assert header.terminator.operands[1:] == [body, exit_block]
+
+    # the body falls through to the single latch, whose back edge steps i
+    assert body.terminator.operands == [latch]
+    assert latch.terminator.operands == [header]
+    assert [instruction.opname for instruction in latch.instructions] == [
+        "load",
+        "add",
+        "store",
+        "br",
+    ]
+
+    # the range is evaluated once, before the loop
+    assert "mul" in [instruction.opname for instruction in entry.instructions]
+    assert "mul" not in [instruction.opname for instruction in header.instructions]
+
+
+def test_step_and_range_bounds():
+    ir_text = str(compile_module(SUM_EVERY.replace("ATTRIBUTES", "")).module)
+
+    for level in (OptimizationLevel.O0, OptimizationLevel.O2):
+        _, engine = jit(ir_text, level)
+        sum_every = CFUNCTYPE(c_int, c_int, c_int)(
+            engine.get_function_address("sum_every")
+        )
+
+        for n, k in ((0, 1), (1, 1), (10, 1), (10, 3), (25, 4), (7, 20)):
+            assert sum_every(n, k) == sum(range(k - 1, n * 2, k)), (level, n, k)
+
+
+def test_attributes_become_loop_metadata():
+    for attributes, hints in ATTRIBUTES.items():
+        compiler = compile_module(SUM_EVERY.replace("ATTRIBUTES", attributes))
+        ir_text = str(compiler.module)
+
+        if not hints:
+            assert "llvm.loop" not in ir_text
+            continue
+
+        for hint in hints:
+            assert re.search(rf"^!\d+ = {re.escape(hint)}$", ir_text, re.M), (
+                attributes,
+                hint,
+            )
+
+        # every attributed loop still computes the same sums once LLVM acted
+        # on its hints
+        for level in (OptimizationLevel.O0, OptimizationLevel.O3):
+            _, engine = jit(ir_text, level)
+            sum_every = CFUNCTYPE(c_int, c_int, c_int)(
+                engine.get_function_address("sum_every")
+            )
+            for n, k in ((0, 1), (10, 1), (100, 3), (1000, 7)):
+                assert sum_every(n, k) == sum(range(k - 1, n * 2, k)), attributes
+
+
+def test_loop_ids_are_self_referential_and_distinct():
+    text = """
+    function main() -> int{
+        let x: int = 0;
+        #[unroll(4)]
+        for i in 0..10{
+            x = x + i;
+        }
+        #[unroll(4)]
+        for i in 0..10 step 2{
+            x = x + i * 100;
+        }
+        for i in 0..3{
+            x = x + 1;
+        }
+        return x;
+    }
+    """
+    ir_text = str(compile_module(text).module)
+    module, engine = jit(ir_text, OptimizationLevel.O0)
+    printed = str(module)
+
+    loop_ids = BACK_EDGE.findall(printed)
+    assert len(loop_ids) == 2
+    assert loop_ids[0] != loop_ids[1]
+
+    for loop_id in loop_ids:
+        definition = re.search(rf"^{loop_id} = (distinct )?!\{{(.*)\}}$", printed, re.M)
+        assert definition is not None
+        assert definition.group(2).split(", ")[0] == loop_id
+
+    assert CFUNCTYPE(c_int)(engine.get_function_address("main"))() == 45 + 2000 + 3
+
+    _, engine = jit(ir_text, OptimizationLevel.O3)
+    assert CFUNCTYPE(c_int)(engine.get_function_address("main"))() == 45 + 2000 + 3
+
+
+def test_unsupported_operators_are_reported_as_errors(capsys):
+    text = "function main() -> int{ let x: int = 1; (x != 2); return x; }"
+    parser = Parser(Lexer(text))
+    program = parser.parse_program()
+    assert parser.errors == []
+
+    compiler = Compiler(fold_constants=False)
+    compiler.compile(program)
+
+    assert compiler.errors == ["Unsupported operator !="]
+    assert capsys.readouterr().out == ""
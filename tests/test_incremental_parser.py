@@ -0,0 +1,56 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "the_supa_awesome_compiler"))
+
+from _incremental_parser import IncrementalParser  # noqa: E402
+from _lexer import Lexer  # noqa: E402
+from _parser import Parser  # noqa: E402
+
+ONE = "function one() -> int{ return 1; }\n"
+TWO = "function two() -> int{ return 2; }\n"
+MAIN = "function main() -> int{ return one() + two(); }\n"
+
+
+def assert_parses_like_parser(program, text: str) -> None:
+    expected = Parser(Lexer(text)).parse_program()
+    assert program.json_repr() == expected.json_repr()
+
+
+def test_only_changed_declarations_are_parsed_again():
+    parser = IncrementalParser()
+    first, changed = parser.parse(ONE + TWO + MAIN)
+    assert len(changed) == 3
+
+    edited = ONE + TWO.replace("2", "3") + MAIN
+    second, changed = parser.parse(edited)
+
+    assert_parses_like_parser(second, edited)
+    assert [function.function_name.identifier_literal for function in changed] == [
+        "two"
+    ]
+    assert second.statements[0] is first.statements[0]
+    assert second.statements[2] is first.statements[2]
+
+
+def test_declarations_with_identical_text():
+    parser = IncrementalParser()
+    text = ONE + ONE + TWO + ONE
+    first, changed = parser.parse(text)
+
+    assert len(changed) == 4
+    # every copy has statements of its own
+    assert len({id(statement) for statement in first.statements}) == 4
+
+    second, changed = parser.parse(text)
+
+    assert changed == []
+    assert all(new is old for new, old in zip(second.statements, first.statements))
+
+    # dropping a copy reuses the others
+    third, changed = parser.parse(ONE + TWO + ONE)
+
+    assert_parses_like_parser(third, ONE + TWO + ONE)
+    assert changed == []
+    assert len({id(statement) for statement in third.statements}) == 3
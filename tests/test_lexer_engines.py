@@ -0,0 +1,107 @@
+import os
+import random
+import re
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "the_supa_awesome_compiler"))
+
+from _lexer import Lexer, LexerEngine  # noqa: E402
+from _token import TokenType  # noqa: E402
+
+
+EDGE_CASES = [
+    "",
+    "   \n\t\r\n",
+    "x",
+    "1",
+    "1.5",
+    "1.",
+    "1..10",
+    "1..",
+    "1...5",
+    "1.2.3",
+    "1..2..3",
+    "1..1.5",
+    "for i in 0..200{}",
+    "x1 = y2;",
+    "a->b-c->",
+    "a==b=c!=d!e",
+    "a<=b<c>=d>e",
+    "~x ^ y | z & w % 2",
+    "arr[mid] == element",
+    "let arr: [int, 10] = [1, 2, 3];",
+    "@ # $ ` ' \" . ? \\",
+    "snake_case _lead trail_",
+    "héllo wörld",
+    "a²b ½ ٣4",
+    "let\tx:int=5;\r\nreturn x;",
+    "-",
+    "=",
+    "!",
+    "0x1F 0XdeadBEEF 0x 0x_ 0xg",
+    "0b1010 0B11 0b 0b2 0b1_0",
+    "1_000_000 1_000.5_0 1__ 1_.5",
+    "a..b .. 0x10..0b11",
+]
+
+ALPHABET = "ab_xyz019 .\n\t+-*/%^|&~!(){}[];:,=<>é²#"
+
+
+def corpus() -> list[str]:
+    sources = list(EDGE_CASES)
+
+    with open(os.path.join(ROOT, "tests", "func.marsh")) as f:
+        sources.append(f.read())
+
+    with open(os.path.join(ROOT, "README.md")) as f:
+        sources.extend(re.findall(r"```\n(.*?)```", f.read(), re.DOTALL))
+
+    rng = random.Random(1337)
+    for _ in range(500):
+        length = rng.randint(1, 60)
+        sources.append("".join(rng.choice(ALPHABET) for _ in range(length)))
+
+    return sources
+
+
+def lex(source: str, engine: LexerEngine) -> list[tuple]:
+    lexer = Lexer(source, engine=engine)
+    tokens = []
+
+    while True:
+        token = lexer.next_token()
+        tokens.append(
+            (token.token_type, token.start, token.end, token.token_literal, token.value)
+        )
+        if token.token_type is TokenType.EOF:
+            return tokens
+
+
+def test_engines_produce_identical_token_streams():
+    for source in corpus():
+        assert lex(source, LexerEngine.REGEX) == lex(
+            source, LexerEngine.SCANNER
+        ), source
+
+
+def test_range_is_split_into_three_tokens():
+    assert [token[0] for token in lex("0..200", LexerEngine.REGEX)] == [
+        TokenType.INT,
+        TokenType.RANGE_SEPARATOR,
+        TokenType.INT,
+        TokenType.EOF,
+    ]
+
+
+def test_numeric_values_are_decoded_while_scanning():
+    for engine in LexerEngine:
+        tokens = lex("0x1F 0b101 1_000 2.5 0x", engine)
+        assert [(token[0], token[4]) for token in tokens] == [
+            (TokenType.INT, 31),
+            (TokenType.INT, 5),
+            (TokenType.INT, 1000),
+            (TokenType.FLOAT, 2.5),
+            (TokenType.ILLEGAL, None),
+            (TokenType.EOF, None),
+        ]
@@ -0,0 +1,118 @@
+import os
+import sys
+from ctypes import CFUNCTYPE, c_int
+
+import llvmlite.binding as llvm
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "the_supa_awesome_compiler"))
+
+from _compiler import Compiler  # noqa: E402
+from _lexer import Lexer  # noqa: E402
+from _llvm_pipeline import (  # noqa: E402
+    NO_PASSES_REPORT,
+    OptimizationLevel,
+    Pipeline,
+    SizeLevel,
+)
+from _parser import Parser  # noqa: E402
+
+llvm.initialize()
+llvm.initialize_native_target()
+llvm.initialize_native_asmprinter()
+
+SOURCE = """
+function fact(n: int) -> int{
+    if n == 1{
+        return 1;
+    }
+    return n * fact(n-1);
+}
+
+function main() -> int{
+    let total: int = 0;
+    let arr: [int, 4] = [3, 1, 4, 1];
+    for i in 0..4{
+        total = total + arr[i] * fact(i + 1);
+    }
+    while total > 100{
+        total = total - 7;
+    }
+    return total;
+}
+"""
+
+# 3 * 1 + 1 * 2 + 4 * 6 + 1 * 24 = 53
+EXPECTED = 53
+
+
+def compile_ir(text: str) -> str:
+    parser = Parser(Lexer(text))
+    program = parser.parse_program()
+    assert parser.errors == []
+
+    compiler = Compiler()
+    compiler.compile(program)
+    assert compiler.errors == []
+
+    return str(compiler.module)
+
+
+def optimize(pipeline: Pipeline) -> tuple[llvm.ModuleRef, str]:
+    module = llvm.parse_assembly(compile_ir(SOURCE))
+    module.verify()
+
+    report = pipeline.run(module, pipeline.target_machine())
+    module.verify()
+
+    return module, report
+
+
+def run(module: llvm.ModuleRef, pipeline: Pipeline) -> int:
+    engine = llvm.create_mcjit_compiler(module, pipeline.target_machine())
+    engine.finalize_object()
+
+    return CFUNCTYPE(c_int)(engine.get_function_address("main"))()
+
+
+def test_every_level_and_size_computes_the_same_result():
+    for level in OptimizationLevel:
+        for size in SizeLevel:
+            pipeline = Pipeline(level, size)
+            module, report = optimize(pipeline)
+
+            assert report == ""
+            assert run(module, pipeline) == EXPECTED, (level, size)
+
+
+def test_custom_passes_compute_the_same_result():
+    pipeline = Pipeline(passes=["sroa", "instruction_combining", "function_inlining"])
+    module, _ = optimize(pipeline)
+
+    assert "alloca" not in str(module.get_function("fact"))
+    assert run(module, pipeline) == EXPECTED
+
+
+def test_unknown_passes_are_rejected():
+    with pytest.raises(ValueError, match="no_such_pass"):
+        Pipeline(passes=["sroa", "no_such_pass"])
+
+
+def test_timings_are_reported():
+    for level in (OptimizationLevel.O1, OptimizationLevel.O3):
+        module, report = optimize(Pipeline(level, time_passes=True))
+
+        assert "Pass execution timing report" in report
+        assert run(module, Pipeline(level)) == EXPECTED
+
+    _, report = optimize(Pipeline(passes=["gvn"], time_passes=True))
+    assert "Pass execution timing report" in report
+
+
+def test_no_passes_say_so_instead_of_timing():
+    _, report = optimize(Pipeline(OptimizationLevel.O0, time_passes=True))
+    assert report == NO_PASSES_REPORT
+
+    _, report = optimize(Pipeline(passes=[], time_passes=True))
+    assert report == NO_PASSES_REPORT
@@ -0,0 +1,63 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "the_supa_awesome_compiler"))
+
+from benchmarks.generator import SHAPES, generate_program  # noqa: E402
+
+from _lexer import Lexer, LexerEngine  # noqa: E402
+from _parallel_lexer import WHITESPACE_PATTERN, split_points, tokenize_parallel  # noqa: E402
+from _token_buffer import TokenBuffer  # noqa: E402
+
+
+def columns(buffer: TokenBuffer) -> tuple:
+    return (
+        list(buffer.types),
+        list(buffer.starts),
+        list(buffer.ends),
+        buffer.values,
+    )
+
+
+def assert_lexes_like_serial(text: str, **options) -> None:
+    for engine in LexerEngine:
+        expected = columns(Lexer(text, engine=engine).tokenize())
+
+        for use_threads in (True, False):
+            buffer = tokenize_parallel(
+                text, engine, max_workers=4, use_threads=use_threads, **options
+            )
+            assert columns(buffer) == expected, (engine, use_threads)
+
+
+def test_parallel_lexing_matches_serial_lexing():
+    text = "\n".join(generate_program(shape, 20) for shape in SHAPES)
+    assert_lexes_like_serial(text, min_chunk_size=256)
+
+
+def test_chunk_boundaries_inside_tokens():
+    # long names, numbers and ranges, so that the even cut points land
+    # inside tokens and have to move to the next whitespace
+    text = ("let " + "n" * 97 + ": float = 123456789.125 .. 0x" + "F" * 11 + ";\n") * 7
+    chunk_count = 4
+    chunk_size = len(text) // chunk_count
+    points = split_points(text, chunk_count)
+
+    targets = range(chunk_size, len(text), chunk_size)
+    assert any(
+        not text[target - 1].isspace() and not text[target].isspace()
+        for target in targets
+    )
+    for point in points[1:-1]:
+        assert WHITESPACE_PATTERN.fullmatch(text[point - 1])
+
+    assert_lexes_like_serial(text, min_chunk_size=len(text) // chunk_count)
+
+
+def test_chunks_without_whitespace_are_merged():
+    text = "x" * 1000 + " " + "y" * 10
+    assert split_points(text, 4) == [0, 1001, len(text)]
+
+    assert_lexes_like_serial(text, min_chunk_size=100)
+    assert_lexes_like_serial("z" * 1000, min_chunk_size=100)
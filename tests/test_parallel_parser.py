@@ -0,0 +1,55 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "the_supa_awesome_compiler"))
+
+from benchmarks.generator import generate_program  # noqa: E402
+
+from _AST import FunctionStatement, IdentifierLiteral, Node, iter_child_nodes  # noqa: E402
+from _lexer import Lexer  # noqa: E402
+from _parallel_parser import parse_parallel  # noqa: E402
+from _parser import Parser  # noqa: E402
+from _symbols import SYMBOLS  # noqa: E402
+
+
+def walk(node: Node):
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(iter_child_nodes(node))
+
+
+def test_parallel_parse_matches_serial_parse():
+    text = generate_program("functions", 40)
+    serial = Parser(Lexer(text).tokenize()).parse_program()
+
+    for use_threads in (False, True):
+        program, errors = parse_parallel(
+            text, max_workers=4, min_chunk_size=64, use_threads=use_threads
+        )
+        assert errors == []
+        assert program.json_repr() == serial.json_repr()
+
+
+def test_names_from_worker_processes_are_interned():
+    text = generate_program("functions", 40)
+    program, _ = parse_parallel(text, max_workers=4, min_chunk_size=64)
+
+    functions = [
+        statement
+        for statement in program.statements
+        if isinstance(statement, FunctionStatement)
+    ]
+    assert len(functions) > 1
+    for function in functions:
+        assert function.return_type is SYMBOLS.intern("int")
+
+    identifiers = [
+        node for node in walk(program) if isinstance(node, IdentifierLiteral)
+    ]
+    assert identifiers
+    for identifier in identifiers:
+        name = identifier.identifier_literal
+        assert name is SYMBOLS.intern(name)
@@ -0,0 +1,79 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "the_supa_awesome_compiler"))
+
+from _AST import (  # noqa: E402
+    CallExpression,
+    ExpressionStatement,
+    IdentifierLiteral,
+    IndexExpression,
+    InfixExpression,
+    IntegerLiteral,
+    PrefixExpression,
+)
+from _lexer import Lexer  # noqa: E402
+from _parser import Parser  # noqa: E402
+
+# well past the interpreter's recursion limit
+DEPTH = sys.getrecursionlimit() * 3
+
+
+def parse_expression(text: str):
+    # in parentheses, as a statement that starts with a name is a
+    # reassignment
+    parser = Parser(Lexer(f"({text});"))
+    program = parser.parse_program()
+    assert parser.errors == []
+
+    (statement,) = program.statements
+    assert type(statement) is ExpressionStatement
+    return statement.expression
+
+
+def test_deep_parentheses():
+    expression = parse_expression("(" * DEPTH + "1" + ")" * DEPTH)
+
+    assert type(expression) is IntegerLiteral
+    assert expression.int_literal == 1
+
+
+def test_deep_right_operands():
+    expression = parse_expression("1 + (" * DEPTH + "2" + ")" * DEPTH)
+
+    for _ in range(DEPTH):
+        assert type(expression) is InfixExpression
+        assert expression.left_node.int_literal == 1
+        expression = expression.right_node
+    assert expression.int_literal == 2
+
+
+def test_long_left_associative_chains():
+    expression = parse_expression(" - ".join(["x"] * DEPTH))
+
+    for _ in range(DEPTH - 1):
+        assert type(expression) is InfixExpression
+        assert expression.right_node.identifier_literal == "x"
+        expression = expression.left_node
+    assert type(expression) is IdentifierLiteral
+
+
+def test_deep_prefix_calls_and_indices():
+    expression = parse_expression("~" * DEPTH + "x")
+    for _ in range(DEPTH):
+        assert type(expression) is PrefixExpression
+        expression = expression.operand
+    assert expression.identifier_literal == "x"
+
+    expression = parse_expression("f(" * DEPTH + "1" + ")" * DEPTH)
+    for _ in range(DEPTH):
+        assert type(expression) is CallExpression
+        (expression,) = expression.arguments
+    assert expression.int_literal == 1
+
+    expression = parse_expression("a[" * DEPTH + "0" + "]" * DEPTH)
+    for _ in range(DEPTH):
+        assert type(expression) is IndexExpression
+        expression = expression.index
+    assert expression.int_literal == 0
@@ -0,0 +1,119 @@
+import os
+import random
+import re
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "the_supa_awesome_compiler"))
+
+from _lexer import Lexer, LexerEngine  # noqa: E402
+from _relexer import relex  # noqa: E402
+from _token_buffer import TokenBuffer  # noqa: E402
+
+
+ALPHABET = "ab_xyz019 .\n\t+-*/%^|&~!(){}[];:,=<>é²#"
+
+SNIPPETS = [" ", "\n", ".", "..", "1", "10", "x", "0x", "_", "=", "==", "->", "let "]
+
+
+def columns(buffer: TokenBuffer) -> tuple:
+    return (
+        buffer.source.text,
+        list(buffer.types),
+        list(buffer.starts),
+        list(buffer.ends),
+        buffer.values,
+    )
+
+
+def assert_relexes(text: str, offset: int, removed: int, inserted: str) -> None:
+    new_text = text[:offset] + inserted + text[offset + removed :]
+
+    for engine in LexerEngine:
+        buffer = Lexer(text, engine=engine).tokenize()
+        result = relex(buffer, offset, removed, inserted, engine)
+        expected = Lexer(new_text, engine=engine).tokenize()
+
+        assert columns(result.buffer) == columns(expected), (
+            engine,
+            text,
+            offset,
+            removed,
+            inserted,
+        )
+
+        # the tokens outside [first, new_stop) are the old ones, shifted
+        delta = len(inserted) - removed
+        assert result.buffer.types[: result.first] == buffer.types[: result.first]
+        assert result.buffer.types[result.new_stop :] == buffer.types[result.old_stop :]
+        assert list(result.buffer.starts[result.new_stop :]) == [
+            start + delta for start in buffer.starts[result.old_stop :]
+        ]
+
+
+def sources() -> list[str]:
+    texts = []
+
+    with open(os.path.join(ROOT, "tests", "func.marsh")) as f:
+        texts.append(f.read())
+
+    with open(os.path.join(ROOT, "README.md")) as f:
+        texts.extend(re.findall(r"```\n(.*?)```", f.read(), re.DOTALL))
+
+    rng = random.Random(5)
+    for _ in range(50):
+        length = rng.randint(0, 60)
+        texts.append("".join(rng.choice(ALPHABET) for _ in range(length)))
+
+    return texts
+
+
+def test_random_edits_relex_like_a_full_lex():
+    rng = random.Random(2024)
+
+    for text in sources():
+        for _ in range(20):
+            offset = rng.randint(0, len(text))
+            removed = rng.randint(0, min(4, len(text) - offset))
+
+            if rng.random() < 0.5:
+                inserted = rng.choice(SNIPPETS)
+            else:
+                length = rng.randint(0, 4)
+                inserted = "".join(rng.choice(ALPHABET) for _ in range(length))
+
+            assert_relexes(text, offset, removed, inserted)
+
+
+def test_edits_inside_a_range():
+    text = "for i in 1..10{ x = i; }"
+    start = text.index("1..10")
+
+    for offset in range(start, start + len("1..10") + 1):
+        assert_relexes(text, offset, 0, "5")
+        assert_relexes(text, offset, 0, ".")
+        assert_relexes(text, offset, 0, " ")
+
+    # 1..10 -> 1.10, 1.0, 110 and 1..0
+    for offset in range(start, start + len("1..10")):
+        assert_relexes(text, offset, 1, "")
+
+
+def test_deleting_the_whitespace_between_two_tokens():
+    assert_relexes("let x = 1 .5;", 9, 1, "")
+    assert_relexes("a b c", 1, 1, "")
+    assert_relexes("1 ..10", 1, 1, "")
+    assert_relexes("x =\n= y", 3, 1, "")
+    assert_relexes("0x 1F", 2, 1, "")
+
+
+def test_edits_at_the_end_of_the_source():
+    for text in ("", "x", "return 1", "a = 1;\n", "1.", "1.."):
+        end = len(text)
+
+        assert_relexes(text, end, 0, "0")
+        assert_relexes(text, end, 0, " y")
+        assert_relexes(text, end, 0, ".")
+        if text:
+            assert_relexes(text, end - 1, 1, "")
+            assert_relexes(text, end - 1, 1, "9")
@@ -0,0 +1,276 @@
+import os
+import re
+import sys
+from ctypes import CFUNCTYPE, c_int
+
+import llvmlite.binding as llvm
+from llvmlite import ir
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "the_supa_awesome_compiler"))
+
+from _compiler import Compiler  # noqa: E402
+from _lexer import Lexer  # noqa: E402
+from _parser import Parser  # noqa: E402
+
+llvm.initialize()
+llvm.initialize_native_target()
+llvm.initialize_native_asmprinter()
+
+# allocas of int, float and bool slots; arrays stay in memory in both modes
+SCALAR_ALLOCA = re.compile(r"alloca (i32|i1|float)\b")
+
+# name, source and what main returns
+PROGRAMS = [
+    (
+        "if_else_join",
+        """
+        function main() -> int{
+            let x: int = 5;
+            let y: int = 1;
+            if x > 3{
+                x = x + 10;
+            }
+            else{
+                y = 7;
+            }
+            if x < 3{
+                y = y + 100;
+            }
+            return x * 10 + y;
+        }
+        """,
+        151,
+    ),
+    (
+        "nested_loops",
+        """
+        function main() -> int{
+            let total: int = 0;
+            let i: int = 0;
+            while i < 6{
+                let j: int = 0;
+                while j < i{
+                    for k in 0..3{
+                        total = total + k * j;
+                    }
+                    j = j + 1;
+                }
+                if i % 2 == 0{
+                    total = total + 1;
+                }
+                i = i + 1;
+            }
+            return total;
+        }
+        """,
+        3 * (0 + 0 + 1 + 3 + 6 + 10) + 3,
+    ),
+    (
+        "early_return",
+        """
+        function find(limit: int) -> int{
+            let i: int = 0;
+            while i < 100{
+                if i * i > limit{
+                    return i;
+                }
+                else{
+                    if i == 50{
+                        return 0 - 1;
+                    }
+                }
+                i = i + 1;
+            }
+            return 0;
+        }
+
+        function main() -> int{
+            return find(50) * 100 + find(1000);
+        }
+        """,
+        8 * 100 + 32,
+    ),
+    (
+        "shadowed_lets",
+        """
+        function main() -> int{
+            let x: int = 1;
+            let total: int = 0;
+            while total < 3{
+                let x: int = total * 10;
+                if x > 5{
+                    let x: int = 100;
+                    total = total + x;
+                }
+                total = total + x + 1;
+            }
+            for x in 0..4{
+                total = total + x;
+            }
+            return total + x;
+        }
+        """,
+        1 + 111 + 6 + 1,
+    ),
+    (
+        "recursion",
+        """
+        function fact(n: int) -> int{
+            if n == 1{
+                return 1;
+            }
+            return n * fact(n-1);
+        }
+
+        function main() -> int{
+            return fact(7);
+        }
+        """,
+        5040,
+    ),
+    (
+        "binary_search",
+        """
+        function main() -> int{
+            let element: int = 4;
+            let low: int = 0;
+            let high: int = 9;
+
+            let arr: [int, 10] = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10];
+
+            while low <= high{
+                let mid: int = low + (high - low) / 2;
+
+                if arr[mid] == element{
+                    return mid;
+                }
+                if arr[mid] < element{
+                    low = mid + 1;
+                }
+                else{
+                    high = mid - 1;
+                }
+            }
+
+            return 0 - 1;
+        }
+        """,
+        3,
+    ),
+    (
+        "unrolled_loop",
+        """
+        function main() -> int{
+            let x: int = 0;
+            #[unroll(4)]
+            for i in 0..10{
+                x = x + i;
+            }
+            return x;
+        }
+        """,
+        45,
+    ),
+    (
+        "lets_in_bodies",
+        """
+        function pick(n: int) -> int{
+            let total: int = 0;
+            for i in 0..n{
+                let table: [int, 3] = [i, i * 2, i * 3];
+                if i % 2 == 0{
+                    let doubled: int = table[1];
+                    total = total + doubled;
+                }
+                else{
+                    let limit: int = 2;
+                    if i > limit{
+                        let tripled: int = table[2];
+                        total = total + tripled;
+                    }
+                }
+                while total > 1000{
+                    let cut: int = 500;
+                    total = total - cut;
+                }
+            }
+            return total;
+        }
+
+        function main() -> int{
+            return pick(9);
+        }
+        """,
+        2 * (0 + 2 + 4 + 6 + 8) + 3 * (3 + 5 + 7),
+    ),
+]
+
+
+def compile_module(text: str, ssa: bool) -> ir.Module:
+    parser = Parser(Lexer(text))
+    program = parser.parse_program()
+    assert parser.errors == []
+
+    # without folding, so the constant conditions above stay branches
+    compiler = Compiler(fold_constants=False, ssa=ssa)
+    compiler.compile(program)
+
+    return compiler.module
+
+
+def compile_ir(text: str, ssa: bool) -> str:
+    return str(compile_module(text, ssa))
+
+
+def run(ir_text: str) -> int:
+    module = llvm.parse_assembly(ir_text)
+    module.verify()
+
+    target_machine = llvm.Target.from_default_triple().create_target_machine()
+    engine = llvm.create_mcjit_compiler(module, target_machine)
+    engine.finalize_object()
+
+    return CFUNCTYPE(c_int)(engine.get_function_address("main"))()
+
+
+def test_ssa_and_alloca_codegen_agree():
+    for name, text, expected in PROGRAMS:
+        assert run(compile_ir(text, ssa=False)) == expected, name
+        assert run(compile_ir(text, ssa=True)) == expected, name
+
+
+def test_ssa_codegen_keeps_no_scalar_in_memory():
+    for name, text, _ in PROGRAMS:
+        assert SCALAR_ALLOCA.search(compile_ir(text, ssa=False)), name
+        assert not SCALAR_ALLOCA.search(compile_ir(text, ssa=True)), name
+
+
+def test_ssa_codegen_merges_with_phis():
+    ir_text = compile_ir(PROGRAMS[0][1], ssa=True)
+    assert " phi " in ir_text
+
+
+def test_allocas_are_all_in_the_entry_block():
+    # including the variables and arrays declared in loop and if bodies
+    for name, text, _ in PROGRAMS:
+        for ssa in (False, True):
+            outside_entry = [
+                (function.name, block.name)
+                for function in compile_module(text, ssa).functions
+                for block in function.blocks[1:]
+                for instruction in block.instructions
+                if instruction.opname == "alloca"
+            ]
+            assert outside_entry == [], (name, ssa)
+
+
+def test_lets_in_bodies_agree_in_both_modes():
+    _, text, expected = PROGRAMS[-1]
+
+    alloca_ir = compile_ir(text, ssa=False)
+    ssa_ir = compile_ir(text, ssa=True)
+
+    # the array is declared in the loop body and still is an entry alloca
+    assert "alloca [3 x i32]" in ssa_ir
+    assert run(alloca_ir) == run(ssa_ir) == expected
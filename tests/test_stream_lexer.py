@@ -0,0 +1,99 @@
+import io
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "the_supa_awesome_compiler"))
+
+from benchmarks.generator import SHAPES, generate_program  # noqa: E402
+
+from _lexer import Lexer, LexerEngine  # noqa: E402
+from _parser import WINDOW_BLOCK, Parser  # noqa: E402
+from _token import TokenType  # noqa: E402
+from _token_buffer import TokenBuffer, TokenWindow  # noqa: E402
+
+
+def tokens(buffer: TokenBuffer, first: int = 0) -> list[tuple]:
+    return [
+        (
+            buffer.token_type(index),
+            buffer.starts[index],
+            buffer.ends[index],
+            buffer.literal(index),
+            buffer.values[index],
+        )
+        for index in range(first, len(buffer))
+    ]
+
+
+def text() -> str:
+    return generate_program("ranges", 6) + "let x: float = 1.5 .. 0x1F;"
+
+
+def test_tokenize_matches_lexing_the_whole_text():
+    for engine in LexerEngine:
+        for chunk_size in (1, 7, 64, 1 << 16):
+            stream = Lexer.from_stream(io.StringIO(text()), engine, chunk_size)
+
+            assert tokens(stream.tokenize()) == tokens(Lexer(text(), engine).tokenize())
+
+
+def test_tokenize_goes_on_from_next_token():
+    expected = tokens(Lexer(text()).tokenize())
+
+    for consumed in (0, 1, 5, 40, len(expected) - 1, len(expected)):
+        stream = Lexer.from_stream(io.StringIO(text()), chunk_size=16)
+        handed_out = [stream.next_token() for _ in range(consumed)]
+
+        assert [token.start for token in handed_out] == [
+            token[1] for token in expected[:consumed]
+        ]
+        rest = expected[consumed:] or expected[-1:]
+        assert tokens(stream.tokenize()) == rest
+
+        # the stream is used up
+        assert stream.next_token().token_type is TokenType.EOF
+
+
+def test_from_path(tmp_path):
+    path = tmp_path / "program.marsh"
+    path.write_text(text())
+
+    stream = Lexer.from_path(path, chunk_size=32)
+    assert tokens(stream.tokenize()) == tokens(Lexer(text()).tokenize())
+
+
+class RecordingWindow(TokenWindow):
+    # the most tokens the window held at once
+    largest = 0
+
+    def fill(self, count: int) -> None:
+        super().fill(count)
+        self.largest = max(self.largest, len(self))
+
+
+def test_parser_reads_a_stream_through_a_window():
+    for shape in SHAPES:
+        source = generate_program(shape, 8)
+        expected = Parser(Lexer(source)).parse_program().json_repr()
+
+        for chunk_size in (1, 7, 1 << 16):
+            stream = Lexer.from_stream(io.StringIO(source), chunk_size=chunk_size)
+            parser = Parser(stream)
+
+            assert parser.parse_program().json_repr() == expected, (shape, chunk_size)
+            assert parser.errors == []
+
+
+def test_parsed_statements_leave_the_window():
+    source = generate_program("functions", 2000)
+    stream = Lexer.from_stream(io.StringIO(source), chunk_size=256)
+    window = RecordingWindow(stream.next_token)
+    parser = Parser(window)
+
+    program = parser.parse_program()
+
+    assert parser.errors == []
+    assert program.json_repr() == Parser(Lexer(source)).parse_program().json_repr()
+    assert len(Lexer(source).tokenize()) > 20 * WINDOW_BLOCK
+    assert window.largest <= 3 * WINDOW_BLOCK
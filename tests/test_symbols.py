@@ -0,0 +1,43 @@
+import gc
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "the_supa_awesome_compiler"))
+
+from _lexer import Lexer  # noqa: E402
+from _parser import Parser  # noqa: E402
+from _symbols import SYMBOLS  # noqa: E402
+
+
+def fresh_name() -> list[str]:
+    # the parts of a name no other test uses; joining them makes a new object
+    unique = str(id(object())).translate(str.maketrans("0123456789", "abcdefghij"))
+    return ["never_", "seen_", unique]
+
+
+def test_equal_names_are_one_object():
+    parts = fresh_name()
+    first = SYMBOLS.intern("".join(parts))
+
+    assert SYMBOLS.intern("".join(parts)) is first
+
+
+def test_unreferenced_names_are_forgotten():
+    parts = fresh_name()
+    name = "".join(parts)
+    text = f"function {name}() -> int{{ let {name}_x: int = 1; return {name}_x; }}"
+
+    parser = Parser(Lexer(text))
+    program = parser.parse_program()
+    assert parser.errors == []
+    assert program.statements[0].function_name.identifier_literal is SYMBOLS.intern(
+        "".join(parts)
+    )
+
+    del parser, program, name, text
+    gc.collect()
+
+    # a name the table still held would come back instead of the new one
+    again = "".join(parts)
+    assert SYMBOLS.intern(again) is again
@@ -0,0 +1,115 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "the_supa_awesome_compiler"))
+
+from _AST import (  # noqa: E402
+    BooleanLiteral,
+    ExpressionStatement,
+    InfixExpression,
+    IntegerLiteral,
+    NodeTransformer,
+    NodeVisitor,
+    Program,
+)
+
+
+def program() -> Program:
+    tree = Program()
+    tree.statements.append(
+        ExpressionStatement(InfixExpression(IntegerLiteral(1), "+", IntegerLiteral(2)))
+    )
+    return tree
+
+
+def test_base_visitor_walks_a_tree():
+    assert NodeVisitor().visit(program()) is None
+
+
+def test_base_transformer_returns_the_same_tree():
+    tree = program()
+    assert NodeTransformer().visit(tree) is tree
+
+
+class Collector(NodeVisitor):
+    def __init__(self) -> None:
+        self.seen: list[str] = []
+
+    def visit_integer_literal(self, node: IntegerLiteral) -> None:
+        self.seen.append(f"int {node.int_literal}")
+
+
+class Doubler(Collector):
+    def visit_integer_literal(self, node: IntegerLiteral) -> None:
+        self.seen.append(f"int {node.int_literal * 2}")
+
+
+class Inheritor(Collector):
+    pass
+
+
+def seen(visitor: Collector) -> list[str]:
+    visitor.visit(program())
+    return visitor.seen
+
+
+def test_handler_tables_are_per_class():
+    assert seen(Collector()) == ["int 1", "int 2"]
+    assert seen(Doubler()) == ["int 2", "int 4"]
+    assert seen(Inheritor()) == ["int 1", "int 2"]
+
+    # a subclass made after the parent's table was filled gets its own
+    class Late(Collector):
+        def visit_integer_literal(self, node: IntegerLiteral) -> None:
+            self.seen.append("late")
+
+    assert seen(Late()) == ["late", "late"]
+
+    # and overriding a handler never changes the parent's
+    assert seen(Collector()) == ["int 1", "int 2"]
+    assert NodeVisitor().visit(IntegerLiteral(1)) is None
+
+
+class Splitter(NodeTransformer):
+    # 1 + 2 becomes the statements 1 and 2, and true is removed
+    def visit_expression_statement(self, node: ExpressionStatement):
+        expression = node.expression
+        if type(expression) is BooleanLiteral:
+            return None
+        if type(expression) is InfixExpression:
+            return [
+                ExpressionStatement(expression.left_node),
+                ExpressionStatement(expression.right_node),
+            ]
+        return node
+
+
+def test_transformer_splices_lists_and_drops_none():
+    tree = program()
+    kept = ExpressionStatement(IntegerLiteral(3))
+    tree.statements.insert(0, ExpressionStatement(BooleanLiteral(True)))
+    tree.statements.append(kept)
+    statements = list(tree.statements)
+
+    result = Splitter().visit(tree)
+
+    assert [statement.expression.int_literal for statement in result.statements] == [
+        1,
+        2,
+        3,
+    ]
+    assert result.statements[2] is kept
+
+    # copy on write: the tree passed in is not modified
+    assert result is not tree
+    assert tree.statements == statements
+
+
+def test_transformer_keeps_unchanged_lists():
+    tree = Program()
+    tree.statements.append(ExpressionStatement(IntegerLiteral(3)))
+    statements = tree.statements
+
+    assert Splitter().visit(tree) is tree
+    assert tree.statements is statements
@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
 from enum import Enum
-from typing import Optional, cast
+from typing import Any, BinaryIO, Callable, Iterator, Optional, TextIO, cast
 
 
 class NodeType(Enum):
@@ -29,6 +29,7 @@ class NodeType(Enum):
     # LOOPS
     WHILE_LOOP = "WHILE_LOOP"
     FOR_LOOP = "FOR_LOOP"
+    LOOP_ATTRIBUTE = "LOOP_ATTRIBUTE"
 
     # FUNCTIONS
     FUNCTION_CALL = "FUNCTION_CALL"
@@ -40,9 +41,12 @@ class NodeType(Enum):
 
 
 class Node(ABC):
-    @abstractmethod
+    __slots__ = ()
+
+    node_type: NodeType
+
     def type(self) -> NodeType:
-        pass
+        return self.node_type
 
     @abstractmethod
     def json_repr(self) -> dict:
@@ -50,22 +54,23 @@ class Node(ABC):
 
 
 class Statement(Node):
-    pass
+    __slots__ = ()
 
 
 class Expression(Node):
-    pass
+    __slots__ = ()
 
 
 class Program(Node):
+    __slots__ = ("statements",)
+
+    node_type = NodeType.PROGRAM
+
     def __init__(self):
         self.statements: list[
             Statement
         ] = []  # I'm assuming we do this for statements and we eval expressions
 
-    def type(self) -> NodeType:
-        return NodeType.PROGRAM
-
     def json_repr(self) -> dict:
         return {
             "type": self.type().value,
@@ -75,14 +80,34 @@ class Program(Node):
             ],
         }
 
+    def write_json(self, fp: TextIO, indent: Optional[int] = None) -> None:
+        # same output as json.dump(self.json_repr(), fp), see _ast_json
+        from _ast_json import write_json
+
+        write_json(self, fp, indent)
+
+    def dump(self, fp: BinaryIO) -> None:
+        # binary format, see _ast_arena; the whole tree is converted to an
+        # arena before anything is written
+        from _ast_arena import ASTArena
+
+        ASTArena.from_node(self).dump(fp)
+
+    @staticmethod
+    def load(fp: BinaryIO) -> "Program":
+        from _ast_arena import ASTArena
+
+        return ASTArena.load(fp).to_node()
+
 
 class ExpressionStatement(Statement):
+    __slots__ = ("expression",)
+
+    node_type = NodeType.EXPRESSION_STATEMENT
+
     def __init__(self, expression: Optional[Expression] = None):
         self.expression = expression
 
-    def type(self) -> NodeType:
-        return NodeType.EXPRESSION_STATEMENT
-
     def json_repr(self) -> dict:
         return {
             "type": self.type().value,
@@ -91,23 +116,25 @@ class ExpressionStatement(Statement):
 
 
 class IdentifierLiteral(Expression):
+    __slots__ = ("identifier_literal",)
+
+    node_type = NodeType.IDENTIFIER_LITERAL
+
     def __init__(self, identifier: str):
         self.identifier_literal = identifier
 
-    def type(self) -> NodeType:
-        return NodeType.IDENTIFIER_LITERAL
-
     def json_repr(self) -> dict:
         return {"type": self.type().value, "identifier": self.identifier_literal}
 
 
 class BlockStatement(Statement):
+    __slots__ = ("statements",)
+
+    node_type = NodeType.BLOCK_STATEMENT
+
     def __init__(self, statements: list[Statement] = None):
         self.statements = statements if statements else []
 
-    def type(self) -> NodeType:
-        return NodeType.BLOCK_STATEMENT
-
     def json_repr(self) -> dict:
         return {
             "type": self.type().value,
@@ -116,17 +143,22 @@ class BlockStatement(Statement):
 
 
 class ReturnStatement(Statement):
+    __slots__ = ("return_value",)
+
+    node_type = NodeType.RETURN_STATEMENT
+
     def __init__(self, return_value: Expression = None):
         self.return_value = return_value
 
-    def type(self) -> NodeType:
-        return NodeType.RETURN_STATEMENT
-
     def json_repr(self) -> dict:
         return {"type": self.type().value, "expression": self.return_value.json_repr()}
 
 
 class FunctionStatement(Statement):
+    __slots__ = ("function_name", "parameters", "body", "return_type")
+
+    node_type = NodeType.FUNCTION_STATEMENT
+
     def __init__(
         self,
         parameters: list[IdentifierLiteral] = None,
@@ -139,9 +171,6 @@ class FunctionStatement(Statement):
         self.body = body
         self.return_type = return_type
 
-    def type(self) -> NodeType:
-        return NodeType.FUNCTION_STATEMENT
-
     def json_repr(self) -> dict:
         return {
             "type": self.type().value,
@@ -153,6 +182,10 @@ class FunctionStatement(Statement):
 
 
 class IfStatement(Statement):
+    __slots__ = ("condition", "consequence", "alternative")
+
+    node_type = NodeType.IF_STATEMENT
+
     def __init__(
         self,
         condition: Expression = None,
@@ -163,9 +196,6 @@ class IfStatement(Statement):
         self.consequence = consequence
         self.alternative = alternative if alternative is not None else BlockStatement()
 
-    def type(self) -> NodeType:
-        return NodeType.IF_STATEMENT
-
     def json_repr(self) -> dict:
         return {
             "type": self.type().value,
@@ -176,6 +206,10 @@ class IfStatement(Statement):
 
 
 class AssignmentStatement(Statement):
+    __slots__ = ("identifier", "value", "value_type", "size")
+
+    node_type = NodeType.ASSIGNMENT_STATEMENT
+
     def __init__(
         self,
         identifier: IdentifierLiteral = None,
@@ -188,9 +222,6 @@ class AssignmentStatement(Statement):
         self.value_type = value_type
         self.size = size
 
-    def type(self):
-        return NodeType.ASSIGNMENT_STATEMENT
-
     def json_repr(self) -> dict:
         return {
             "type": self.type().value,
@@ -202,13 +233,14 @@ class AssignmentStatement(Statement):
 
 
 class ReassignmentStatement(Statement):
+    __slots__ = ("identifier", "value")
+
+    node_type = NodeType.REASSIGNMENT_STATEMENT
+
     def __init__(self, identifier: IdentifierLiteral = None, value: Expression = None):
         self.identifier = identifier
         self.value = value
 
-    def type(self) -> NodeType:
-        return NodeType.REASSIGNMENT_STATEMENT
-
     def json_repr(self) -> dict:
         return {
             "type": self.type().value,
@@ -218,14 +250,15 @@ class ReassignmentStatement(Statement):
 
 
 class InfixExpression(Expression):
+    __slots__ = ("left_node", "operator", "right_node")
+
+    node_type = NodeType.INFIX_EXPRESSION
+
     def __init__(self, left_node: Expression, operator: str, right_node: Expression):
         self.left_node = left_node
         self.operator = operator
         self.right_node = right_node
 
-    def type(self) -> NodeType:
-        return NodeType.INFIX_EXPRESSION
-
     def json_repr(self) -> dict:
         return {
             "type": self.type().value,
@@ -236,13 +269,14 @@ class InfixExpression(Expression):
 
 
 class PrefixExpression(Expression):
+    __slots__ = ("operator", "operand")
+
+    node_type = NodeType.PREFIX_EXPRESSION
+
     def __init__(self, operator: str = None, operand: Expression = None):
         self.operator = operator
         self.operand = operand
 
-    def type(self) -> NodeType:
-        return NodeType.PREFIX_EXPRESSION
-
     def json_repr(self) -> dict:
         return {
             "type": self.type().value,
@@ -252,39 +286,46 @@ class PrefixExpression(Expression):
 
 
 class IntegerLiteral(Expression):
+    __slots__ = ("int_literal",)
+
+    node_type = NodeType.INTEGER_LITERAL
+
     def __init__(self, int_literal: Optional[int] = None):
         self.int_literal = int_literal
 
-    def type(self) -> NodeType:
-        return NodeType.INTEGER_LITERAL
-
     def json_repr(self) -> dict:
         return {"type": self.type().value, "literal": self.int_literal}
 
 
 class FloatLiteral(Expression):
+    __slots__ = ("float_literal",)
+
+    node_type = NodeType.FLOAT_LITERAL
+
     def __init__(self, float_literal: Optional[float] = None):
         self.float_literal = float_literal
 
-    def type(self) -> NodeType:
-        return NodeType.FLOAT_LITERAL
-
     def json_repr(self) -> dict:
         return {"type": self.type().value, "literal": self.float_literal}
 
 
 class BooleanLiteral(Expression):
+    __slots__ = ("boolean_value",)
+
+    node_type = NodeType.BOOLEAN_EXPRESSION
+
     def __init__(self, boolean_value: bool = None):
         self.boolean_value = boolean_value
 
-    def type(self) -> NodeType:
-        return NodeType.BOOLEAN_EXPRESSION
-
     def json_repr(self) -> dict:
         return {"type": self.type().value, "boolean_value": self.boolean_value}
 
 
 class WhileLoop(Statement):
+    __slots__ = ("condition", "consequence", "alternative")
+
+    node_type = NodeType.WHILE_LOOP
+
     def __init__(
         self,
         condition: Expression = None,
@@ -295,9 +336,6 @@ class WhileLoop(Statement):
         self.consequence = consequence
         self.alternative = alternative if alternative is not None else BlockStatement()
 
-    def type(self) -> NodeType:
-        return NodeType.WHILE_LOOP
-
     def json_repr(self) -> dict:
         return {
             "type": self.type().value,
@@ -307,23 +345,58 @@ class WhileLoop(Statement):
         }
 
 
+# the hints #[name] or #[name(n)] can give a for loop
+LOOP_ATTRIBUTES = frozenset(("unroll", "vectorize"))
+
+
+class LoopAttribute(Node):
+    __slots__ = ("name", "argument")
+
+    node_type = NodeType.LOOP_ATTRIBUTE
+
+    def __init__(self, name: str = None, argument: Optional[int] = None):
+        self.name = name
+        self.argument = argument
+
+    def json_repr(self) -> dict:
+        return {
+            "type": self.type().value,
+            "name": self.name,
+            "argument": self.argument,
+        }
+
+
 class ForLoop(Statement):
+    # for identifier in range_start..range_end step step { block_statement },
+    # counting up from range_start while below range_end. Both bounds and
+    # the step are evaluated once, before the first iteration; without a
+    # step the loop counts in ones.
+    __slots__ = (
+        "identifier",
+        "range_start",
+        "block_statement",
+        "range_end",
+        "step",
+        "attributes",
+    )
+
+    node_type = NodeType.FOR_LOOP
+
     def __init__(
         self,
         identifier: IdentifierLiteral = None,
-        range_start: IntegerLiteral = None,
+        range_start: Expression = None,
         block_statement: BlockStatement = None,
-        condition: InfixExpression = None,
-        range_end: IntegerLiteral = None,
+        range_end: Expression = None,
+        step: Optional[Expression] = None,
+        attributes: list[LoopAttribute] = None,
     ):
         self.identifier = identifier
         self.range_start = range_start
         self.block_statement = block_statement
-        self.condition = condition
         self.range_end = range_end
-
-    def type(self):
-        return NodeType.FOR_LOOP
+        self.step = step
+        self.attributes = attributes if attributes is not None else []
 
     def json_repr(self) -> dict:
         return {
@@ -332,17 +405,20 @@ class ForLoop(Statement):
             "range_start": self.range_start.json_repr(),
             "block_statement": self.block_statement.json_repr(),
             "range_end": self.range_end.json_repr(),
+            "step": self.step.json_repr() if self.step is not None else None,
+            "attributes": [attribute.json_repr() for attribute in self.attributes],
         }
 
 
 class FunctionParameter(Expression):
+    __slots__ = ("parameter_name", "parameter_type")
+
+    node_type = NodeType.FUNCTION_PARAMETER
+
     def __init__(self, parameter_name: str = None, parameter_type: str = None):
         self.parameter_name = parameter_name
         self.parameter_type = parameter_type
 
-    def type(self) -> NodeType:
-        return NodeType.FUNCTION_PARAMETER
-
     def json_repr(self) -> dict:
         return {
             "type": self.type().value,
@@ -352,6 +428,10 @@ class FunctionParameter(Expression):
 
 
 class CallExpression(Expression):
+    __slots__ = ("function_name", "arguments")
+
+    node_type = NodeType.FUNCTION_CALL
+
     def __init__(
         self,
         function_name: IdentifierLiteral = None,
@@ -360,9 +440,6 @@ class CallExpression(Expression):
         self.function_name = function_name
         self.arguments = arguments
 
-    def type(self) -> NodeType:
-        return NodeType.FUNCTION_CALL
-
     def json_repr(self) -> dict:
         return {
             "type": self.type().value,
@@ -372,12 +449,13 @@ class CallExpression(Expression):
 
 
 class ArrayLiteral(Expression):
+    __slots__ = ("values",)
+
+    node_type = NodeType.ARRAY_LITERAL
+
     def __init__(self, values: list[Expression] = None):
         self.values = values
 
-    def type(self) -> NodeType:
-        return NodeType.ARRAY_LITERAL
-
     def json_repr(self) -> dict:
         return {
             "type": self.type().value,
@@ -386,16 +464,143 @@ class ArrayLiteral(Expression):
 
 
 class IndexExpression(Expression):
+    __slots__ = ("array", "index")
+
+    node_type = NodeType.INDEX
+
     def __init__(self, array: Expression = None, index: Expression = None):
         self.array = array
         self.index = index
 
-    def type(self) -> NodeType:
-        return NodeType.INDEX
-
     def json_repr(self) -> dict:
         return {
             "type": self.type().name,
             "array": self.array.json_repr(),
             "index": self.index.json_repr(),
         }
+
+
+# field values that are not nodes; checked by exact type first because
+# isinstance against the Node ABC is several times slower
+SCALAR_TYPES = frozenset((type(None), str, int, float, bool))
+
+
+def iter_child_nodes(node: Node) -> Iterator[Node]:
+    for field in type(node).__slots__:
+        value = getattr(node, field)
+        if type(value) in SCALAR_TYPES:
+            continue
+        elif type(value) is list:
+            yield from (item for item in value if isinstance(item, Node))
+        elif isinstance(value, Node):
+            yield value
+
+
+def copy_node(node: Node, changes: Optional[dict[str, Any]] = None) -> Node:
+    # a shallow copy, with the fields in changes replaced
+    node_class = type(node)
+    copy = node_class.__new__(node_class)
+
+    for field in node_class.__slots__:
+        if changes and field in changes:
+            setattr(copy, field, changes[field])
+        else:
+            setattr(copy, field, getattr(node, field))
+
+    return copy
+
+
+Handler = Callable[[Any, Node], Any]
+
+
+class HandlerTable(dict[type, Handler]):
+    # node class -> handler of one visitor class, filled in on first use so
+    # node classes defined later are dispatched as well
+    def __init__(self, visitor: type) -> None:
+        super().__init__()
+        self.visitor = visitor
+
+    def __missing__(self, node_class: type) -> Handler:
+        handler = getattr(
+            self.visitor,
+            f"visit_{node_class.node_type.value.lower()}",
+            self.visitor.generic_visit,
+        )
+        self[node_class] = handler
+
+        return handler
+
+
+class NodeVisitor:
+    # Calls visit_<node type> (visit_if_statement, visit_function_call,
+    # visit_index, ...) for each node and returns its result, or
+    # generic_visit when the visitor has no such method. Statements and
+    # expressions go through the same table; the handler of a node class is
+    # looked up once per visitor class, after that a visit is a dict lookup.
+    __handlers: HandlerTable
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        cls.__handlers = HandlerTable(cls)
+
+    def visit(self, node: Node) -> Any:
+        return self.__handlers[type(node)](self, node)
+
+    def generic_visit(self, node: Node) -> Any:
+        for child in iter_child_nodes(node):
+            self.visit(child)
+
+
+# __init_subclass__ only runs for subclasses, so NodeVisitor() walks too
+NodeVisitor._NodeVisitor__handlers = HandlerTable(NodeVisitor)
+
+
+class NodeTransformer(NodeVisitor):
+    # Rewrites a tree: each visit returns the node to put in place of the one
+    # visited. In a list, None drops the node and a list is spliced in.
+    # Nodes are copied on write: a node is only copied when one of its
+    # children was replaced, so subtrees shared with other trees, like the
+    # ones the incremental parser hands out again, are never modified.
+    def generic_visit(self, node: Node) -> Node:
+        changes = {}
+
+        for field in type(node).__slots__:
+            value = getattr(node, field)
+            if type(value) in SCALAR_TYPES:
+                continue
+            elif type(value) is list:
+                new_value = self.visit_list(value)
+            elif isinstance(value, Node):
+                new_value = self.visit(value)
+            else:
+                continue
+
+            if new_value is not value:
+                changes[field] = new_value
+
+        if not changes:
+            return node
+
+        return copy_node(node, changes)
+
+    def visit_list(self, items: list) -> list:
+        new_items = []
+        changed = False
+
+        for item in items:
+            if not isinstance(item, Node):
+                new_items.append(item)
+                continue
+
+            new_item = self.visit(item)
+            if new_item is item:
+                new_items.append(item)
+                continue
+
+            changed = True
+            if type(new_item) is list:
+                new_items.extend(new_item)
+            elif new_item is not None:
+                new_items.append(new_item)
+
+        return new_items if changed else items
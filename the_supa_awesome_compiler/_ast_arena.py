@@ -0,0 +1,420 @@
+import struct
+import sys
+
+from array import array
+from typing import Any, BinaryIO, Optional
+
+from _AST import Node, NodeType
+from _AST import (
+    Program,
+    ExpressionStatement,
+    AssignmentStatement,
+    ReturnStatement,
+    BlockStatement,
+    FunctionStatement,
+    ReassignmentStatement,
+    IfStatement,
+    WhileLoop,
+    ForLoop,
+    LoopAttribute,
+    CallExpression,
+    ArrayLiteral,
+    IndexExpression,
+)
+from _AST import InfixExpression, PrefixExpression
+from _AST import IntegerLiteral, FloatLiteral, IdentifierLiteral, BooleanLiteral
+from _AST import FunctionParameter
+from _symbols import SYMBOLS
+
+
+# the position of a class in this list is its kind id in an arena, so only
+# ever append to it
+NODE_CLASSES: list[type[Node]] = [
+    Program,
+    ExpressionStatement,
+    AssignmentStatement,
+    ReturnStatement,
+    BlockStatement,
+    FunctionStatement,
+    ReassignmentStatement,
+    IfStatement,
+    WhileLoop,
+    ForLoop,
+    CallExpression,
+    ArrayLiteral,
+    IndexExpression,
+    InfixExpression,
+    PrefixExpression,
+    IntegerLiteral,
+    FloatLiteral,
+    IdentifierLiteral,
+    BooleanLiteral,
+    FunctionParameter,
+    LoopAttribute,
+]
+
+KIND_IDS: dict[type[Node], int] = {cls: kind for kind, cls in enumerate(NODE_CLASSES)}
+
+# field name -> position among the fields of a node, per kind
+FIELD_POSITIONS: list[dict[str, int]] = [
+    {name: position for position, name in enumerate(cls.__slots__)}
+    for cls in NODE_CLASSES
+]
+
+# A field is one int: a payload shifted left by two and a tag in the low bits.
+TAG_NONE = 0
+TAG_NODE = 1  # payload is a node index
+TAG_LIST = 2  # payload is an index into items: the length, then the elements
+TAG_VALUE = 3  # payload is an index into values
+
+# Binary format, little-endian: the header, then the kinds, offsets, fields
+# and items columns, the value table and the string bytes, each section
+# padded to a multiple of 8 bytes. Every value is one kind byte in
+# value_kinds and one 8-byte slot in value_data: an int64, a float64, a bool
+# as 0/1, or the start and length of its UTF-8 bytes in strings.
+MAGIC = b"MAST"
+# version 2 changed the fields of ForLoop
+FORMAT_VERSION = 2
+
+# magic, version, flags (unused), nodes, fields, items, values, string bytes
+HEADER = struct.Struct("<4sHHIIIII")
+
+INT_SLOT = struct.Struct("<q")
+FLOAT_SLOT = struct.Struct("<d")
+STRING_SLOT = struct.Struct("<II")
+
+VALUE_STRING = 0
+VALUE_INT = 1
+VALUE_FLOAT = 2
+VALUE_BOOL = 3
+VALUE_BIG_INT = 4  # does not fit an int64, stored as its decimal string
+
+INT64 = range(-(1 << 63), 1 << 63)
+
+ITEM_SIZES = {"B": 1, "I": 4, "i": 4}
+
+
+def write_section(fp: BinaryIO, column: array | memoryview, typecode: str) -> None:
+    if sys.byteorder != "little" and ITEM_SIZES[typecode] > 1:
+        column = array(typecode, column)
+        column.byteswap()
+
+    size = len(column) * ITEM_SIZES[typecode]
+    fp.write(column)
+    fp.write(bytes(-size % 8))
+
+
+def read_section(
+    view: memoryview, offset: int, count: int, typecode: str
+) -> tuple[array | memoryview, int]:
+    # a zero-copy view into the loaded bytes, unless they need byte swapping
+    size = count * ITEM_SIZES[typecode]
+    column: array | memoryview = view[offset : offset + size].cast(typecode)
+
+    if sys.byteorder != "little" and ITEM_SIZES[typecode] > 1:
+        column = array(typecode, column)
+        column.byteswap()
+
+    return column, offset + size + (-size % 8)
+
+
+class ASTArena:
+    # A whole AST in a few flat arrays instead of one object per node. Nodes
+    # are numbered in pre-order and the root is node 0. Node i has the class
+    # NODE_CLASSES[kinds[i]] and its fields are
+    # fields[offsets[i] : offsets[i] + len(__slots__)], in __slots__ order.
+    # A node that is referenced twice, like a hash-consed expression, is
+    # stored once. Strings, numbers and booleans are stored once each in
+    # values.
+    def __init__(self) -> None:
+        self.kinds = array("B")
+        self.offsets = array("I")
+        self.fields = array("i")
+        self.items = array("i")
+        self.values: list[Any] = []
+
+        self.__value_ids: dict[tuple[type, Any], int] = {}
+
+    @classmethod
+    def from_node(cls, root: Node) -> "ASTArena":
+        arena = cls()
+        kinds, offsets, fields = arena.kinds, arena.offsets, arena.fields
+        encode = arena.__encode
+        indices: dict[int, int] = {}
+
+        # (node, column, position): the node still has to be added, and its
+        # index patched into column[position] once it has one
+        stack: list[tuple[Node, Optional[array], int]] = [(root, None, 0)]
+
+        while stack:
+            node, column, position = stack.pop()
+
+            index = indices.get(id(node))
+            added = index is not None
+            if not added:
+                index = indices[id(node)] = len(kinds)
+
+            if column is not None:
+                column[position] = index << 2 | TAG_NODE
+            if added:
+                continue
+
+            node_class = type(node)
+            kinds.append(KIND_IDS[node_class])
+            offsets.append(len(fields))
+
+            children: list[tuple[Node, array, int]] = []
+            for name in node_class.__slots__:
+                fields.append(
+                    encode(getattr(node, name), fields, len(fields), children)
+                )
+
+            # reversed, so the first child is popped, and numbered, first
+            stack.extend(reversed(children))
+
+        return arena
+
+    def __encode(
+        self,
+        value: Any,
+        column: array,
+        position: int,
+        children: list[tuple[Node, array, int]],
+    ) -> int:
+        # the encoded value goes to column[position]
+        if value is None:
+            return TAG_NONE
+
+        value_type = type(value)
+
+        if value_type in KIND_IDS:
+            children.append((value, column, position))
+            return TAG_NODE
+
+        if value_type is list:
+            # the slots of the whole list are taken first, so the items of a
+            # nested list go after them instead of in between
+            items = self.items
+            start = len(items)
+            items.append(len(value))
+            items.extend([0] * len(value))
+            for item_position, item in enumerate(value, start + 1):
+                items[item_position] = self.__encode(
+                    item, items, item_position, children
+                )
+            return start << 2 | TAG_LIST
+
+        # 1, 1.0 and True are equal and hash alike, so the type is part of
+        # the key
+        key = (value_type, value)
+        value_id = self.__value_ids.get(key)
+        if value_id is None:
+            value_id = self.__value_ids[key] = len(self.values)
+            self.values.append(value)
+        return value_id << 2 | TAG_VALUE
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def dump(self, fp: BinaryIO) -> None:
+        # Only the value table is built up front, everything else is
+        # written straight from the columns. The arena itself has to be
+        # complete first: the header holds the length of every column and
+        # each column is written in one piece, so a tree cannot be written
+        # a node at a time.
+        value_kinds = array("B")
+        value_data = bytearray()
+        strings = bytearray()
+
+        for value in self.values:
+            value_type = type(value)
+
+            if value_type is str or (value_type is int and value not in INT64):
+                encoded = (value if value_type is str else str(value)).encode()
+                value_kinds.append(VALUE_STRING if value_type is str else VALUE_BIG_INT)
+                value_data += STRING_SLOT.pack(len(strings), len(encoded))
+                strings += encoded
+            elif value_type is int:
+                value_kinds.append(VALUE_INT)
+                value_data += INT_SLOT.pack(value)
+            elif value_type is float:
+                value_kinds.append(VALUE_FLOAT)
+                value_data += FLOAT_SLOT.pack(value)
+            elif value_type is bool:
+                value_kinds.append(VALUE_BOOL)
+                value_data += INT_SLOT.pack(value)
+            else:
+                raise ValueError(f"Cannot store a {value_type.__name__} in an AST")
+
+        fp.write(
+            HEADER.pack(
+                MAGIC,
+                FORMAT_VERSION,
+                0,
+                len(self.kinds),
+                len(self.fields),
+                len(self.items),
+                len(self.values),
+                len(strings),
+            )
+        )
+        write_section(fp, self.kinds, "B")
+        write_section(fp, self.offsets, "I")
+        write_section(fp, self.fields, "i")
+        write_section(fp, self.items, "i")
+        write_section(fp, value_kinds, "B")
+        fp.write(value_data)
+        write_section(fp, strings, "B")
+
+    @classmethod
+    def load(cls, fp: BinaryIO) -> "ASTArena":
+        return cls.from_buffer(fp.read())
+
+    @classmethod
+    def from_buffer(cls, buffer: bytes | bytearray | memoryview) -> "ASTArena":
+        # The columns stay views into buffer; only the values are decoded.
+        view = memoryview(buffer)
+        if len(view) < HEADER.size:
+            raise ValueError("Not a Marsh AST file: it is too short")
+
+        magic, version, _, nodes, fields, items, values, string_bytes = (
+            HEADER.unpack_from(view)
+        )
+        if magic != MAGIC:
+            raise ValueError("Not a Marsh AST file: wrong magic bytes")
+        if version > FORMAT_VERSION:
+            raise ValueError(
+                f"Marsh AST format version {version} is newer than {FORMAT_VERSION}"
+            )
+
+        arena = cls()
+        offset = HEADER.size
+        arena.kinds, offset = read_section(view, offset, nodes, "B")
+
+        if version < 2 and KIND_IDS[ForLoop] in arena.kinds:
+            raise ValueError(
+                f"Marsh AST format version {version} has the old for loop fields, "
+                "parse the source again"
+            )
+
+        arena.offsets, offset = read_section(view, offset, nodes, "I")
+        arena.fields, offset = read_section(view, offset, fields, "i")
+        arena.items, offset = read_section(view, offset, items, "i")
+        value_kinds, offset = read_section(view, offset, values, "B")
+
+        data_offset = offset
+        strings = view[
+            data_offset + 8 * values : data_offset + 8 * values + string_bytes
+        ]
+
+        for slot, kind in zip(
+            range(data_offset, data_offset + 8 * values, 8), value_kinds
+        ):
+            if kind == VALUE_STRING or kind == VALUE_BIG_INT:
+                start, length = STRING_SLOT.unpack_from(view, slot)
+                text = str(strings[start : start + length], "utf-8")
+                arena.values.append(
+                    SYMBOLS.intern(text) if kind == VALUE_STRING else int(text)
+                )
+            elif kind == VALUE_INT:
+                arena.values.append(INT_SLOT.unpack_from(view, slot)[0])
+            elif kind == VALUE_FLOAT:
+                arena.values.append(FLOAT_SLOT.unpack_from(view, slot)[0])
+            else:
+                arena.values.append(bool(INT_SLOT.unpack_from(view, slot)[0]))
+
+        return arena
+
+    def decode(self, field: int) -> Any:
+        tag = field & 3
+        payload = field >> 2
+
+        if tag == TAG_NODE:
+            return NodeView(self, payload)
+        if tag == TAG_VALUE:
+            return self.values[payload]
+        if tag == TAG_LIST:
+            length = self.items[payload]
+            return [
+                self.decode(item)
+                for item in self.items[payload + 1 : payload + 1 + length]
+            ]
+        return None
+
+    def field(self, index: int, name: str) -> Any:
+        position = FIELD_POSITIONS[self.kinds[index]][name]
+        return self.decode(self.fields[self.offsets[index] + position])
+
+    def view(self, index: int = 0) -> "NodeView":
+        return NodeView(self, index)
+
+    def to_node(self) -> Node:
+        # Rebuilds ordinary node objects, all of them at once and without
+        # recursion: the objects are created first and their fields filled
+        # in afterwards.
+        nodes = [NODE_CLASSES[kind].__new__(NODE_CLASSES[kind]) for kind in self.kinds]
+        items = self.items
+        values = self.values
+
+        def decode(field: int) -> Any:
+            tag = field & 3
+            payload = field >> 2
+
+            if tag == TAG_NODE:
+                return nodes[payload]
+            if tag == TAG_VALUE:
+                return values[payload]
+            if tag == TAG_LIST:
+                length = items[payload]
+                return [
+                    decode(item) for item in items[payload + 1 : payload + 1 + length]
+                ]
+            return None
+
+        fields = self.fields
+        for node, offset in zip(nodes, self.offsets):
+            for position, name in enumerate(type(node).__slots__):
+                setattr(node, name, decode(fields[offset + position]))
+
+        return nodes[0]
+
+
+class NodeView:
+    # Read-only stand-in for node index of an arena. Attribute access works
+    # like on the node itself: child nodes come back as views, lists as
+    # lists of views and everything else as the stored value.
+    __slots__ = ("arena", "index")
+
+    def __init__(self, arena: ASTArena, index: int) -> None:
+        self.arena = arena
+        self.index = index
+
+    def __getattr__(self, name: str) -> Any:
+        arena = self.arena
+        position = FIELD_POSITIONS[arena.kinds[self.index]].get(name)
+
+        if position is None:
+            raise AttributeError(
+                f"{self.node_class().__name__} view has no attribute {name!r}"
+            )
+
+        return arena.decode(arena.fields[arena.offsets[self.index] + position])
+
+    def __eq__(self, other: object) -> bool:
+        return (
+            isinstance(other, NodeView)
+            and other.arena is self.arena
+            and other.index == self.index
+        )
+
+    def __hash__(self) -> int:
+        return hash((id(self.arena), self.index))
+
+    def __repr__(self) -> str:
+        return f"<{self.node_class().__name__} view {self.index}>"
+
+    def node_class(self) -> type[Node]:
+        return NODE_CLASSES[self.arena.kinds[self.index]]
+
+    def type(self) -> NodeType:
+        return self.node_class().node_type
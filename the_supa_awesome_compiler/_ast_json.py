@@ -0,0 +1,262 @@
+import json
+
+from itertools import repeat
+from json.encoder import encode_basestring_ascii
+from operator import attrgetter
+from types import GeneratorType
+from typing import Any, Callable, Optional, TextIO
+
+from _AST import (
+    Node,
+    Program,
+    ExpressionStatement,
+    AssignmentStatement,
+    FunctionStatement,
+    FunctionParameter,
+    BlockStatement,
+    ReturnStatement,
+    ReassignmentStatement,
+    IfStatement,
+    WhileLoop,
+    ForLoop,
+    LoopAttribute,
+    BooleanLiteral,
+    PrefixExpression,
+    InfixExpression,
+    CallExpression,
+    IntegerLiteral,
+    FloatLiteral,
+    IdentifierLiteral,
+    ArrayLiteral,
+    IndexExpression,
+)
+
+
+# pieces of output collected before each write to the file
+FLUSH_SIZE = 1 << 13
+
+
+def type_value(node: Node) -> str:
+    return node.node_type.value
+
+
+def wrapped_statements(node: Program):
+    # Program.json_repr puts every statement in an object keyed by its type
+    return ({statement.node_type.value: statement} for statement in node.statements)
+
+
+# The keys json_repr() writes for each node class, in the same order, and how
+# to get their values. A node value is written as its own object, a list or
+# generator as an array. Classes without an entry fall back to json_repr().
+SCHEMA: dict[type[Node], tuple[tuple[str, Callable[[Node], Any]], ...]] = {
+    Program: (
+        ("type", type_value),
+        ("statements", wrapped_statements),
+    ),
+    ExpressionStatement: (
+        ("type", type_value),
+        ("expression", attrgetter("expression")),
+    ),
+    IdentifierLiteral: (
+        ("type", type_value),
+        ("identifier", attrgetter("identifier_literal")),
+    ),
+    BlockStatement: (
+        ("type", type_value),
+        ("statements", attrgetter("statements")),
+    ),
+    ReturnStatement: (
+        ("type", type_value),
+        ("expression", attrgetter("return_value")),
+    ),
+    FunctionStatement: (
+        ("type", type_value),
+        ("name", attrgetter("function_name.identifier_literal")),
+        ("parameters", attrgetter("parameters")),
+        ("body", attrgetter("body")),
+        ("return_type", attrgetter("return_type")),
+    ),
+    IfStatement: (
+        ("type", type_value),
+        ("condition", attrgetter("condition")),
+        ("consequence", attrgetter("consequence")),
+        ("alternative", attrgetter("alternative")),
+    ),
+    AssignmentStatement: (
+        ("type", type_value),
+        ("identifier", attrgetter("identifier.identifier_literal")),
+        ("value", attrgetter("value")),
+        ("value_type", attrgetter("value_type")),
+        ("size", attrgetter("size")),
+    ),
+    ReassignmentStatement: (
+        ("type", type_value),
+        ("identifier", attrgetter("identifier")),
+        ("value", attrgetter("value")),
+    ),
+    InfixExpression: (
+        ("type", type_value),
+        ("left_node", attrgetter("left_node")),
+        ("operator", attrgetter("operator")),
+        ("right_node", attrgetter("right_node")),
+    ),
+    PrefixExpression: (
+        ("type", type_value),
+        ("operator", attrgetter("operator")),
+        ("operand", attrgetter("operand")),
+    ),
+    IntegerLiteral: (
+        ("type", type_value),
+        ("literal", attrgetter("int_literal")),
+    ),
+    FloatLiteral: (
+        ("type", type_value),
+        ("literal", attrgetter("float_literal")),
+    ),
+    BooleanLiteral: (
+        ("type", type_value),
+        ("boolean_value", attrgetter("boolean_value")),
+    ),
+    WhileLoop: (
+        ("type", type_value),
+        ("condition", attrgetter("condition")),
+        ("consequence", attrgetter("consequence")),
+        ("alternative", attrgetter("alternative")),
+    ),
+    ForLoop: (
+        ("type", type_value),
+        ("identifier", attrgetter("identifier")),
+        ("range_start", attrgetter("range_start")),
+        ("block_statement", attrgetter("block_statement")),
+        ("range_end", attrgetter("range_end")),
+        ("step", attrgetter("step")),
+        ("attributes", attrgetter("attributes")),
+    ),
+    LoopAttribute: (
+        ("type", type_value),
+        ("name", attrgetter("name")),
+        ("argument", attrgetter("argument")),
+    ),
+    FunctionParameter: (
+        ("type", type_value),
+        ("parameter_name", attrgetter("parameter_name")),
+        ("parameter_type", attrgetter("parameter_type")),
+    ),
+    CallExpression: (
+        ("type", type_value),
+        ("function", attrgetter("function_name")),
+        ("arguments", attrgetter("arguments")),
+    ),
+    ArrayLiteral: (
+        ("type", type_value),
+        ("values", attrgetter("values")),
+    ),
+    IndexExpression: (
+        ("type", lambda node: node.node_type.name),
+        ("array", attrgetter("array")),
+        ("index", attrgetter("index")),
+    ),
+}
+
+
+ENCODED_SCHEMA = {
+    node_class: tuple(
+        (encode_basestring_ascii(key) + ": ", getter) for key, getter in members
+    )
+    for node_class, members in SCHEMA.items()
+}
+
+
+def encode_scalar(value: Any) -> str:
+    if type(value) is str:
+        return encode_basestring_ascii(value)
+    if value is None:
+        return "null"
+    if value is True:
+        return "true"
+    if value is False:
+        return "false"
+    if type(value) is int:
+        return int.__repr__(value)
+    return json.dumps(value)
+
+
+def write_json(node: Node, fp: TextIO, indent: Optional[int] = None) -> None:
+    # Writes the same JSON as json.dump(node.json_repr(), fp, indent=indent)
+    # without building the dict first. Open objects and arrays are kept on
+    # an explicit stack of member iterators, so memory grows with the depth
+    # of the tree rather than its size and deep trees cannot overflow the
+    # recursion limit.
+    parts: list[str] = []
+
+    # what goes before the first and the following members at each depth
+    newline, separator = ("", ", ") if indent is None else ("\n", ",")
+    firsts = [newline]
+    separators = [separator + newline]
+
+    # [members as (encoded key, value), closing bracket, no member written yet]
+    stack: list[list] = []
+    value: Any = node
+
+    while True:
+        schema = ENCODED_SCHEMA.get(type(value))
+
+        if schema is not None:
+            parts.append("{")
+            members = iter([(key, getter(value)) for key, getter in schema])
+            stack.append([members, "}", True])
+
+        elif isinstance(value, Node):
+            value = value.json_repr()
+            continue
+
+        elif type(value) is dict:
+            parts.append("{")
+            members = (
+                (encode_basestring_ascii(key) + ": ", item)
+                for key, item in value.items()
+            )
+            stack.append([members, "}", True])
+
+        elif type(value) is list or type(value) is GeneratorType:
+            parts.append("[")
+            stack.append([zip(repeat(""), value), "]", True])
+
+        else:
+            parts.append(encode_scalar(value))
+
+        if len(parts) >= FLUSH_SIZE:
+            fp.write("".join(parts))
+            parts.clear()
+
+        while stack:
+            frame = stack[-1]
+            member = next(frame[0], None)
+            depth = len(stack)
+
+            if member is None:
+                stack.pop()
+                if not frame[2]:
+                    parts.append(firsts[depth - 1])
+                parts.append(frame[1])
+                continue
+
+            if depth == len(firsts):
+                spaces = " " * (indent * depth) if indent is not None else ""
+                firsts.append(newline + spaces)
+                separators.append(separator + newline + spaces)
+
+            if frame[2]:
+                frame[2] = False
+                parts.append(firsts[depth])
+            else:
+                parts.append(separators[depth])
+
+            key, value = member
+            parts.append(key)
+            break
+
+        else:
+            break
+
+    fp.write("".join(parts))
@@ -2,10 +2,8 @@ from llvmlite import ir
 
 from _AST import (
     Node,
-    NodeType,
     Program,
     Expression,
-    Statement,
     ExpressionStatement,
     AssignmentStatement,
     FunctionStatement,
@@ -16,6 +14,7 @@ from _AST import (
     IfStatement,
     WhileLoop,
     ForLoop,
+    LoopAttribute,
     BooleanLiteral,
     PrefixExpression,
     InfixExpression,
@@ -25,29 +24,41 @@ from _AST import (
     IdentifierLiteral,
     ArrayLiteral,
     IndexExpression,
+    NodeVisitor,
 )
-from _environment import Environment
+from _constant_folder import ConstantFolder
+from _resolver import Resolver
+from _ssa import SSABuilder
+from _symbols import SYMBOLS
 
-from typing import cast, Optional
+from typing import Optional
 
 
-class Compiler:
-    def __init__(self):
+class Compiler(NodeVisitor):
+    def __init__(self, fold_constants: bool = True, ssa: bool = False):
         self.errors = []
+        self.fold_constants = fold_constants
+        # keep scalar variables in registers, with phis, instead of allocas
+        self.ssa = ssa
 
         self.__type_map = {
-            "int": ir.IntType(32),
-            "float": ir.FloatType(),
-            "bool": ir.IntType(1),
+            SYMBOLS.intern("int"): ir.IntType(32),
+            SYMBOLS.intern("float"): ir.FloatType(),
+            SYMBOLS.intern("bool"): ir.IntType(1),
         }
         self.module = ir.Module("main_module")
         self.__builder: Optional[ir.IRBuilder] = None
-        self.__environment = Environment()
+        # inserts at the start of the current function's entry block
+        self.__allocas: Optional[ir.IRBuilder] = None
+        self.__ssa_builder: Optional[SSABuilder] = None
 
-        self.__initialize_builtins()
+        # the value and type of every declaration, indexed by the slots the
+        # Resolver gave them; the value is None for a variable the
+        # SSABuilder keeps
+        self.__bindings: dict[int, int] = {}
+        self.__values: list[Optional[tuple[Optional[ir.Value], ir.Type]]] = []
 
-        self.__while_loop_count = 0
-        self.__for_loop_count = 0
+        self.__initialize_builtins()
 
     def __initialize_builtins(self):
         def __initialize_booleans():
@@ -63,81 +74,82 @@ class Compiler:
 
             return true_const, false_const
 
-        true_const, false_const = __initialize_booleans()
+        __initialize_booleans()
 
-        self.__environment.define("true", true_const, true_const.type)
-        self.__environment.define("false", false_const, false_const.type)
+    def compile(self, node: Node):
+        if self.fold_constants:
+            node = ConstantFolder().fold(node)
 
-    def __visit_parent_environment(
-        self, environment: Environment, node: IdentifierLiteral
-    ):
-        if (
-            environment.lookup(node.identifier_literal) is None
-            and environment.parent is not None
-        ):
-            return self.__visit_parent_environment(environment.parent, node)
+        resolver = Resolver()
+        node = resolver.resolve(node)
 
-        else:
-            if environment.lookup(node.identifier_literal) is None:
-                self.errors.append(f"Undefined variable {node.identifier_literal}")
-                raise Exception(
-                    f"Exception occurred: Undefined variable '{node.identifier_literal}'"
-                )
+        if resolver.errors:
+            self.errors.extend(resolver.errors)
+            raise Exception(f"Exception occurred: {'; '.join(resolver.errors)}")
 
-            else:
-                return environment.lookup(node.identifier_literal)
+        self.__bindings = resolver.slots
+        self.__values = [None] * len(resolver.declarations)
 
-    def compile(self, node: Node):
-        match node.type():
-            case NodeType.PROGRAM:
-                self.__visit_program(cast(Program, node))
+        self.visit(node)
 
-            case NodeType.FUNCTION_STATEMENT:
-                self.__visit_function_statement(cast(FunctionStatement, node))
+    def __slot(self, node: Node) -> int:
+        return self.__bindings[id(node)]
 
-            case NodeType.BLOCK_STATEMENT:
-                self.__visit_block_statement(cast(BlockStatement, node))
+    def __alloca(self, type: ir.Type) -> ir.AllocaInstr:
+        # Every slot is allocated once, in the entry block, however deep in
+        # loops its declaration is. That keeps the stack from growing with
+        # each iteration and lets mem2reg and SROA promote the slot.
+        ptr = self.__allocas.alloca(type)
 
-            case NodeType.RETURN_STATEMENT:
-                self.__visit_return_statement(cast(ReturnStatement, node))
+        if self.__builder.block is self.__allocas.block:
+            # the alloca went in ahead of the builder's position
+            self.__builder.position_at_end(self.__builder.block)
 
-            case NodeType.EXPRESSION_STATEMENT:
-                self.__visit_expression_statement(cast(ExpressionStatement, node))
+        return ptr
 
-            case NodeType.ASSIGNMENT_STATEMENT:
-                self.__visit_assignment_statement(cast(AssignmentStatement, node))
+    def __define(self, slot: int, value: ir.Value, type: ir.Type) -> None:
+        # the first store to a scalar variable
+        if self.ssa:
+            self.__values[slot] = (None, type)
+        else:
+            self.__values[slot] = (self.__alloca(type), type)
 
-            case NodeType.REASSIGNMENT_STATEMENT:
-                self.__visit_reassignment_statement(cast(ReassignmentStatement, node))
+        self.__store(slot, value)
 
-            case NodeType.IF_STATEMENT:
-                self.__visit_if_statement(cast(IfStatement, node))
+    def __store(self, slot: int, value: ir.Value) -> None:
+        ptr, _ = self.__values[slot]
 
-            case NodeType.INFIX_EXPRESSION:
-                self.__visit_infix_expression(cast(InfixExpression, node))
+        if ptr is None:
+            self.__ssa_builder.write(slot, self.__builder.block, value)
+        else:
+            self.__builder.store(value, ptr)
 
-            case NodeType.PREFIX_EXPRESSION:
-                self.__visit_prefix_expression(cast(PrefixExpression, node))
+    def __load(self, slot: int) -> tuple[ir.Value, ir.Type]:
+        ptr, type = self.__values[slot]
 
-            case NodeType.WHILE_LOOP:
-                self.__visit_while_loop(cast(WhileLoop, node))
+        if ptr is None:
+            return self.__ssa_builder.read(slot, self.__builder.block, type), type
+        return self.__builder.load(ptr), type
 
-            case NodeType.FOR_LOOP:
-                self.__visit_for_loop(cast(ForLoop, node))
+    def __link(self, *blocks: ir.Block) -> None:
+        # the terminators of blocks are emitted
+        if self.__ssa_builder is not None:
+            self.__ssa_builder.link(*blocks)
 
-            case NodeType.FUNCTION_CALL:
-                self.__visit_function_call(cast(CallExpression, node))
+    def __seal(self, block: ir.Block) -> None:
+        # every branch to block is emitted
+        if self.__ssa_builder is not None:
+            self.__ssa_builder.seal(block)
 
-    def __visit_program(self, node: Program):
+    def visit_program(self, node: Program):
         for stmt in node.statements:
-            self.compile(stmt)
+            self.visit(stmt)
 
-    def __visit_function_statement(self, node: FunctionStatement):
+    def visit_function_statement(self, node: FunctionStatement):
         name: str = node.function_name.identifier_literal
         body: BlockStatement = node.body
         parameters: list[FunctionParameter] = node.parameters
 
-        parameters_names = [p.parameter_name for p in parameters]
         parameter_types: list[ir.Type] = [
             self.__type_map[p.parameter_type] for p in parameters
         ]
@@ -152,52 +164,46 @@ class Compiler:
         self.builder: ir.IRBuilder = ir.IRBuilder(block)
 
         prev_builder = self.__builder
+        prev_allocas = self.__allocas
+        prev_ssa_builder = self.__ssa_builder
 
         self.__builder = self.builder
+        self.__allocas = ir.IRBuilder(block)
+        self.__ssa_builder = SSABuilder(self.builder) if self.ssa else None
+        self.__seal(block)
 
-        params_ptr = []
-
-        for i, typ in enumerate(parameter_types):
-            ptr = self.builder.alloca(typ)
-            self.builder.store(function.args[i], ptr)
-            params_ptr.append(ptr)
-
-        prev_environment = self.__environment
-
-        self.__environment = Environment(parent=self.__environment)
+        for i, parameter in enumerate(parameters):
+            self.__define(self.__slot(parameter), function.args[i], parameter_types[i])
 
-        for i, x in enumerate(parameters_names):
-            type = parameter_types[i]
-            ptr = params_ptr[i]
+        self.__values[self.__slot(node.function_name)] = (function, return_type)
 
-            self.__environment.define(x, ptr, type)
+        self.visit(body)
 
-        self.__environment.define(name, function, return_type)
-
-        self.compile(body)
-
-        self.__environment = prev_environment
-        self.__environment.define(name, function, return_type)
+        if self.__ssa_builder is not None:
+            self.__ssa_builder.finish(function)
 
         self.__builder = prev_builder
+        self.__allocas = prev_allocas
+        self.__ssa_builder = prev_ssa_builder
 
-    def __visit_block_statement(self, node: BlockStatement):
+    def visit_block_statement(self, node: BlockStatement):
         for statement in node.statements:
-            self.compile(statement)
+            self.visit(statement)
 
-    def __visit_return_statement(self, node: ReturnStatement):
+    def visit_return_statement(self, node: ReturnStatement):
         value: Expression = node.return_value
-        value, type = self.__resolve_value(value)
+        value, type = self.visit(value)
 
         self.__builder.ret(value)
 
-    def __visit_assignment_statement(self, node: AssignmentStatement):
+    def visit_assignment_statement(self, node: AssignmentStatement):
         identifier: IdentifierLiteral = node.identifier
-        value, type = self.__resolve_value(node.value)
+        value, type = self.visit(node.value)
 
         if isinstance(type, ir.ArrayType):
-            if self.__environment.lookup(identifier.identifier_literal) is None:
-                ptr = self.__builder.alloca(type)
+            slot = self.__slot(identifier)
+            if self.__values[slot] is None:
+                ptr = self.__alloca(type)
                 elements = value.constant
                 for i, element in enumerate(elements):
                     element_ptr = self.__builder.gep(
@@ -208,9 +214,9 @@ class Compiler:
                         ],
                     )
                     self.__builder.store(element, element_ptr)
-                self.__environment.define(identifier.identifier_literal, ptr, type)
+                self.__values[slot] = (ptr, type)
             else:
-                ptr, _ = self.__visit_parent_environment(self.__environment, identifier)
+                ptr, _ = self.__values[slot]
                 for i, element in enumerate(value):
                     element_ptr = self.__builder.gep(
                         ptr,
@@ -221,106 +227,174 @@ class Compiler:
                     )
                     self.__builder.store(element, element_ptr)
         else:
-            if self.__environment.lookup(identifier.identifier_literal) is None:
-                ptr = self.__builder.alloca(type)
-                self.__builder.store(value, ptr)
-                self.__environment.define(identifier.identifier_literal, ptr, type)
+            slot = self.__slot(identifier)
+            if self.__values[slot] is None:
+                self.__define(slot, value, type)
             else:
-                ptr, _ = self.__visit_parent_environment(self.__environment, identifier)
-                self.__builder.store(value, ptr)
+                self.__store(slot, value)
 
-    def __visit_reassignment_statement(self, node: ReassignmentStatement):
+    def visit_reassignment_statement(self, node: ReassignmentStatement):
         identifier: IdentifierLiteral = node.identifier
         value: Expression = node.value
 
-        ptr, _ = self.__visit_parent_environment(self.__environment, identifier)
-        value, _ = self.__resolve_value(value)
-        self.__builder.store(value, ptr)
+        value, _ = self.visit(value)
+        self.__store(self.__slot(identifier), value)
 
-    def __visit_if_statement(self, node: IfStatement):
+    def visit_if_statement(self, node: IfStatement):
         condition = node.condition
         consequence = node.consequence
         alternative = node.alternative
 
-        prev_environment = self.__environment
-        self.__environment = Environment(parent=self.__environment)
-
-        value, _ = self.__resolve_value(condition)
+        value, _ = self.visit(condition)
+        head = self.__builder.block
 
         if not alternative.statements:
             with self.__builder.if_then(value):
-                self.compile(consequence)
+                self.__link(head)
+                self.__seal(self.__builder.block)
+                self.visit(consequence)
+                then_end = self.__builder.block
+
+            self.__link(then_end)
         else:
             with self.__builder.if_else(value) as (then, otherwise):
+                self.__link(head)
+
                 with then:
-                    self.compile(consequence)
+                    self.__seal(self.__builder.block)
+                    self.visit(consequence)
+                    then_end = self.__builder.block
 
                 with otherwise:
-                    self.compile(alternative)
+                    self.__seal(self.__builder.block)
+                    self.visit(alternative)
+                    otherwise_end = self.__builder.block
+
+            self.__link(then_end, otherwise_end)
 
-        self.__environment = prev_environment
+        self.__seal(self.__builder.block)
 
-    def __visit_while_loop(self, node: WhileLoop):
+    def visit_while_loop(self, node: WhileLoop):
         condition = node.condition
         consequence = node.consequence
 
-        prev_environment = self.__environment
-        self.__environment = Environment(parent=self.__environment)
-
-        value, _ = self.__resolve_value(condition)
+        value, _ = self.visit(condition)
 
         while_loop_entry = self.__builder.append_basic_block("while_loop_entry")
         while_loop_otherwise = self.__builder.append_basic_block("while_loop_otherwise")
 
         self.__builder.cbranch(value, while_loop_entry, while_loop_otherwise)
+        self.__link(self.__builder.block)
 
+        # the loop entry is sealed once the back edge is there
         self.__builder.position_at_start(while_loop_entry)
-        self.compile(consequence)
-        value, _ = self.__resolve_value(condition)
+        self.visit(consequence)
+        value, _ = self.visit(condition)
         self.__builder.cbranch(value, while_loop_entry, while_loop_otherwise)
-        self.__builder.position_at_start(while_loop_otherwise)
-
-        self.__environment = prev_environment
-
-    def __visit_for_loop(self, node: ForLoop):
-        identifier = node.identifier
-        range_start = node.range_start
-        block_statement = node.block_statement
-        condition = node.condition
+        self.__link(self.__builder.block)
+        self.__seal(while_loop_entry)
+        self.__seal(while_loop_otherwise)
 
-        prev_environment = self.__environment
-
-        self.__environment = Environment(parent=self.__environment)
-
-        ptr = self.__builder.alloca(self.__type_map["int"])
-        self.__builder.store(
-            ir.Constant(self.__type_map["int"], range_start.int_literal), ptr
-        )
-
-        self.__environment.define(
-            identifier.identifier_literal, ptr, self.__type_map["int"]
-        )
-
-        for_loop_entry = self.__builder.append_basic_block("for_loop_entry")
-        for_loop_otherwise = self.__builder.append_basic_block("for_loop_otherwise")
-
-        value, _ = self.__resolve_value(condition)
-        self.__builder.cbranch(value, for_loop_entry, for_loop_otherwise)
-
-        self.__builder.position_at_start(for_loop_entry)
-        self.compile(block_statement)
-        current_value = self.__builder.load(ptr)
-        result = self.__builder.add(current_value, ir.Constant(ir.IntType(32), 1))
-
-        self.__builder.store(result, ptr)
-
-        value, _ = self.__resolve_value(condition)
-        self.__builder.cbranch(value, for_loop_entry, for_loop_otherwise)
-        self.__builder.position_at_start(for_loop_otherwise)
-
-        self.__environment = prev_environment
+        self.__builder.position_at_start(while_loop_otherwise)
 
-    def __visit_function_call(self, node: CallExpression):
+    def visit_for_loop(self, node: ForLoop):
+        # Lowered to the shape LLVM's loop passes expect: the current block
+        # is the preheader, the header holds the only exit test, the body
+        # falls through to a single latch that steps the variable, and the
+        # latch's back edge carries the loop's metadata.
+        int_type = self.__type_map["int"]
+
+        # the range is evaluated once, in the preheader
+        start, _ = self.visit(node.range_start)
+        end, _ = self.visit(node.range_end)
+        if node.step is not None:
+            step, _ = self.visit(node.step)
+        else:
+            step = ir.Constant(int_type, 1)
+
+        slot = self.__slot(node.identifier)
+        self.__define(slot, start, int_type)
+
+        for_loop_header = self.__builder.append_basic_block("for_loop_header")
+        for_loop_body = self.__builder.append_basic_block("for_loop_body")
+        for_loop_latch = self.__builder.append_basic_block("for_loop_latch")
+        for_loop_exit = self.__builder.append_basic_block("for_loop_exit")
+
+        self.__builder.branch(for_loop_header)
+        self.__link(self.__builder.block)
+
+        # the header is sealed once the back edge is there
+        self.__builder.position_at_start(for_loop_header)
+        current_value, _ = self.__load(slot)
+        value = self.__builder.icmp_signed("<", current_value, end)
+        self.__builder.cbranch(value, for_loop_body, for_loop_exit)
+        self.__link(for_loop_header)
+        self.__seal(for_loop_body)
+        self.__seal(for_loop_exit)
+
+        self.__builder.position_at_start(for_loop_body)
+        self.visit(node.block_statement)
+        if not self.__builder.block.is_terminated:
+            self.__builder.branch(for_loop_latch)
+        self.__link(self.__builder.block)
+        self.__seal(for_loop_latch)
+
+        self.__builder.position_at_start(for_loop_latch)
+        current_value, _ = self.__load(slot)
+        self.__store(slot, self.__builder.add(current_value, step))
+        back_edge = self.__builder.branch(for_loop_header)
+        self.__link(for_loop_latch)
+        self.__seal(for_loop_header)
+
+        metadata = self.__loop_metadata(node.attributes)
+        if metadata is not None:
+            back_edge.set_metadata("llvm.loop", metadata)
+
+        self.__builder.position_at_start(for_loop_exit)
+
+    def __loop_metadata(self, attributes: list[LoopAttribute]) -> Optional[ir.MDValue]:
+        # the llvm.loop hints for #[unroll], #[unroll(n)], #[vectorize] and
+        # #[vectorize(width)]; n or width 1 turns the transformation off
+        hints: list[tuple[str, ...]] = []
+
+        for attribute in attributes:
+            match attribute.name, attribute.argument:
+                case "unroll", None:
+                    hints.append(("llvm.loop.unroll.enable",))
+                case "unroll", 1:
+                    hints.append(("llvm.loop.unroll.disable",))
+                case "unroll", count:
+                    hints.append(("llvm.loop.unroll.count", count))
+                case "vectorize", None:
+                    hints.append(("llvm.loop.vectorize.enable", True))
+                case "vectorize", 1:
+                    hints.append(("llvm.loop.vectorize.enable", False))
+                case "vectorize", width:
+                    hints.append(("llvm.loop.vectorize.enable", True))
+                    hints.append(("llvm.loop.vectorize.width", width))
+
+        if not hints:
+            return None
+
+        operands = []
+        for name, *arguments in hints:
+            hint = [ir.MetaDataString(self.module, name)]
+            for argument in arguments:
+                if type(argument) is bool:
+                    hint.append(ir.Constant(ir.IntType(1), int(argument)))
+                else:
+                    hint.append(ir.Constant(ir.IntType(32), argument))
+            operands.append(self.module.add_metadata(hint))
+
+        # A loop ID is a node of its own whose first operand is itself, so it
+        # is made directly rather than through add_metadata, which would hand
+        # the same node to every loop with the same hints.
+        loop_id = ir.MDValue(self.module, [], name=str(len(self.module.metadata)))
+        loop_id.operands = (loop_id, *operands)
+
+        return loop_id
+
+    def visit_function_call(self, node: CallExpression):
         function_name = node.function_name.identifier_literal
         parameters = node.arguments
 
@@ -328,24 +402,22 @@ class Compiler:
         types = []
         if len(parameters) > 0:
             for param in parameters:
-                p_val, p_type = self.__resolve_value(param)
+                p_val, p_type = self.visit(param)
                 args.append(p_val)
                 types.append(p_type)
 
         match function_name:
             case _:
-                func, ret_type = self.__visit_parent_environment(
-                    self.__environment, node.function_name
-                )
+                func, ret_type = self.__values[self.__slot(node.function_name)]
                 ret = self.__builder.call(func, args)
 
         return ret, ret_type
 
-    def __visit_expression_statement(self, node: ExpressionStatement):
-        self.compile(node.expression)
+    def visit_expression_statement(self, node: ExpressionStatement):
+        self.visit(node.expression)
 
-    def __visit_prefix_expression(self, node: PrefixExpression):
-        operand_value, operand_type = self.__resolve_value(node.operand)
+    def visit_prefix_expression(self, node: PrefixExpression):
+        operand_value, operand_type = self.visit(node.operand)
         operator = node.operator
 
         if isinstance(operand_type, ir.IntType):
@@ -357,9 +429,9 @@ class Compiler:
                 case _:
                     return None, None
 
-    def __visit_infix_expression(self, node: InfixExpression):
-        left_val, left_type = self.__resolve_value(node.left_node)
-        right_val, right_type = self.__resolve_value(node.right_node)
+    def visit_infix_expression(self, node: InfixExpression):
+        left_val, left_type = self.visit(node.left_node)
+        right_val, right_type = self.visit(node.right_node)
         operator = node.operator
 
         if isinstance(left_type, ir.IntType) and isinstance(right_type, ir.IntType):
@@ -392,68 +464,42 @@ class Compiler:
                     result = self.__builder.icmp_signed("==", left_val, right_val)
 
                 case _:
-                    print(f"Unsupported operator {operator}")
+                    self.errors.append(f"Unsupported operator {operator}")
                     return None, None
             return result, self.__type_map["int"]
 
         return None, None
 
-    def __resolve_value(self, node: Expression | Statement):
-        match node.type():
-            case NodeType.INTEGER_LITERAL:
-                node: IntegerLiteral = cast(IntegerLiteral, node)
-                value, node_type = node.int_literal, self.__type_map["int"]
-                return ir.Constant(node_type, value), node_type
-
-            case NodeType.FLOAT_LITERAL:
-                node: FloatLiteral = cast(FloatLiteral, node)
-                value, node_type = node.float_literal, self.__type_map["float"]
-                return ir.Constant(node_type, value), node_type
-
-            case NodeType.IDENTIFIER_LITERAL:
-                node: IdentifierLiteral = cast(IdentifierLiteral, node)
-                ptr, node_type = self.__visit_parent_environment(
-                    self.__environment, node
-                )
-                return self.__builder.load(ptr), node_type
-
-            case NodeType.BOOLEAN_EXPRESSION:  # Load the boolean values from the symbol table
-                node: BooleanLiteral = cast(BooleanLiteral, node)
-                # value, node_type = self.__environment.lookup(node.boolean_value.)
-                value, node_type = node.boolean_value, self.__type_map["bool"]
-                return ir.Constant(node_type, 1 if value else 0), node_type
-
-            case NodeType.INFIX_EXPRESSION:
-                node: InfixExpression = cast(InfixExpression, node)
-                return self.__visit_infix_expression(node)
-
-            case NodeType.PREFIX_EXPRESSION:
-                node: PrefixExpression = cast(PrefixExpression, node)
-                return self.__visit_prefix_expression(node)
-
-            case NodeType.FUNCTION_CALL:
-                node: CallExpression = cast(CallExpression, node)
-                return self.__visit_function_call(node)
-
-            case NodeType.ARRAY_LITERAL:
-                node: ArrayLiteral = cast(ArrayLiteral, node)
-                element_values = [
-                    self.__resolve_value(element)[0] for element in node.values
-                ]
-                element_type = element_values[0].type
-                array_type = ir.ArrayType(element_type, len(element_values))
-                array_value = ir.Constant(array_type, element_values)
-
-                return array_value, array_type
-
-            case NodeType.INDEX:
-                node: IndexExpression = cast(IndexExpression, node)
-                array_ptr, array_type = self.__resolve_value(node.array)
-                index_value, _ = self.__resolve_value(node.index)
-
-                array_ptr = array_ptr.operands[0]
-
-                element_ptr = self.__builder.gep(
-                    array_ptr, [ir.Constant(ir.IntType(32), 0), index_value]
-                )
-                return self.__builder.load(element_ptr), array_type.element
+    def visit_integer_literal(self, node: IntegerLiteral):
+        value, node_type = node.int_literal, self.__type_map["int"]
+        return ir.Constant(node_type, value), node_type
+
+    def visit_float_literal(self, node: FloatLiteral):
+        value, node_type = node.float_literal, self.__type_map["float"]
+        return ir.Constant(node_type, value), node_type
+
+    def visit_identifier_literal(self, node: IdentifierLiteral):
+        return self.__load(self.__slot(node))
+
+    def visit_boolean_expression(self, node: BooleanLiteral):
+        value, node_type = node.boolean_value, self.__type_map["bool"]
+        return ir.Constant(node_type, 1 if value else 0), node_type
+
+    def visit_array_literal(self, node: ArrayLiteral):
+        element_values = [self.visit(element)[0] for element in node.values]
+        element_type = element_values[0].type
+        array_type = ir.ArrayType(element_type, len(element_values))
+        array_value = ir.Constant(array_type, element_values)
+
+        return array_value, array_type
+
+    def visit_index(self, node: IndexExpression):
+        array_ptr, array_type = self.visit(node.array)
+        index_value, _ = self.visit(node.index)
+
+        array_ptr = array_ptr.operands[0]
+
+        element_ptr = self.__builder.gep(
+            array_ptr, [ir.Constant(ir.IntType(32), 0), index_value]
+        )
+        return self.__builder.load(element_ptr), array_type.element
@@ -0,0 +1,258 @@
+from collections import Counter
+from typing import Optional
+
+from _AST import (
+    Node,
+    Expression,
+    AssignmentStatement,
+    BlockStatement,
+    FunctionStatement,
+    IfStatement,
+    ReassignmentStatement,
+    ReturnStatement,
+    BooleanLiteral,
+    FloatLiteral,
+    IdentifierLiteral,
+    InfixExpression,
+    IntegerLiteral,
+    PrefixExpression,
+    NodeTransformer,
+    NodeVisitor,
+    copy_node,
+    iter_child_nodes,
+)
+from _resolver import Resolver
+
+
+INT_MIN = -(1 << 31)
+INT_MAX = (1 << 31) - 1
+
+LITERALS = (IntegerLiteral, FloatLiteral, BooleanLiteral)
+
+
+def wrap_int(value: int) -> int:
+    # to the i32 the compiler would have computed
+    return (value - INT_MIN) % (1 << 32) + INT_MIN
+
+
+def fold_int_infix(left: int, operator: str, right: int) -> Optional[Expression]:
+    # the same operations as Compiler.visit_infix_expression on two i32
+    # constants; None where LLVM would not give a value (division by zero,
+    # INT_MIN / -1) and for operators the compiler does not support
+    match operator:
+        case "+":
+            return IntegerLiteral(wrap_int(left + right))
+        case "-":
+            return IntegerLiteral(wrap_int(left - right))
+        case "*":
+            return IntegerLiteral(wrap_int(left * right))
+        case "/" | "%":
+            if right == 0 or (left == INT_MIN and right == -1):
+                return None
+
+            # sdiv truncates towards zero and srem takes the dividend's sign
+            quotient = abs(left) // abs(right)
+            if (left < 0) != (right < 0):
+                quotient = -quotient
+
+            if operator == "/":
+                return IntegerLiteral(quotient)
+            return IntegerLiteral(left - quotient * right)
+        case "^":
+            return IntegerLiteral(left ^ right)
+        case "&":
+            return IntegerLiteral(left & right)
+        case "|":
+            return IntegerLiteral(left | right)
+        case "<":
+            return BooleanLiteral(left < right)
+        case ">":
+            return BooleanLiteral(left > right)
+        case ">=":
+            return BooleanLiteral(left >= right)
+        case "<=":
+            return BooleanLiteral(left <= right)
+        case "==":
+            return BooleanLiteral(left == right)
+
+    return None
+
+
+def is_int_constant(node: Optional[Node]) -> bool:
+    return type(node) is IntegerLiteral and INT_MIN <= node.int_literal <= INT_MAX
+
+
+class AssignmentCounter(NodeVisitor):
+    # how often each slot is stored to; a reassignment counts double so only
+    # a single let leaves a slot at 1
+    def __init__(self, slots: dict[int, int]) -> None:
+        self.slots = slots
+        self.counts: Counter[int] = Counter()
+
+    def visit_assignment_statement(self, node: AssignmentStatement) -> None:
+        self.counts[self.slots[id(node.identifier)]] += 1
+        self.generic_visit(node)
+
+    def visit_reassignment_statement(self, node: ReassignmentStatement) -> None:
+        self.counts[self.slots[id(node.identifier)]] += 2
+        self.generic_visit(node)
+
+
+class ConstantFolder(NodeTransformer):
+    # Runs before code generation and returns a tree with less to compile:
+    #   - infix and ~ expressions over int constants are evaluated the way
+    #     the emitted i32 instructions would have been, comparisons become
+    #     BooleanLiterals
+    #   - a variable that a single let binds to a constant, and that is never
+    #     reassigned, is replaced by the constant, and the let is dropped
+    #   - an if statement with a constant condition is replaced by the
+    #     branch that runs
+    # The tree passed in is not modified.
+    def __init__(self) -> None:
+        self.__slots: dict[int, int] = {}
+        self.__counts: Counter[int] = Counter()
+        self.__constants: dict[int, Expression] = {}
+
+    def fold(self, node: Node) -> Node:
+        resolver = Resolver()
+        node = resolver.resolve(node)
+        if resolver.errors:
+            # left for the compiler to report
+            return node
+
+        counter = AssignmentCounter(resolver.slots)
+        counter.visit(node)
+
+        self.__slots = resolver.slots
+        self.__counts = counter.counts
+        self.__constants = {}
+
+        return self.visit(node)
+
+    def visit_assignment_statement(self, node: AssignmentStatement) -> Node | None:
+        node = self.generic_visit(node)
+        slot = self.__slots[id(node.identifier)]
+
+        if type(node.value) in LITERALS and self.__counts[slot] == 1:
+            self.__constants[slot] = node.value
+            return None
+
+        return node
+
+    def visit_reassignment_statement(self, node: ReassignmentStatement) -> Node:
+        # the identifier is stored to, not read
+        value = self.visit(node.value)
+        if value is node.value:
+            return node
+
+        return copy_node(node, {"value": value})
+
+    def visit_identifier_literal(self, node: IdentifierLiteral) -> Expression:
+        return self.__constants.get(self.__slots.get(id(node)), node)
+
+    def visit_infix_expression(self, node: InfixExpression) -> Expression:
+        # A chain like x + x + ... + x nests one InfixExpression per
+        # operator, so the nested infix expressions are folded bottom-up
+        # with an explicit stack instead of a recursive visit per operator.
+        # Other operands are visited as usual.
+        stack: list[tuple[InfixExpression, bool]] = [(node, False)]
+        folded: list[Expression] = []
+
+        while stack:
+            current, operands_folded = stack.pop()
+
+            if not operands_folded:
+                stack.append((current, True))
+                if type(current.right_node) is InfixExpression:
+                    stack.append((current.right_node, False))
+                if type(current.left_node) is InfixExpression:
+                    stack.append((current.left_node, False))
+                continue
+
+            # the left operand's result went on the stack before the right's
+            right = None
+            if type(current.right_node) is InfixExpression:
+                right = folded.pop()
+
+            if type(current.left_node) is InfixExpression:
+                left = folded.pop()
+            else:
+                left = self.visit(current.left_node)
+
+            if right is None:
+                right = self.visit(current.right_node)
+
+            folded.append(self.__fold_infix(current, left, right))
+
+        return folded[0]
+
+    @staticmethod
+    def __fold_infix(
+        node: InfixExpression, left: Expression, right: Expression
+    ) -> Expression:
+        if is_int_constant(left) and is_int_constant(right):
+            folded = fold_int_infix(left.int_literal, node.operator, right.int_literal)
+            if folded is not None:
+                return folded
+
+        if left is node.left_node and right is node.right_node:
+            return node
+
+        return copy_node(node, {"left_node": left, "right_node": right})
+
+    def visit_prefix_expression(self, node: PrefixExpression) -> Expression:
+        node = self.generic_visit(node)
+
+        if node.operator == "~" and is_int_constant(node.operand):
+            return IntegerLiteral(~node.operand.int_literal)
+
+        return node
+
+    def visit_if_statement(self, node: IfStatement) -> Node | list | None:
+        node = self.generic_visit(node)
+
+        if type(node.condition) is not BooleanLiteral:
+            return node
+
+        if not node.condition.boolean_value and self.__declares(node.consequence):
+            # the else branch shares the if statement's scope with the
+            # consequence, so its names can refer to the consequence's lets
+            return node
+
+        branch = node.consequence if node.condition.boolean_value else node.alternative
+        if not branch.statements:
+            return None
+
+        if self.__can_inline(branch):
+            return branch.statements
+
+        if node.condition.boolean_value and not node.alternative.statements:
+            return node
+
+        # still needs a scope of its own, or a block to return from
+        return IfStatement(BooleanLiteral(True), branch)
+
+    @staticmethod
+    def __declares(branch: BlockStatement) -> bool:
+        return any(
+            type(statement) in (AssignmentStatement, FunctionStatement)
+            for statement in branch.statements
+        )
+
+    @classmethod
+    def __can_inline(cls, branch: BlockStatement) -> bool:
+        # The if statement's scope goes away with it, so the branch must not
+        # declare anything at its top level. A return has to stay in a block
+        # of its own as well, as the statements after the if would follow it
+        # in the same basic block.
+        if cls.__declares(branch):
+            return False
+
+        stack: list[Node] = [branch]
+        while stack:
+            current = stack.pop()
+            if type(current) is ReturnStatement:
+                return False
+            stack.extend(iter_child_nodes(current))
+
+        return True
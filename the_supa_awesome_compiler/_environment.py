@@ -1,30 +1,61 @@
-from llvmlite import ir
 from typing import Optional
 
+from _symbols import SYMBOLS
 
-class Environment:
-    def __init__(
-        self,
-        records: dict[str, tuple[ir.Value, ir.Type]] = None,
-        parent=None,
-        name: str = "global",
-    ):
-        self.__records = records if records else {}
-        self.parent: Environment = parent
-        self.name: str = name
 
-    def define(self, name: str, value: ir.Value, identifier_type: ir.Type) -> ir.Value:
-        self.__records[name] = (value, identifier_type)
-        return value
+class ScopeStack:
+    # One table for all nested scopes: every name maps to a stack of
+    # (scope depth, slot) pairs with the innermost binding on top, and an
+    # undo log records the names each scope defined. lookup() is a single
+    # dict probe however deep the nesting, and leaving a scope only pops the
+    # bindings that scope made.
+    def __init__(self) -> None:
+        self.__bindings: dict[str, list[tuple[int, int]]] = {}
 
-    def lookup(self, name: str) -> tuple[ir.Value, ir.Type]:
-        return self.__resolve(name)
+        # names defined so far, and the log length at every scope entry
+        self.__log: list[str] = []
+        self.__marks: list[int] = []
 
-    def __resolve(self, name: str) -> Optional[tuple[ir.Value, ir.Type]]:
-        if name in self.__records:
-            return self.__records[name]
+    @property
+    def depth(self) -> int:
+        return len(self.__marks)
 
-        elif self.parent:
-            self.parent.__resolve(name)
+    def enter_scope(self) -> None:
+        self.__marks.append(len(self.__log))
+
+    def leave_scope(self) -> None:
+        mark = self.__marks.pop()
+        log = self.__log
+        bindings = self.__bindings
+
+        while len(log) > mark:
+            name = log.pop()
+            stack = bindings[name]
+            stack.pop()
+            if not stack:
+                del bindings[name]
+
+    def define(self, name: str, slot: int) -> int:
+        name = SYMBOLS.intern(name)
+        depth = len(self.__marks)
+        stack = self.__bindings.setdefault(name, [])
+
+        if stack and stack[-1][0] == depth:
+            # defined again in the same scope, nothing to undo for it
+            stack[-1] = (depth, slot)
         else:
-            return None
+            stack.append((depth, slot))
+            self.__log.append(name)
+
+        return slot
+
+    def lookup(self, name: str) -> Optional[int]:
+        stack = self.__bindings.get(name)
+        return stack[-1][1] if stack else None
+
+    def lookup_local(self, name: str) -> Optional[int]:
+        # only a binding made in the innermost scope
+        stack = self.__bindings.get(name)
+        if stack and stack[-1][0] == len(self.__marks):
+            return stack[-1][1]
+        return None
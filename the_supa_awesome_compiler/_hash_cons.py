@@ -0,0 +1,117 @@
+from typing import Any, Callable, Optional
+
+from _AST import SCALAR_TYPES, Expression, Node, NodeTransformer, iter_child_nodes
+
+
+def node_key(node: Node, child_key: Callable[[Node], Any]) -> tuple:
+    # the node class and its fields, with child_key standing in for every
+    # child node
+    key = [type(node)]
+
+    for field in type(node).__slots__:
+        value = getattr(node, field)
+
+        if type(value) in SCALAR_TYPES:
+            key.append(value)
+        elif type(value) is list:
+            key.append(
+                tuple(
+                    item if type(item) in SCALAR_TYPES else child_key(item)
+                    for item in value
+                )
+            )
+        else:
+            key.append(child_key(value))
+
+    return tuple(key)
+
+
+def structural_hash(node: Node, memo: Optional[dict[int, int]] = None) -> int:
+    # Equal for structurally equal trees. The hash of every subtree is left
+    # in memo under the id of its root, so a pass can pass the same memo for
+    # many trees and use it as a per-subtree cache key as long as the nodes
+    # are alive and unchanged.
+    if memo is None:
+        memo = {}
+
+    stack: list[tuple[Node, bool]] = [(node, False)]
+
+    while stack:
+        current, expanded = stack.pop()
+        if id(current) in memo:
+            continue
+
+        if not expanded:
+            stack.append((current, True))
+            stack.extend((child, False) for child in iter_child_nodes(current))
+            continue
+
+        memo[id(current)] = hash(node_key(current, lambda child: memo[id(child)]))
+
+    return memo[id(node)]
+
+
+def structurally_equal(first: Node, second: Node) -> bool:
+    stack: list[tuple[Any, Any]] = [(first, second)]
+
+    while stack:
+        first, second = stack.pop()
+        if first is second:
+            continue
+
+        if type(first) is not type(second):
+            return False
+
+        if not isinstance(first, Node):
+            if first != second:
+                return False
+            continue
+
+        for field in type(first).__slots__:
+            first_value = getattr(first, field)
+            second_value = getattr(second, field)
+
+            if type(first_value) is list and type(second_value) is list:
+                if len(first_value) != len(second_value):
+                    return False
+                stack.extend(zip(first_value, second_value))
+            else:
+                stack.append((first_value, second_value))
+
+    return True
+
+
+class ExpressionTable:
+    # Hash-consing of expression nodes. intern() returns the node of the
+    # table that is structurally equal to the given one, so every distinct
+    # subexpression is stored once and equal subexpressions are the same
+    # object: id() of an interned node is a memo key for its whole subtree.
+    # The children of a node have to be interned before the node itself;
+    # they are then part of its key by id, which keeps intern() O(1) per
+    # node. Interned nodes are shared and must not be modified, rewrite them
+    # with a NodeTransformer instead.
+    def __init__(self) -> None:
+        self.__nodes: dict[tuple, Expression] = {}
+
+    def __len__(self) -> int:
+        return len(self.__nodes)
+
+    def intern(self, node: Expression) -> Expression:
+        return self.__nodes.setdefault(node_key(node, id), node)
+
+    def intern_tree(self, node: Node) -> Node:
+        # interns every expression of a tree that was not built through
+        # intern(); statements are copied where their expressions changed
+        return HashConser(self).visit(node)
+
+
+class HashConser(NodeTransformer):
+    def __init__(self, table: ExpressionTable) -> None:
+        self.table = table
+
+    def generic_visit(self, node: Node) -> Node:
+        node = super().generic_visit(node)
+
+        if isinstance(node, Expression):
+            return self.table.intern(node)
+        return node
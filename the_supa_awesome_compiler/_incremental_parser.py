@@ -0,0 +1,77 @@
+from collections import Counter
+from hashlib import blake2b
+
+from _AST import FunctionStatement, Program, Statement
+from _lexer import Lexer, LexerEngine
+from _parallel_parser import chunk_columns, declaration_starts, parse_chunk
+from _source import Source
+from _token_buffer import TokenBuffer
+
+
+# (text hash, occurrence) -> statements and errors of a declaration
+Declarations = dict[tuple[bytes, int], tuple[list[Statement], list[str]]]
+
+
+class IncrementalParser:
+    # Parses successive versions of a program and only re-parses the
+    # top-level declarations whose source text changed. The statements and
+    # errors of every declaration of the last version are kept, keyed by a
+    # hash of the declaration's text from its first token to its last, and
+    # by how many declarations before it had the same text. Unchanged
+    # declarations get the very same AST objects back, and the n-th of
+    # several identical ones gets those of the n-th in the last version.
+    def __init__(self, engine: LexerEngine = LexerEngine.SCANNER) -> None:
+        self.engine = engine
+
+        self.errors: list[str] = []
+
+        self.__declarations: Declarations = {}
+
+    def parse(
+        self, source: Source | str | TokenBuffer
+    ) -> tuple[Program, list[FunctionStatement]]:
+        if isinstance(source, TokenBuffer):
+            buffer = source
+        else:
+            buffer = Lexer(source, self.engine).tokenize()
+
+        text = buffer.source.text
+        points = declaration_starts(buffer.types)
+        if not points or points[0]:
+            # whatever comes before the first declaration is a span as well
+            points.insert(0, 0)
+        points.append(len(buffer) - 1)
+
+        program = Program()
+        changed: list[FunctionStatement] = []
+        declarations: Declarations = {}
+        occurrences: Counter[bytes] = Counter()
+        self.errors = []
+
+        for start, stop in zip(points, points[1:]):
+            if start == stop:
+                continue
+
+            span = text[buffer.starts[start] : buffer.ends[stop - 1]]
+            digest = blake2b(span.encode(), digest_size=16).digest()
+            key = (digest, occurrences[digest])
+            occurrences[digest] += 1
+
+            result = self.__declarations.get(key)
+            if result is None:
+                result = parse_chunk(chunk_columns(buffer, start, stop))
+                changed.extend(
+                    statement
+                    for statement in result[0]
+                    if isinstance(statement, FunctionStatement)
+                )
+
+            declarations[key] = result
+
+            statements, errors = result
+            program.statements.extend(statements)
+            self.errors.extend(errors)
+
+        self.__declarations = declarations
+
+        return program, changed
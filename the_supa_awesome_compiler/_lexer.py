@@ -1,292 +1,358 @@
-from _token import TokenType, Token, lookup_identifier
-from typing import Optional
-from collections import deque
+import codecs
+import mmap
+import os
+import re
+
+from itertools import repeat
+
+from _token import TokenType, Token, RawToken, lookup_identifier
+from _source import Source
+from _token_buffer import TokenBuffer
+from enum import Enum
+from typing import BinaryIO, Callable, Iterable, Iterator, Optional, TextIO
+
+
+WHITESPACE = frozenset(" \r\t\n")
+DIGITS = frozenset("0123456789")
+
+# digits (and "_" separators) allowed after the first digit, per base
+DECIMAL_RUN = frozenset("0123456789_")
+PREFIXED_RUNS: dict[str, tuple[int, frozenset[str]]] = {
+    "x": (16, frozenset("0123456789abcdefABCDEF_")),
+    "X": (16, frozenset("0123456789abcdefABCDEF_")),
+    "b": (2, frozenset("01_")),
+    "B": (2, frozenset("01_")),
+}
+
+SINGLE_CHAR_TOKENS: dict[str, TokenType] = {
+    "+": TokenType.PLUS,
+    "-": TokenType.MINUS,
+    "*": TokenType.ASTERISK,
+    "/": TokenType.SLASH,
+    "%": TokenType.MOD,
+    "^": TokenType.BW_XOR,
+    "|": TokenType.BW_OR,
+    "&": TokenType.BW_AND,
+    "~": TokenType.BW_NOT,
+    "!": TokenType.NOT,
+    "(": TokenType.LPAREN,
+    ")": TokenType.RPAREN,
+    "{": TokenType.LCURLY,
+    "}": TokenType.RCURLY,
+    "[": TokenType.LSQR,
+    "]": TokenType.RSQR,
+    ";": TokenType.SEMICOLON,
+    ":": TokenType.COLON,
+    ",": TokenType.COMMA,
+    "#": TokenType.HASH,
+    "=": TokenType.EQUALS,
+    ">": TokenType.GT,
+    "<": TokenType.LT,
+}
+
+DOUBLE_CHAR_TOKENS: dict[str, TokenType] = {
+    "->": TokenType.ARROW,
+    "!=": TokenType.NOT_EQ,
+    "==": TokenType.EQ_EQ,
+    ">=": TokenType.GT_EQ,
+    "<=": TokenType.LT_EQ,
+    "..": TokenType.RANGE_SEPARATOR,
+}
+
+DOUBLE_CHAR_STARTS = frozenset(pair[0] for pair in DOUBLE_CHAR_TOKENS)
+
+OPERATOR_TOKENS: dict[str, TokenType] = {**SINGLE_CHAR_TOKENS, **DOUBLE_CHAR_TOKENS}
+
+# every match swallows the whitespace in front of its token, so the loop in
+# regex_tokens only runs once per token. Alternatives are tried in order,
+# which puts the two-char operators before the single-char ones.
+# [^\W\d] is a superset of the scanner's letters (it also takes numeric
+# characters such as "²"), see regex_tokens for the fix-up.
+TOKEN_PATTERN = re.compile(
+    r"[ \r\t\n]*(?:"
+    r"(?P<PREFIXED>0[xX][0-9a-fA-F_]*|0[bB][01_]*)"
+    r"|(?P<NUMBER>[0-9][0-9_]*(?:\.(?!\.)[0-9_]*)?)"
+    r"|(?P<IDENTIFIER>[^\W\d]+)"
+    r"|(?P<OPERATOR>->|!=|==|>=|<=|\.\.|[-+*/%^|&~!(){}\[\];:,#=<>])"
+    r"|(?P<ILLEGAL>[^ \r\t\n])"
+    r")"
+)
+
+CHUNK_SIZE = 1 << 20
+
+
+class LexerEngine(Enum):
+    SCANNER = "SCANNER"
+    REGEX = "REGEX"
+
+
+def number_token(text: str, start: int, end: int, base: int = 10) -> RawToken:
+    # Python's int()/float() accept exactly our digit and "_" rules (no
+    # leading, trailing or doubled "_"), anything they reject is ILLEGAL
+    literal = text[start:end]
+
+    try:
+        if base == 10 and "." in literal:
+            return TokenType.FLOAT, start, end, float(literal)
+        return TokenType.INT, start, end, int(literal, base)
+
+    except ValueError:
+        return TokenType.ILLEGAL, start, end, None
+
+
+def scan_tokens(
+    text: str, pos: int = 0, stop: Optional[int] = None
+) -> Iterator[RawToken]:
+    if stop is None:
+        stop = len(text)
+
+    while pos < stop:
+        char = text[pos]
+
+        if char in WHITESPACE:
+            pos += 1
+            continue
+
+        start = pos
+        pos += 1
+
+        if char in DIGITS:
+            if char == "0" and pos < stop and text[pos] in PREFIXED_RUNS:
+                base, run = PREFIXED_RUNS[text[pos]]
+                pos += 1
+            else:
+                base, run = 10, DECIMAL_RUN
+
+            while pos < stop and text[pos] in run:
+                pos += 1
+
+            # a dot only starts a fraction when it is not the start of ".."
+            if (
+                base == 10
+                and pos < stop
+                and text[pos] == "."
+                and (pos + 1 == stop or text[pos + 1] != ".")
+            ):
+                pos += 1
+                while pos < stop and text[pos] in run:
+                    pos += 1
+
+            yield number_token(text, start, pos, base)
+
+        elif char.isalpha() or char == "_":
+            while pos < stop and (text[pos].isalpha() or text[pos] == "_"):
+                pos += 1
+            yield lookup_identifier(text[start:pos]), start, pos, None
+
+        elif (
+            char in DOUBLE_CHAR_STARTS
+            and pos < stop
+            and (pair_type := DOUBLE_CHAR_TOKENS.get(text[start : pos + 1]))
+        ):
+            pos += 1
+            yield pair_type, start, pos, None
+
+        else:
+            yield SINGLE_CHAR_TOKENS.get(char, TokenType.ILLEGAL), start, pos, None
+
+
+def regex_tokens(
+    text: str, pos: int = 0, stop: Optional[int] = None
+) -> Iterator[RawToken]:
+    if stop is None:
+        stop = len(text)
+
+    for match in TOKEN_PATTERN.finditer(text, pos, stop):
+        kind = match.lastgroup
+        start, end = match.span(kind)
+
+        if kind == "OPERATOR":
+            yield OPERATOR_TOKENS[match[kind]], start, end, None
+
+        elif kind == "IDENTIFIER":
+            literal = match[kind]
+            if literal.isascii():
+                yield lookup_identifier(literal), start, end, None
+            else:
+                yield from scan_tokens(text, start, end)
+
+        elif kind == "NUMBER":
+            yield number_token(text, start, end)
+
+        elif kind == "PREFIXED":
+            yield number_token(text, start, end, PREFIXED_RUNS[text[start + 1]][0])
+
+        else:
+            yield TokenType.ILLEGAL, start, end, None
+
+
+ENGINES: dict[LexerEngine, Callable[[str, int, Optional[int]], Iterator[RawToken]]] = {
+    LexerEngine.SCANNER: scan_tokens,
+    LexerEngine.REGEX: regex_tokens,
+}
 
 
 class Lexer:
-    def __init__(self, source: list[str]) -> None:
-        self.__source = source
+    def __init__(
+        self,
+        source: str | bytes | list[str],
+        engine: LexerEngine = LexerEngine.SCANNER,
+    ) -> None:
+        self.source = Source(source)
+        self.engine = engine
 
-        self.__col: int = 0
-        self.__row: int = 0
+        self.__tokens = ENGINES[engine](self.source.text, 0, None)
 
-        self.__current_pos = (self.__row, self.__col)
+    def next_token(self) -> Token:
+        raw_token = next(self.__tokens, None)
 
-        self.current_char: Optional[str] = None
+        if raw_token is None:
+            end = len(self.source)
+            return Token(TokenType.EOF, end, end, self.source)
 
-        self.__read_char()
+        token_type, start, end, value = raw_token
+        return Token(token_type, start, end, self.source, value)
 
-        self.__token_queue = deque()
+    def tokenize(self) -> TokenBuffer:
+        return TokenBuffer.from_raw_tokens(self.source, self.__tokens)
 
-    @property
-    def current_token(self):
-        return self.current_char
+    @classmethod
+    def from_stream(
+        cls,
+        stream: TextIO | BinaryIO,
+        engine: LexerEngine = LexerEngine.SCANNER,
+        chunk_size: int = CHUNK_SIZE,
+    ) -> "StreamLexer":
+        return StreamLexer(read_chunks(stream, chunk_size), engine)
 
-    def __read_char(self) -> None:
-        if self.__row >= len(self.__source):
-            self.current_char = None
+    @classmethod
+    def from_path(
+        cls,
+        path: str | os.PathLike,
+        engine: LexerEngine = LexerEngine.SCANNER,
+        chunk_size: int = CHUNK_SIZE,
+    ) -> "StreamLexer":
+        return StreamLexer(mapped_chunks(path, chunk_size), engine)
 
-        else:
-            if self.__col >= len(self.__source[self.__row]):
-                if self.__row != (len(self.__source) - 1):
-                    self.__row += 1
-                    self.__col = 1
-                    self.current_char = self.__source[self.__row][self.__col - 1]
-                else:
-                    self.current_char = None
 
-            else:
-                self.current_char = self.__source[self.__row][self.__col]
-                self.__col += 1
-
-            self.__current_pos = (self.__row, self.__col - 1)
-
-    def __skip_whitespace(self) -> None:
-        while self.current_char in [" ", "\r", "\t", "\n"]:
-            self.__read_char()
-
-    @staticmethod
-    def __is_digit(literal: str | None) -> bool:
-        if literal is not None:
-            return literal.isnumeric()
-        return False
-
-    @staticmethod
-    def __is_letter(literal: str | None) -> bool:
-        if literal is not None:
-            return literal.isalpha() or literal == "_"
-        return False
-
-    @staticmethod
-    def is_digit(char: str):
-        return char.isnumeric()
-
-    @staticmethod
-    def pop_while_not_empty(stack):
-        while len(stack):
-            yield stack.pop()
-
-    @staticmethod
-    def __new_token(
-        token_type: TokenType, token_literal: str, pos: tuple[int, int]
-    ) -> Token:
-        return Token(token_type, token_literal, pos)
-
-    def __peek_next_char(self) -> str:
-        return self.__source[self.__row][self.__col]
-
-    def __read_literal(self):
-        literal: str = ""
-
-        while self.current_char is not None and self.__is_letter(self.current_char):
-            literal += self.current_char
-            self.__read_char()
-
-        return literal
-
-    def __read_num_or_range(self):
-        current_pos = (self.__row, self.__col - 1)
-        char_count = 0
-        dot_count: int = 0
-        literal = ""
-
-        while self.__is_digit(self.current_char) or self.current_char == ".":
-            if self.current_char == ".":
-                dot_count += 1
-
-            literal += self.current_char
-
-            self.__read_char()
-
-        if dot_count > 2:
-            return self.__new_token(
-                TokenType.ILLEGAL,
-                self.__source[self.__row][current_pos[0] : current_pos[0] + char_count],
-                current_pos,
-            )
-
-        elif dot_count == 2:
-            de = deque(literal)
-            range_start = ""
-            range_end_reversed = []
-
-            while self.__is_digit(de[0]):
-                range_start += de.popleft()
-            while self.__is_digit(de[-1]):
-                range_end_reversed.append(de.pop())
-
-            if not len(range_end_reversed):
-                return self.__new_token(
-                    TokenType.ILLEGAL,
-                    self.__source[self.__row][
-                        current_pos[0] : current_pos[0] + char_count
-                    ],
-                    current_pos,
-                )
-
-            elif de[0] != de[-1] != "." or len(de) != 2:
-                return self.__new_token(
-                    TokenType.ILLEGAL,
-                    self.__source[self.__row][
-                        current_pos[0] : current_pos[0] + char_count
-                    ],
-                    current_pos,
-                )
+def read_chunks(stream: TextIO | BinaryIO, chunk_size: int) -> Iterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8")()
 
-            else:
-                range_end = "".join(self.pop_while_not_empty(range_end_reversed))
-                self.__token_queue.append(
-                    self.__new_token(TokenType.RANGE_SEPARATOR, "..", current_pos)
-                )
-                self.__token_queue.append(
-                    self.__new_token(TokenType.INT, range_end, current_pos)
-                )
-
-                return self.__new_token(TokenType.INT, range_start, current_pos)
-
-        elif dot_count == 1:
-            return self.__new_token(
-                TokenType.FLOAT,
-                literal,
-                current_pos,
-            )
+    while chunk := stream.read(chunk_size):
+        yield decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
 
-        else:
-            return self.__new_token(
-                TokenType.INT,
-                literal,
-                current_pos,
-            )
-
-    # def __read_number(self) -> Token:
-    #     start_pos = (self.__row, self.__col - 1)
-    #     dot_count: int = 0
-    #     number: str = ""
-    #
-    #     while self.__is_digit(self.current_char) or self.current_char == ".":
-    #         if self.current_char == ".":
-    #             dot_count += 1
-    #
-    #         if dot_count > 1:
-    #             return self.__new_token(
-    #                 TokenType.ILLEGAL,
-    #                 self.__source[self.__row][start_pos[1] : self.__col],
-    #                 start_pos,
-    #             )
-    #
-    #         number += self.current_char or ""
-    #         self.__read_char()
-    #
-    #         if self.current_char is None:
-    #             break
-    #
-    #     if dot_count == 0:
-    #         return self.__new_token(
-    #             TokenType.INT,
-    #             number,
-    #             start_pos,
-    #         )
-    #     else:
-    #         return self.__new_token(
-    #             TokenType.FLOAT,
-    #             number,
-    #             start_pos,
-    #         )
+    yield decoder.decode(b"", final=True)
+
+
+def mapped_chunks(path: str | os.PathLike, chunk_size: int) -> Iterator[str]:
+    with open(path, "rb") as f:
+        # mmap refuses to map an empty file
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            decoder = codecs.getincrementaldecoder("utf-8")()
+
+            for offset in range(0, len(mapped), chunk_size):
+                yield decoder.decode(mapped[offset : offset + chunk_size])
+
+            yield decoder.decode(b"", final=True)
+
+
+def last_whitespace(text: str) -> int:
+    return max(text.rfind(char) for char in WHITESPACE)
+
+
+class StreamLexer:
+    # Lexes a source that arrives in chunks, holding only the current window
+    # in memory. No token contains whitespace, so everything up to the last
+    # whitespace character of a window can be lexed on its own and the rest
+    # is carried over into the next window. That keeps numbers, ranges and
+    # two-char operators that straddle a chunk boundary in one piece.
+    def __init__(
+        self,
+        chunks: Iterable[str],
+        engine: LexerEngine = LexerEngine.SCANNER,
+    ) -> None:
+        self.engine = engine
+
+        self.__chunks = chunks
+        self.__tokens = self.tokens()
+
+        # the window of the last token handed out, and the windows tokenize()
+        # is collecting the text of
+        self.__window: Optional[Source] = None
+        self.__windows: Optional[list[Source]] = None
+
+    def tokens(self) -> Iterator[Token]:
+        scan = ENGINES[self.engine]
+
+        carry = ""
+        offset, line, column = 0, 0, 0
+
+        for chunk in self.__chunks:
+            window = carry + chunk
+            cut = last_whitespace(window) + 1
+
+            if not cut:
+                carry = window
+                continue
+
+            source = self.__enter_window(Source(window[:cut], offset, line, column))
+            carry = window[cut:]
+
+            for token_type, start, end, value in scan(source.text, 0, None):
+                yield Token(token_type, start + offset, end + offset, source, value)
+
+            offset += cut
+            line, column = source.end_position()
+
+        source = self.__enter_window(Source(carry, offset, line, column))
+        for token_type, start, end, value in scan(source.text, 0, None):
+            yield Token(token_type, start + offset, end + offset, source, value)
+
+        end = offset + len(carry)
+        yield Token(TokenType.EOF, end, end, source)
 
     def next_token(self) -> Token:
-        self.__skip_whitespace()
-
-        if self.__token_queue:
-            return self.__token_queue.popleft()
-
-        match self.current_char:
-            case "+":
-                tok = self.__new_token(TokenType.PLUS, "+", self.__current_pos)
-            case "-":
-                if self.__peek_next_char() == ">":
-                    tok = self.__new_token(TokenType.ARROW, "->", self.__current_pos)
-                    self.__read_char()
-                else:
-                    tok = self.__new_token(TokenType.MINUS, "-", self.__current_pos)
-            case "*":
-                tok = self.__new_token(TokenType.ASTERISK, "*", self.__current_pos)
-            case "/":
-                tok = self.__new_token(TokenType.SLASH, "/", self.__current_pos)
-            case "%":
-                tok = self.__new_token(TokenType.MOD, "%", self.__current_pos)
-            case "^":
-                tok = self.__new_token(TokenType.BW_XOR, "^", self.__current_pos)
-            case "|":
-                tok = self.__new_token(TokenType.BW_OR, "|", self.__current_pos)
-            case "&":
-                tok = self.__new_token(TokenType.BW_AND, "&", self.__current_pos)
-            case "~":
-                tok = self.__new_token(TokenType.BW_NOT, "~", self.__current_pos)
-            case "!":
-                if self.__peek_next_char() == "=":
-                    tok = self.__new_token(TokenType.NOT_EQ, "!=", self.__current_pos)
-                    self.__read_char()
-                else:
-                    tok = self.__new_token(TokenType.NOT, "!", self.__current_pos)
-            case "(":
-                tok = self.__new_token(TokenType.LPAREN, "(", self.__current_pos)
-            case ")":
-                tok = self.__new_token(TokenType.RPAREN, ")", self.__current_pos)
-            case "{":
-                tok = self.__new_token(TokenType.LCURLY, "{", self.__current_pos)
-            case "}":
-                tok = self.__new_token(TokenType.RCURLY, "}", self.__current_pos)
-            case "[":
-                tok = self.__new_token(TokenType.LSQR, "[", self.__current_pos)
-            case "]":
-                tok = self.__new_token(TokenType.RSQR, "]", self.__current_pos)
-            case ";":
-                tok = self.__new_token(TokenType.SEMICOLON, ";", self.__current_pos)
-            case ":":
-                tok = self.__new_token(TokenType.COLON, ":", self.__current_pos)
-            case ",":
-                tok = self.__new_token(TokenType.COMMA, ",", self.__current_pos)
-            case "=":
-                if self.__peek_next_char() == "=":
-                    tok = self.__new_token(TokenType.EQ_EQ, "==", self.__current_pos)
-                    self.__read_char()
-                else:
-                    tok = self.__new_token(TokenType.EQUALS, "=", self.__current_pos)
-            case ">":
-                if self.__peek_next_char() == "=":
-                    tok = self.__new_token(TokenType.GT_EQ, ">=", self.__current_pos)
-                    self.__read_char()
-                else:
-                    tok = self.__new_token(TokenType.GT, ">", self.__current_pos)
-
-            case "<":
-                if self.__peek_next_char() == "=":
-                    tok = self.__new_token(TokenType.LT_EQ, "<=", self.__current_pos)
-                    self.__read_char()
-                else:
-                    tok = self.__new_token(TokenType.LT, "<", self.__current_pos)
-
-            case None:
-                tok = self.__new_token(
-                    TokenType.EOF,
-                    "EOF",
-                    (self.__current_pos[0], self.__current_pos[1] + 1),
-                )
-            case _:
-                if self.__is_letter(self.current_char):
-                    literal = self.__read_literal()
-                    literal_type = lookup_identifier(literal)
-                    # if literal_type in TYPE_KEYWORDS:
-                    #     self.__read_array_type()
-                    tok = self.__new_token(literal_type, literal, self.__current_pos)
-                    return tok
-                if self.__is_digit(self.current_char):
-                    tok = self.__read_num_or_range()
-                    return tok
-                else:
-                    tok = self.__new_token(
-                        TokenType.ILLEGAL, self.current_char, self.__current_pos
-                    )
-
-        self.__read_char()
-        return tok
+        token = next(self.__tokens)
+
+        if token.token_type is TokenType.EOF:
+            # keep handing out EOF, like Lexer does
+            self.__tokens = repeat(token)
+
+        return token
+
+    def __enter_window(self, source: Source) -> Source:
+        self.__window = source
+        if self.__windows is not None:
+            self.__windows.append(source)
+
+        return source
+
+    def tokenize(self) -> TokenBuffer:
+        # The rest of the stream in one TokenBuffer, for callers that keep
+        # every token anyway. It goes on from the last next_token(), the
+        # windows are still lexed one at a time, and the buffer's source holds
+        # the text from the window of the first token it gets onwards.
+        windows = [self.__window] if self.__window is not None else []
+        self.__windows = windows
+
+        def raw_tokens() -> Iterator[RawToken]:
+            while (token := self.next_token()).token_type is not TokenType.EOF:
+                yield token.token_type, token.start, token.end, token.value
+
+        buffer = TokenBuffer(Source(""))
+        buffer.extend(raw_tokens())
+        self.__windows = None
+
+        first = windows[0]
+        buffer.source = Source(
+            "".join(window.text for window in windows),
+            first.offset,
+            first.first_line,
+            first.first_column,
+        )
+        buffer.append_eof()
+
+        return buffer
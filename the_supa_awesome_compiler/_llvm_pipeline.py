@@ -0,0 +1,118 @@
+import llvmlite.binding as llvm
+
+from enum import Enum
+from typing import Optional
+
+
+class OptimizationLevel(Enum):
+    O0 = 0
+    O1 = 1
+    O2 = 2
+    O3 = 3
+
+
+class SizeLevel(Enum):
+    SPEED = 0  # -O1 to -O3
+    SIZE = 1  # -Os
+    MIN_SIZE = 2  # -Oz
+
+
+# the inliner thresholds clang uses for -O2, -O3, -Os and -Oz
+SPEED_INLINE_THRESHOLDS = {
+    OptimizationLevel.O0: 0,
+    OptimizationLevel.O1: 0,
+    OptimizationLevel.O2: 225,
+    OptimizationLevel.O3: 275,
+}
+SIZE_INLINE_THRESHOLDS = {SizeLevel.SIZE: 75, SizeLevel.MIN_SIZE: 25}
+
+# names of the module passes llvmlite can add one by one, for custom lists
+AVAILABLE_PASSES = frozenset(
+    name[len("add_") : -len("_pass")]
+    for name in dir(llvm.ModulePassManager)
+    if name.startswith("add_") and name.endswith("_pass")
+)
+
+NO_PASSES_REPORT = "No LLVM passes ran, nothing was timed.\n"
+
+
+class Pipeline:
+    # The optimization stage between the generated IR and machine code. A
+    # level and a size preset select LLVM's standard pipelines like -O2 or
+    # -Oz would; a custom list of pass names (see AVAILABLE_PASSES) runs
+    # exactly those passes, in order, instead. The same level is used for
+    # the target machines, so JIT and object file output are optimized the
+    # same way.
+    def __init__(
+        self,
+        level: OptimizationLevel = OptimizationLevel.O2,
+        size: SizeLevel = SizeLevel.SPEED,
+        passes: Optional[list[str]] = None,
+        time_passes: bool = False,
+    ) -> None:
+        unknown = [name for name in passes or () if name not in AVAILABLE_PASSES]
+        if unknown:
+            raise ValueError(f"Unknown LLVM passes: {', '.join(unknown)}")
+
+        self.level = level
+        self.size = size
+        self.passes = passes
+        self.time_passes = time_passes
+
+    @property
+    def inlining_threshold(self) -> int:
+        if self.size is not SizeLevel.SPEED:
+            return SIZE_INLINE_THRESHOLDS[self.size]
+        return SPEED_INLINE_THRESHOLDS[self.level]
+
+    def target_machine(self) -> llvm.TargetMachine:
+        # a new one every time: create_mcjit_compiler takes ownership of it
+        target = llvm.Target.from_default_triple()
+        return target.create_target_machine(opt=self.level.value)
+
+    def run(self, module: llvm.ModuleRef, target_machine: llvm.TargetMachine) -> str:
+        # Optimizes module in place. Returns LLVM's per-pass timing report
+        # when time_passes is set, and an empty string otherwise. O0 and an
+        # empty custom list run no passes, LLVM has nothing to report then
+        # and NO_PASSES_REPORT is returned instead.
+        module_passes = llvm.create_module_pass_manager()
+        function_passes = llvm.create_function_pass_manager(module)
+        target_machine.add_analysis_passes(module_passes)
+        target_machine.add_analysis_passes(function_passes)
+
+        if self.passes is not None:
+            for name in self.passes:
+                if name == "function_inlining":
+                    module_passes.add_function_inlining_pass(self.inlining_threshold)
+                else:
+                    getattr(module_passes, f"add_{name}_pass")()
+
+        elif self.level is not OptimizationLevel.O0:
+            with llvm.create_pass_manager_builder() as builder:
+                builder.opt_level = self.level.value
+                builder.size_level = self.size.value
+                builder.inlining_threshold = self.inlining_threshold
+                builder.loop_vectorize = self.level.value >= 2
+                builder.slp_vectorize = self.level.value >= 2
+
+                builder.populate(function_passes)
+                builder.populate(module_passes)
+
+        report = ""
+        if self.time_passes:
+            llvm.set_time_passes(True)
+
+        try:
+            function_passes.initialize()
+            for function in module.functions:
+                function_passes.run(function)
+            function_passes.finalize()
+
+            module_passes.run(module)
+
+        finally:
+            if self.time_passes:
+                report = llvm.report_and_reset_timings() or NO_PASSES_REPORT
+                llvm.set_time_passes(False)
+
+        return report
@@ -0,0 +1,105 @@
+import os
+import re
+
+from array import array
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+
+from _lexer import ENGINES, LexerEngine
+from _source import Source
+from _token import TOKEN_TYPE_IDS
+from _token_buffer import TokenBuffer
+
+
+MIN_CHUNK_SIZE = 1 << 20
+
+WHITESPACE_PATTERN = re.compile(r"[ \r\t\n]")
+
+Columns = tuple[array, array, array, list[Optional[int | float]]]
+
+
+def split_points(text: str, chunk_count: int) -> list[int]:
+    # Marsh has no strings or comments, so a token never contains
+    # whitespace and lexing can restart right after any whitespace character.
+    # Each cut is moved forward to the first whitespace at or after its
+    # target; chunks without one are merged into their neighbour.
+    length = len(text)
+    chunk_size = length // chunk_count
+    points = [0]
+
+    for target in range(chunk_size, length, chunk_size):
+        if target <= points[-1]:
+            continue
+
+        whitespace = WHITESPACE_PATTERN.search(text, target)
+        if whitespace is None:
+            break
+
+        points.append(whitespace.end())
+
+    if points[-1] != length:
+        points.append(length)
+
+    return points
+
+
+def lex_chunk(text: str, offset: int, engine: LexerEngine) -> Columns:
+    types = array("H")
+    starts = array("I")
+    ends = array("I")
+    values: list[Optional[int | float]] = []
+    type_ids = TOKEN_TYPE_IDS
+
+    for token_type, start, end, value in ENGINES[engine](text, 0, None):
+        types.append(type_ids[token_type])
+        starts.append(start + offset)
+        ends.append(end + offset)
+        values.append(value)
+
+    return types, starts, ends, values
+
+
+def tokenize_parallel(
+    source: Source | str,
+    engine: LexerEngine = LexerEngine.SCANNER,
+    max_workers: Optional[int] = None,
+    min_chunk_size: int = MIN_CHUNK_SIZE,
+    use_threads: bool = False,
+) -> TokenBuffer:
+    if not isinstance(source, Source):
+        source = Source(source)
+
+    text = source.text
+    max_workers = max_workers or os.cpu_count() or 1
+    chunk_count = min(max_workers, len(text) // max(min_chunk_size, 1))
+
+    buffer = TokenBuffer(source)
+
+    if chunk_count < 2:
+        columns = [lex_chunk(text, 0, engine)]
+
+    else:
+        points = split_points(text, chunk_count)
+        executor_type: type[Executor] = (
+            ThreadPoolExecutor if use_threads else ProcessPoolExecutor
+        )
+
+        with executor_type(max_workers=len(points) - 1) as executor:
+            columns = list(
+                executor.map(
+                    lex_chunk,
+                    [text[start:end] for start, end in zip(points, points[1:])],
+                    points[:-1],
+                    [engine] * (len(points) - 1),
+                )
+            )
+
+    for types, starts, ends, values in columns:
+        buffer.types.extend(types)
+        buffer.starts.extend(starts)
+        buffer.ends.extend(ends)
+        buffer.values.extend(values)
+
+    buffer.append_eof()
+
+    return buffer
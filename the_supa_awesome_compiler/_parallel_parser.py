@@ -0,0 +1,190 @@
+import gc
+import os
+import re
+
+from array import array
+from bisect import bisect_left
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+
+from _AST import Node, Program, SCALAR_TYPES, Statement
+from _lexer import LexerEngine
+from _parallel_lexer import tokenize_parallel
+from _parser import Parser
+from _source import Source
+from _symbols import SYMBOLS
+from _token import TokenType, TOKEN_TYPE_IDS
+from _token_buffer import TokenBuffer
+
+
+# in tokens
+MIN_CHUNK_SIZE = 1 << 16
+
+# the pre-scan only looks at braces and function keywords. The type column
+# is translated into one byte per token so a regex can find them.
+BOUNDARY_MARKS = bytearray(b" " * 256)
+BOUNDARY_MARKS[TOKEN_TYPE_IDS[TokenType.LCURLY]] = ord("{")
+BOUNDARY_MARKS[TOKEN_TYPE_IDS[TokenType.RCURLY]] = ord("}")
+BOUNDARY_MARKS[TOKEN_TYPE_IDS[TokenType.FUNCTION]] = ord("f")
+
+BOUNDARY_PATTERN = re.compile(rb"[{}f]")
+
+Chunk = tuple[str, array, array, array, list[Optional[int | float]]]
+
+
+def declaration_starts(types: array) -> list[int]:
+    # Token indices of the top-level function declarations: a function
+    # keyword outside of any braces, either first in the file or right after
+    # the } that closed the previous declaration. Parsing can restart at any
+    # of them without changing the result for a valid program.
+    marks = array("B", types).tobytes().translate(BOUNDARY_MARKS)
+    starts = []
+    depth = 0
+
+    for match in BOUNDARY_PATTERN.finditer(marks):
+        mark = match[0]
+
+        if mark == b"{":
+            depth += 1
+        elif mark == b"}":
+            depth = max(depth - 1, 0)
+        elif not depth:
+            index = match.start()
+            if not index or marks[index - 1] == ord("}"):
+                starts.append(index)
+
+    return starts
+
+
+def split_points(types: array, chunk_count: int) -> list[int]:
+    # Cuts the token stream into about chunk_count runs of whole top-level
+    # declarations with a similar number of tokens each. The last run ends
+    # before the EOF token.
+    length = len(types) - 1
+    starts = declaration_starts(types)
+    points = [0]
+
+    for chunk in range(1, chunk_count):
+        position = bisect_left(starts, chunk * length // chunk_count)
+        if position == len(starts):
+            break
+
+        if starts[position] > points[-1]:
+            points.append(starts[position])
+
+    points.append(length)
+
+    return points
+
+
+def chunk_columns(buffer: TokenBuffer, start: int, stop: int) -> Chunk:
+    # the text and token columns of tokens start..stop, moved to offset 0 so
+    # a worker only receives its own part of the source
+    offset = buffer.starts[start]
+    text = buffer.source.text[offset : buffer.ends[stop - 1]]
+
+    return (
+        text,
+        buffer.types[start:stop],
+        array("I", map((-offset).__add__, buffer.starts[start:stop])),
+        array("I", map((-offset).__add__, buffer.ends[start:stop])),
+        buffer.values[start:stop],
+    )
+
+
+def parse_chunk(chunk: Chunk) -> tuple[list[Statement], list[str]]:
+    text, types, starts, ends, values = chunk
+
+    buffer = TokenBuffer(Source(text))
+    buffer.types = types
+    buffer.starts = starts
+    buffer.ends = ends
+    buffer.values = values
+    buffer.append_eof()
+
+    parser = Parser(buffer)
+    program = parser.parse_program()
+
+    return program.statements, parser.errors
+
+
+def intern_names(statements: list[Statement]) -> None:
+    # Statements unpickled from a worker process bring their own copies of
+    # every string, but names are compared by identity, so they are swapped
+    # for the SYMBOLS ones. As when an arena is loaded, every string field is
+    # interned.
+    intern = SYMBOLS.intern
+    stack: list[Node] = list(statements)
+
+    while stack:
+        node = stack.pop()
+
+        for field in type(node).__slots__:
+            value = getattr(node, field)
+
+            if type(value) is str:
+                setattr(node, field, intern(value))
+            elif type(value) is list:
+                stack.extend(item for item in value if isinstance(item, Node))
+            elif type(value) not in SCALAR_TYPES:
+                stack.append(value)
+
+
+def parse_parallel(
+    source: Source | str | TokenBuffer,
+    engine: LexerEngine = LexerEngine.SCANNER,
+    max_workers: Optional[int] = None,
+    min_chunk_size: int = MIN_CHUNK_SIZE,
+    use_threads: bool = False,
+) -> tuple[Program, list[str]]:
+    # Parses runs of top-level function declarations in separate workers and
+    # joins their statements and errors in source order.
+    if isinstance(source, TokenBuffer):
+        buffer = source
+    else:
+        buffer = tokenize_parallel(source, engine, max_workers, use_threads=use_threads)
+
+    max_workers = max_workers or os.cpu_count() or 1
+    chunk_count = min(max_workers, len(buffer) // max(min_chunk_size, 1))
+
+    if chunk_count < 2:
+        parser = Parser(buffer)
+        return parser.parse_program(), parser.errors
+
+    points = split_points(buffer.types, chunk_count)
+    chunks = [
+        chunk_columns(buffer, start, stop) for start, stop in zip(points, points[1:])
+    ]
+
+    # Unpickling the statements allocates millions of small acyclic objects,
+    # and the cyclic collector would rescan the growing heap over and over.
+    # The worker processes only live for this call and never collect.
+    gc_enabled = gc.isenabled()
+    gc.disable()
+
+    try:
+        if use_threads:
+            executor: Executor = ThreadPoolExecutor(max_workers=len(chunks))
+        else:
+            executor = ProcessPoolExecutor(
+                max_workers=len(chunks), initializer=gc.disable
+            )
+
+        with executor:
+            results = list(executor.map(parse_chunk, chunks))
+
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    program = Program()
+    errors: list[str] = []
+
+    for statements, chunk_errors in results:
+        if not use_threads:
+            intern_names(statements)
+
+        program.statements.extend(statements)
+        errors.extend(chunk_errors)
+
+    return program, errors
@@ -1,7 +1,10 @@
-from _lexer import Lexer
-from _token import Token, TokenType
-from typing import Callable, Optional, cast
+from _lexer import Lexer, StreamLexer
+from _symbols import SYMBOLS
+from _token import TokenType, TOKEN_TYPES
+from _token_buffer import TokenBuffer, TokenWindow, NAME_TOKEN_IDS
+from typing import Callable, Optional
 from enum import Enum, auto
+import sys
 
 from _AST import Statement, Expression, Program
 from _AST import (
@@ -14,13 +17,16 @@ from _AST import (
     IfStatement,
     WhileLoop,
     ForLoop,
+    LoopAttribute,
     CallExpression,
     ArrayLiteral,
     IndexExpression,
+    LOOP_ATTRIBUTES,
 )
 from _AST import InfixExpression, PrefixExpression
 from _AST import IntegerLiteral, FloatLiteral, IdentifierLiteral, BooleanLiteral
 from _AST import FunctionParameter
+from _hash_cons import ExpressionTable
 
 
 class PrecedenceType(Enum):
@@ -59,58 +65,151 @@ PRECEDENCES: dict[TokenType, PrecedenceType] = {
     TokenType.LSQR: PrecedenceType.P_INDEX,
 }
 
+BINARY_OPERATORS = frozenset(
+    (
+        TokenType.PLUS,
+        TokenType.MINUS,
+        TokenType.SLASH,
+        TokenType.ASTERISK,
+        TokenType.MOD,
+        TokenType.EQ_EQ,
+        TokenType.NOT_EQ,
+        TokenType.GT,
+        TokenType.LT,
+        TokenType.GT_EQ,
+        TokenType.LT_EQ,
+        TokenType.BW_XOR,
+        TokenType.BW_OR,
+        TokenType.BW_AND,
+    )
+)
+
+LOWEST: int = PrecedenceType.P_LOWEST.value
+
+# plain int precedence of every token type, indexed by token type id
+PRECEDENCE_VALUES: list[int] = [
+    PRECEDENCES[token_type].value if token_type in PRECEDENCES else LOWEST
+    for token_type in TOKEN_TYPES
+]
+
+# tokens read from a StreamLexer at a time, and how far past the current
+# token the parser may look
+WINDOW_BLOCK = 1 << 12
+LOOKAHEAD = 4
+
+
+def dispatch_table(functions: dict[TokenType, Callable]) -> list[Optional[Callable]]:
+    return [functions.get(token_type) for token_type in TOKEN_TYPES]
+
 
 class Parser:
-    def __init__(self, lexer: Lexer):
+    # Parses a fully lexed TokenBuffer. The current token is an index into
+    # the buffer's columns, and the peek token is the one after it. With
+    # hash_cons, structurally equal expressions are parsed into one shared
+    # node, see ExpressionTable.
+    # A StreamLexer is not lexed in full. Its tokens are read into a
+    # TokenWindow a block at a time as the parser reaches them, and the
+    # tokens of the top-level statements already parsed are dropped, so the
+    # parser holds a block or so of tokens plus the statement it is in.
+    def __init__(
+        self, lexer: Lexer | StreamLexer | TokenBuffer, hash_cons: bool = False
+    ):
         self.lexer = lexer
 
         self.errors: list[str] = []
+        self.expressions: Optional[ExpressionTable] = (
+            ExpressionTable() if hash_cons else None
+        )
 
-        self.__current_token: Optional[Token] = None
-        self.__peek_token: Optional[Token] = None
-
-        self.__prefix_parse_fns: dict[TokenType, Callable[[], Expression | None]] = {
-            TokenType.INT: self.__parse_int_literal,
-            TokenType.FLOAT: self.__parse_float_literal,
-            TokenType.LPAREN: self.__parse_grouped_expression,
-            TokenType.IDENTIFIER: self.__parse_identifier_literal,
-            TokenType.TRUE: self.__parse_boolean_literal,
-            TokenType.FALSE: self.__parse_boolean_literal,
-            TokenType.BW_NOT: self.__parse_bitwise_not_expression,
-        }
-        self.__infix_parse_fns: dict[
-            TokenType, Callable[[Expression], InfixExpression | None]
-        ] = {
-            TokenType.PLUS: self.__parse_infix_expression,
-            TokenType.MINUS: self.__parse_infix_expression,
-            TokenType.SLASH: self.__parse_infix_expression,
-            TokenType.ASTERISK: self.__parse_infix_expression,
-            TokenType.MOD: self.__parse_infix_expression,
-            TokenType.EQ_EQ: self.__parse_infix_expression,
-            TokenType.NOT_EQ: self.__parse_infix_expression,
-            TokenType.GT: self.__parse_infix_expression,
-            TokenType.LT: self.__parse_infix_expression,
-            TokenType.GT_EQ: self.__parse_infix_expression,
-            TokenType.LT_EQ: self.__parse_infix_expression,
-            TokenType.BW_XOR: self.__parse_infix_expression,
-            TokenType.BW_OR: self.__parse_infix_expression,
-            TokenType.BW_AND: self.__parse_infix_expression,
-            TokenType.LPAREN: self.__parse_call_expression,
-            TokenType.LSQR: self.__parse_index_expression,
-        }
-
-        self.__next_token()
-        self.__next_token()
+        if isinstance(lexer, StreamLexer):
+            buffer = TokenWindow(lexer.next_token)
+        elif isinstance(lexer, TokenBuffer):
+            buffer = lexer
+        else:
+            buffer = lexer.tokenize()
+        self.__buffer = buffer
+        self.__ids = buffer.types
+        self.__values = buffer.values
+
+        self.__types: list[TokenType] = []
+        self.__precedences: list[int] = []
+        self.__index = 0
+
+        if isinstance(buffer, TokenWindow):
+            self.__window: Optional[TokenWindow] = buffer
+            self.__last = sys.maxsize
+            self.__filled = 0
+            self.__fill()
+        else:
+            self.__window = None
+            self.__add_tokens(0)
+            self.__last = len(buffer) - 1
+            self.__filled = sys.maxsize
+
+    def __add_tokens(self, start: int) -> None:
+        ids = self.__ids[start:]
+        self.__types.extend([TOKEN_TYPES[i] for i in ids])
+        self.__precedences.extend([PRECEDENCE_VALUES[i] for i in ids])
+
+        # one extra EOF / LOWEST past the end so peeking at the EOF token
+        # never runs off the columns
+        self.__types.append(TokenType.EOF)
+        self.__precedences.append(LOWEST)
+
+    def __fill(self) -> None:
+        # reads the next block of a streamed source into the window; the
+        # parser looks at most LOOKAHEAD tokens past the current one
+        window = self.__window
+        start = len(window)
+        window.fill(WINDOW_BLOCK)
+
+        # the sentinels of the last fill go, the new tokens take their place
+        del self.__types[start:]
+        del self.__precedences[start:]
+        self.__add_tokens(start)
+
+        if window.exhausted:
+            self.__last = len(window) - 1
+            self.__filled = sys.maxsize
+        else:
+            self.__filled = len(window)
+
+    def __drop_parsed(self) -> None:
+        # between top-level statements nothing refers to the tokens before
+        # the current one any more
+        count = self.__index
+        self.__window.drop(count)
+        del self.__types[:count]
+        del self.__precedences[:count]
+
+        self.__index = 0
+        if self.__filled == sys.maxsize:
+            self.__last -= count
+        else:
+            self.__filled -= count
 
     def __next_token(self) -> None:
-        self.__current_token = self.__peek_token
-        self.__peek_token = self.lexer.next_token()
+        if self.__index < self.__last:
+            self.__index += 1
+
+            if self.__index + LOOKAHEAD >= self.__filled:
+                self.__fill()
 
     def __peak_token_is(self, token_type: TokenType) -> bool:
-        return cast(Token, self.__peek_token).token_type is token_type
+        return self.__types[self.__index + 1] is token_type
 
     def __current_token_is(self, token_type: TokenType) -> bool:
-        return cast(Token, self.__current_token).token_type is token_type
+        return self.__types[self.__index] is token_type
+
+    def __current_literal(self) -> str:
+        literal = self.__buffer.literal(self.__index)
+
+        if self.__ids[self.__index] in NAME_TOKEN_IDS:
+            return SYMBOLS.intern(literal)
+        return literal
+
+    def __current_value(self) -> Optional[int | float]:
+        return self.__values[self.__index]
 
     def __expect_token(self, token_type: TokenType) -> bool:
         if self.__peak_token_is(token_type):
@@ -122,32 +221,16 @@ class Parser:
 
     def __peek_error(self, token_type: TokenType) -> None:
         self.errors.append(
-            f"Expected next token to be: {token_type}, got {cast(Token, self.__peek_token).token_type} instead."
+            f"Expected next token to be: {token_type}, got {self.__types[self.__index + 1]} instead."
         )
 
     def __no_prefix_parse_fn_error(self, token_type: TokenType) -> None:
         self.errors.append(f"No prefix parse function found for {token_type}")
 
-    def __current_precedence(self) -> PrecedenceType:
-        precedence: PrecedenceType | None = PRECEDENCES.get(
-            cast(Token, self.__current_token).token_type
-        )
-        if precedence is None:
-            return PrecedenceType.P_LOWEST
-        return precedence
-
-    def __peak_precedence(self) -> PrecedenceType:
-        precedence: PrecedenceType | None = PRECEDENCES.get(
-            cast(Token, self.__peek_token).token_type
-        )
-        if precedence is None:
-            return PrecedenceType.P_LOWEST
-        return precedence
-
     def parse_program(self) -> Program:
         program: Program = Program()
 
-        while cast(Token, self.__current_token).token_type != TokenType.EOF:
+        while self.__types[self.__index] is not TokenType.EOF:
             statement: Statement = self.__parse_statement()
 
             if statement is not None:
@@ -155,10 +238,13 @@ class Parser:
 
             self.__next_token()
 
+            if self.__window is not None and self.__index >= WINDOW_BLOCK:
+                self.__drop_parsed()
+
         return program
 
     def __parse_statement(self) -> Statement:
-        match self.__current_token.token_type:
+        match self.__types[self.__index]:
             case TokenType.FUNCTION:
                 return self.__parse_function_declaration()
             case TokenType.RETURN:
@@ -173,6 +259,8 @@ class Parser:
                 return self.__parse_while_loop()
             case TokenType.FOR:
                 return self.__parse_for_loop()
+            case TokenType.HASH:
+                return self.__parse_attributed_for_loop()
             case _:
                 return self.__parse_expression_statement()
 
@@ -182,9 +270,7 @@ class Parser:
         if not self.__expect_token(TokenType.IDENTIFIER):
             return None
 
-        function_statement.function_name = IdentifierLiteral(
-            self.__current_token.token_literal
-        )
+        function_statement.function_name = IdentifierLiteral(self.__current_literal())
 
         if not self.__expect_token(TokenType.LPAREN):
             return None
@@ -197,7 +283,7 @@ class Parser:
         if not self.__expect_token(TokenType.TYPE):
             return None
 
-        function_statement.return_type = self.__current_token.token_literal
+        function_statement.return_type = self.__current_literal()
 
         if not self.__expect_token(TokenType.LCURLY):
             return None
@@ -217,31 +303,27 @@ class Parser:
 
         self.__next_token()
 
-        first_parameter: FunctionParameter = FunctionParameter(
-            self.__current_token.token_literal
-        )
+        first_parameter: FunctionParameter = FunctionParameter(self.__current_literal())
 
         if not self.__expect_token(TokenType.COLON):
             return None
 
         self.__next_token()
 
-        first_parameter.parameter_type = self.__current_token.token_literal
+        first_parameter.parameter_type = self.__current_literal()
         parameters.append(first_parameter)
 
         while self.__peak_token_is(TokenType.COMMA):
             self.__next_token()
             self.__next_token()
 
-            parameter: FunctionParameter = FunctionParameter(
-                self.__current_token.token_literal
-            )
+            parameter: FunctionParameter = FunctionParameter(self.__current_literal())
             if not self.__expect_token(TokenType.COLON):
                 return None
 
             self.__next_token()
 
-            parameter.parameter_type = self.__current_token.token_literal
+            parameter.parameter_type = self.__current_literal()
             parameters.append(parameter)
         if not self.__expect_token(TokenType.RPAREN):
             return None
@@ -252,7 +334,7 @@ class Parser:
         return_statement: ReturnStatement = ReturnStatement()
         self.__next_token()
 
-        return_statement.return_value = self.__parse_expression(PrecedenceType.P_LOWEST)
+        return_statement.return_value = self.__parse_expression(LOWEST)
 
         if not self.__expect_token(TokenType.SEMICOLON):
             return None
@@ -275,35 +357,151 @@ class Parser:
 
         return block_statement
 
-    def __parse_expression(self, precedence: PrecedenceType) -> Expression | None:
-        prefix_fn: Callable | None = self.__prefix_parse_fns.get(
-            cast(Token, self.__current_token).token_type
-        )
-        if prefix_fn is None:
-            self.__no_prefix_parse_fn_error(
-                cast(Token, self.__current_token).token_type
-            )
-            return None
-
-        left_expression = prefix_fn()
-        while (
-            not self.__peak_token_is(TokenType.SEMICOLON)
-            and precedence.value < self.__peak_precedence().value
-        ):
-            infix_fn: Callable | None = self.__infix_parse_fns.get(
-                cast(Token, self.__peek_token).token_type
-            )
-            if infix_fn is None:
-                return left_expression
-
-            self.__next_token()
-
-            left_expression = infix_fn(left_expression)
-
-        return left_expression
+    def __parse_expression(self, precedence: int) -> Expression | None:
+        # Pratt parsing with an explicit stack instead of recursion. Every
+        # operand that needs an expression of its own pushes the node that
+        # waits for it, together with the precedence to go back to once the
+        # operand is done:
+        #   None              a parenthesized expression
+        #   PrefixExpression  the operand of ~
+        #   InfixExpression   the right side of a binary operator
+        #   CallExpression    the next call argument
+        #   IndexExpression   the index
+        # Tokens that were just peeked at are never EOF, so moving onto or
+        # past them bumps the index directly.
+        types = self.__types
+        ids = self.__ids
+        precedences = self.__precedences
+        prefix_parse_fns = Parser.__prefix_parse_fns
+        binary_operators = Parser.__binary_operators
+        intern = self.expressions.intern if self.expressions is not None else None
+
+        stack: list[tuple[Optional[Expression], int]] = []
+        left: Optional[Expression] = None
+        expect_operand = True
+        done = False
+
+        while True:
+            if self.__index + LOOKAHEAD >= self.__filled:
+                self.__fill()
+
+            if expect_operand:
+                expect_operand = False
+                index = self.__index
+                prefix_fn = prefix_parse_fns[ids[index]]
+
+                if prefix_fn is not None:
+                    left = prefix_fn(self)
+
+                elif types[index] is TokenType.LPAREN:
+                    stack.append((None, precedence))
+                    self.__index = index + 1
+                    precedence = LOWEST
+                    expect_operand = True
+                    continue
+
+                elif types[index] is TokenType.BW_NOT:
+                    node = PrefixExpression(self.__current_literal())
+                    stack.append((node, precedence))
+                    self.__index = index + 1
+                    precedence = LOWEST
+                    expect_operand = True
+                    continue
+
+                else:
+                    self.__no_prefix_parse_fn_error(types[index])
+                    left = None
+                    done = True
+
+            if not done:
+                # every finished operand passes here once, after its own
+                # operands did
+                if intern is not None and left is not None:
+                    left = intern(left)
+
+                # ; has the lowest precedence, so it always ends the loop here
+                index = self.__index + 1
+
+                if precedence >= precedences[index]:
+                    done = True
+
+                elif binary_operators[ids[index]]:
+                    node = InfixExpression(left, self.__buffer.literal(index), None)
+                    stack.append((node, precedence))
+                    precedence = precedences[index]
+                    self.__index = index + 1
+                    expect_operand = True
+                    continue
+
+                elif types[index] is TokenType.LPAREN:
+                    call = CallExpression(left, [])
+
+                    if types[index + 1] is TokenType.RPAREN:
+                        self.__index = index + 1
+                        left = call
+                        continue
+
+                    stack.append((call, precedence))
+                    self.__index = index + 1
+                    precedence = LOWEST
+                    expect_operand = True
+                    continue
+
+                elif types[index] is TokenType.LSQR:
+                    stack.append((IndexExpression(left), precedence))
+                    self.__index = index + 1
+                    precedence = LOWEST
+                    expect_operand = True
+                    continue
+
+                else:
+                    # ~ has a precedence but is not an infix operator
+                    done = True
+
+            if not stack:
+                return left
+
+            node, precedence = stack.pop()
+            waiting = type(node)
+            done = False
+
+            if waiting is InfixExpression:
+                if left is None:
+                    self.errors.append(
+                        f"Could not parse the expression with the left node: {node.left_node}"
+                    )
+                else:
+                    node.right_node = left
+                    left = node
+
+            elif node is None:
+                if not self.__expect_token(TokenType.RPAREN):
+                    left = None
+
+            elif waiting is CallExpression:
+                node.arguments.append(left)
+
+                if types[self.__index + 1] is TokenType.COMMA:
+                    self.__index += 2
+                    stack.append((node, precedence))
+                    precedence = LOWEST
+                    expect_operand = True
+                    continue
+
+                if not self.__expect_token(TokenType.RPAREN):
+                    node.arguments = None
+                left = node
+
+            elif waiting is IndexExpression:
+                node.index = left
+                left = node if self.__expect_token(TokenType.RSQR) else None
+
+            else:
+                node.operand = left
+                left = node
 
     def __parse_expression_statement(self) -> ExpressionStatement:
-        expression = self.__parse_expression(PrecedenceType.P_LOWEST)
+        expression = self.__parse_expression(LOWEST)
 
         if self.__peak_token_is(TokenType.SEMICOLON):
             self.__next_token()
@@ -318,7 +516,7 @@ class Parser:
         if not self.__expect_token(TokenType.IDENTIFIER):
             return None
 
-        statement.identifier = IdentifierLiteral(self.__current_token.token_literal)
+        statement.identifier = IdentifierLiteral(self.__current_literal())
 
         if not self.__expect_token(TokenType.COLON):
             return None
@@ -329,7 +527,7 @@ class Parser:
             if not self.__expect_token(TokenType.TYPE):
                 return None
 
-            statement.value_type = self.__current_token.token_literal
+            statement.value_type = self.__current_literal()
 
             if not self.__expect_token(TokenType.COMMA):
                 return None
@@ -337,7 +535,7 @@ class Parser:
             if not self.__expect_token(TokenType.INT):
                 return None
 
-            statement.size = int(self.__current_token.token_literal)
+            statement.size = self.__current_value()
 
             if not self.__expect_token(TokenType.RSQR):
                 return None
@@ -351,13 +549,13 @@ class Parser:
             if not self.__expect_token(TokenType.TYPE):
                 return None
 
-            statement.value_type = self.__current_token.token_literal
+            statement.value_type = self.__current_literal()
             if not self.__expect_token(TokenType.EQUALS):
                 return None
 
             self.__next_token()
 
-            statement.value = self.__parse_expression(PrecedenceType.P_LOWEST)
+            statement.value = self.__parse_expression(LOWEST)
 
         while not self.__current_token_is(
             TokenType.SEMICOLON
@@ -374,120 +572,60 @@ class Parser:
 
         while not self.__peak_token_is(TokenType.RSQR):
             self.__next_token()
-            array_literal.values.append(
-                self.__parse_expression(PrecedenceType.P_LOWEST)
-            )
+            array_literal.values.append(self.__parse_expression(LOWEST))
             if self.__peak_token_is(TokenType.COMMA):
                 self.__next_token()
 
+        if self.expressions is not None:
+            return self.expressions.intern(array_literal)
         return array_literal
 
-    def __parse_index_expression(self, array: Expression) -> Expression:
-        index_expression = IndexExpression()
-        index_expression.array = array
-
-        self.__next_token()
-
-        index_expression.index = self.__parse_expression(PrecedenceType.P_LOWEST)
-
-        if not self.__expect_token(TokenType.RSQR):
-            return None
-
-        return index_expression
-
     def __parse_reassignment_statement(self):
         reassignment_statement: ReassignmentStatement = ReassignmentStatement()
-        reassignment_statement.identifier = IdentifierLiteral(
-            self.__current_token.token_literal
-        )
+        reassignment_statement.identifier = IdentifierLiteral(self.__current_literal())
 
         if not self.__expect_token(TokenType.EQUALS):
             return None
 
         self.__next_token()
 
-        reassignment_statement.value = self.__parse_expression(PrecedenceType.P_LOWEST)
+        reassignment_statement.value = self.__parse_expression(LOWEST)
 
         if not self.__expect_token(TokenType.SEMICOLON):
             return None
 
         return reassignment_statement
 
-    def __parse_infix_expression(self, left_node: Expression) -> InfixExpression | None:
-        infix_expression: InfixExpression = InfixExpression(
-            left_node=left_node,
-            operator=cast(Token, self.__current_token).token_literal,
-            right_node=None,
-        )
-        precedence = self.__current_precedence()
-        self.__next_token()
-
-        if not (right_node := self.__parse_expression(precedence)):
-            self.errors.append(
-                f"Could not parse the expression with the left node: {left_node}"
-            )
-            return None
-        infix_expression.right_node = right_node
-        return infix_expression
-
-    def __parse_grouped_expression(self):
-        self.__next_token()
-
-        expression: Expression = self.__parse_expression(PrecedenceType.P_LOWEST)
+    def __parse_int_literal(self) -> Expression | None:
+        value = self.__current_value()
 
-        if not self.__expect_token(TokenType.RPAREN):
+        if value is None:
+            self.errors.append(f"Could not parse {self.__current_literal()} as an int")
             return None
 
-        return expression
+        return IntegerLiteral(value)
 
-    def __parse_int_literal(self) -> Expression | None:
-        int_literal: IntegerLiteral = IntegerLiteral()
+    def __parse_float_literal(self) -> Expression | None:
+        value = self.__current_value()
 
-        try:
-            int_literal.int_literal = int(
-                cast(Token, self.__current_token).token_literal
-            )
-            return int_literal
-        except ValueError:
-            self.errors.append(
-                f"Could not parse {cast(Token, self.__current_token).token_literal} as an int"
-            )
+        if value is None:
+            self.errors.append(f"Could not parse {self.__current_literal()} as a float")
             return None
 
-    def __parse_float_literal(self) -> Expression | None:
-        float_literal: FloatLiteral = FloatLiteral()
-        try:
-            float_literal.float_literal = float(
-                cast(Token, self.__current_token).token_literal
-            )
-            return float_literal
-        except ValueError:
-            self.errors.append(
-                f"Could not parse {cast(Token, self.__current_token).token_literal} as a float"
-            )
-            return None
+        return FloatLiteral(value)
 
     def __parse_identifier_literal(self):
-        return IdentifierLiteral(self.__current_token.token_literal)
+        return IdentifierLiteral(self.__current_literal())
 
     def __parse_boolean_literal(self):
         return BooleanLiteral(self.__current_token_is(TokenType.TRUE))
 
-    def __parse_bitwise_not_expression(self):
-        prefix_expression = PrefixExpression()
-        prefix_expression.operator = self.__current_token.token_literal
-
-        self.__next_token()
-
-        prefix_expression.operand = self.__parse_expression(PrecedenceType.P_LOWEST)
-        return prefix_expression
-
     def __parse_if_statement(self):
         if_statement: IfStatement = IfStatement()
 
         self.__next_token()
 
-        if_statement.condition = self.__parse_expression(PrecedenceType.P_LOWEST)
+        if_statement.condition = self.__parse_expression(LOWEST)
 
         if not self.__expect_token(TokenType.LCURLY):
             return None
@@ -507,7 +645,7 @@ class Parser:
 
         self.__next_token()
 
-        while_loop.condition = self.__parse_expression(PrecedenceType.P_LOWEST)
+        while_loop.condition = self.__parse_expression(LOWEST)
 
         if not self.__expect_token(TokenType.LCURLY):
             return None
@@ -526,20 +664,23 @@ class Parser:
         if not self.__expect_token(TokenType.IN):
             return None
 
-        if not self.__expect_token(TokenType.INT):
-            return None
-        for_loop.range_start = self.__parse_int_literal()
+        self.__next_token()
+        for_loop.range_start = self.__parse_expression(LOWEST)
 
         if not self.__expect_token(TokenType.RANGE_SEPARATOR):
             return None
 
-        if not self.__expect_token(TokenType.INT):
-            return None
-        for_loop.range_end = self.__parse_int_literal()
+        self.__next_token()
+        for_loop.range_end = self.__parse_expression(LOWEST)
 
-        for_loop.condition = InfixExpression(
-            left_node=for_loop.identifier, operator="<", right_node=for_loop.range_end
-        )
+        # step is a keyword only here, anywhere else it is an ordinary name
+        if (
+            self.__peak_token_is(TokenType.IDENTIFIER)
+            and self.__buffer.literal(self.__index + 1) == "step"
+        ):
+            self.__next_token()
+            self.__next_token()
+            for_loop.step = self.__parse_expression(LOWEST)
 
         if not self.__expect_token(TokenType.LCURLY):
             return None
@@ -548,30 +689,68 @@ class Parser:
 
         return for_loop
 
-    def __parse_call_expression(self, function_name: IdentifierLiteral):
-        expr: CallExpression = CallExpression(function_name)
-        expr.arguments = self.__parse_expression_list()
+    def __parse_attributed_for_loop(self):
+        # #[name] or #[name(n)], one or more of them, in front of a for loop
+        attributes: list[LoopAttribute] = []
 
-        return expr
+        while self.__current_token_is(TokenType.HASH):
+            if not self.__expect_token(TokenType.LSQR):
+                return None
 
-    def __parse_expression_list(self):
-        expression_list: list[Expression] = []
+            if not self.__expect_token(TokenType.IDENTIFIER):
+                return None
 
-        if self.__peak_token_is(TokenType.RPAREN):
-            self.__next_token()
-            return expression_list
+            attribute: LoopAttribute = LoopAttribute(self.__current_literal())
+            if attribute.name not in LOOP_ATTRIBUTES:
+                self.errors.append(f"Unknown loop attribute {attribute.name}")
 
-        self.__next_token()
+            if self.__peak_token_is(TokenType.LPAREN):
+                self.__next_token()
 
-        expression_list.append(self.__parse_expression(PrecedenceType.P_LOWEST))
+                if not self.__expect_token(TokenType.INT):
+                    return None
 
-        while self.__peak_token_is(TokenType.COMMA):
-            self.__next_token()
-            self.__next_token()
+                attribute.argument = self.__current_value()
+                if attribute.argument is not None and attribute.argument < 1:
+                    self.errors.append(
+                        f"The argument of loop attribute {attribute.name} must be positive"
+                    )
 
-            expression_list.append(self.__parse_expression(PrecedenceType.P_LOWEST))
+                if not self.__expect_token(TokenType.RPAREN):
+                    return None
 
-        if not self.__expect_token(TokenType.RPAREN):
+            if not self.__expect_token(TokenType.RSQR):
+                return None
+
+            attributes.append(attribute)
+            self.__next_token()
+
+        if not self.__current_token_is(TokenType.FOR):
+            self.errors.append(
+                f"Expected a for loop after the loop attributes, got {self.__types[self.__index]} instead."
+            )
             return None
 
-        return expression_list
+        for_loop = self.__parse_for_loop()
+        if for_loop is not None:
+            for_loop.attributes = attributes
+
+        return for_loop
+
+    # built once per class; indexed by token type id and called with the
+    # parser as the first argument. ( and ~ start nested operands and are
+    # handled by __parse_expression itself.
+    __prefix_parse_fns: list[Optional[Callable[..., Expression | None]]] = (
+        dispatch_table(
+            {
+                TokenType.INT: __parse_int_literal,
+                TokenType.FLOAT: __parse_float_literal,
+                TokenType.IDENTIFIER: __parse_identifier_literal,
+                TokenType.TRUE: __parse_boolean_literal,
+                TokenType.FALSE: __parse_boolean_literal,
+            }
+        )
+    )
+    __binary_operators: list[bool] = [
+        token_type in BINARY_OPERATORS for token_type in TOKEN_TYPES
+    ]
@@ -0,0 +1,89 @@
+from array import array
+from bisect import bisect_left
+from typing import Optional
+
+from _lexer import ENGINES, WHITESPACE, LexerEngine
+from _source import Source
+from _token import TOKEN_TYPE_IDS
+from _token_buffer import TokenBuffer
+
+
+class Relex:
+    # old tokens [first, old_stop) were replaced by new tokens [first, new_stop)
+    def __init__(
+        self, buffer: TokenBuffer, first: int, old_stop: int, new_stop: int
+    ) -> None:
+        self.buffer = buffer
+        self.first = first
+        self.old_stop = old_stop
+        self.new_stop = new_stop
+
+
+def restart_index(buffer: TokenBuffer, offset: int) -> int:
+    # the first token that ends at or after the edit could grow into it, and
+    # tokens glued to it without whitespace (e.g. the pieces of 1..10) were
+    # lexed together with it, so back up to the start of that run
+    index = bisect_left(buffer.ends, offset)
+
+    while index > 0 and buffer.ends[index - 1] == buffer.starts[index]:
+        index -= 1
+
+    return index
+
+
+def relex(
+    buffer: TokenBuffer,
+    offset: int,
+    removed: int,
+    inserted: str,
+    engine: LexerEngine = LexerEngine.SCANNER,
+) -> Relex:
+    # Lexing only depends on the text from a whitespace boundary onwards. The
+    # damaged region is re-lexed from the run of tokens touching the edit
+    # until a new token starts right after whitespace in the unchanged tail:
+    # from there on the old tokens are still valid, just shifted.
+    old_text = buffer.source.text
+    text = old_text[:offset] + inserted + old_text[offset + removed :]
+    delta = len(inserted) - removed
+    edit_end = offset + len(inserted)
+
+    first = restart_index(buffer, offset)
+    restart = min(buffer.starts[first], offset)
+
+    types = array("H")
+    starts = array("I")
+    ends = array("I")
+    values: list[Optional[int | float]] = []
+    type_ids = TOKEN_TYPE_IDS
+
+    # without a resync point everything up to the old EOF is replaced, and
+    # the EOF itself is shifted along with the (empty) tail
+    old_stop = len(buffer) - 1
+
+    for token_type, start, end, value in ENGINES[engine](text, restart, None):
+        if start > edit_end and text[start - 1] in WHITESPACE:
+            old_stop = bisect_left(buffer.starts, start - delta)
+            break
+
+        types.append(type_ids[token_type])
+        starts.append(start)
+        ends.append(end)
+        values.append(value)
+
+    new_stop = first + len(types)
+
+    relexed = TokenBuffer(Source(text))
+    relexed.types = buffer.types[:first] + types + buffer.types[old_stop:]
+    relexed.values = buffer.values[:first] + values + buffer.values[old_stop:]
+    relexed.starts = (
+        buffer.starts[:first]
+        + starts
+        + array("I", map(delta.__add__, buffer.starts[old_stop:]))
+    )
+    relexed.ends = (
+        buffer.ends[:first]
+        + ends
+        + array("I", map(delta.__add__, buffer.ends[old_stop:]))
+    )
+
+    return Relex(relexed, first, old_stop, new_stop)
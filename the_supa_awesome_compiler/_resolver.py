@@ -0,0 +1,178 @@
+from operator import is_
+
+from _AST import (
+    Node,
+    AssignmentStatement,
+    FunctionStatement,
+    ReassignmentStatement,
+    IfStatement,
+    WhileLoop,
+    ForLoop,
+    CallExpression,
+    IdentifierLiteral,
+    NodeTransformer,
+    copy_node,
+)
+from _environment import ScopeStack
+
+
+class Resolver(NodeTransformer):
+    # Binds every name to its declaration before code generation. Each
+    # declaration (a let, a parameter, a for loop variable or a function)
+    # gets the next slot number, and slots maps the id of every declaring or
+    # using IdentifierLiteral and FunctionParameter to the slot it refers
+    # to, so the compiler finds a value with one dict probe and one list
+    # index. Undefined names are collected in errors instead of stopping at
+    # the first one.
+    #
+    # Scopes follow the compiler: a function, an if statement with both of
+    # its branches and every loop open one, and a let of a name that is
+    # already declared in the same scope stores to that declaration.
+    #
+    # A node can be shared by places that bind it differently, like a
+    # hash-consed x in two functions. The second place gets a copy, and its
+    # parents are copied with it, so resolve() returns the tree to compile,
+    # which may differ from the one passed in, which is never modified.
+    def __init__(self) -> None:
+        self.errors: list[str] = []
+
+        self.slots: dict[int, int] = {}
+        self.declarations: list[Node] = []
+
+        self.__scopes = ScopeStack()
+
+    def resolve(self, node: Node) -> Node:
+        return self.visit(node)
+
+    def __bind(self, node: Node, slot: int) -> Node:
+        if self.slots.setdefault(id(node), slot) != slot:
+            node = copy_node(node)
+            self.slots[id(node)] = slot
+
+        return node
+
+    def __declare(self, node: Node, name: str) -> Node:
+        slot = len(self.declarations)
+        node = self.__bind(node, slot)
+
+        self.declarations.append(node)
+        self.__scopes.define(name, slot)
+
+        return node
+
+    @staticmethod
+    def __updated(node: Node, **fields) -> Node:
+        changes = {}
+
+        for field, value in fields.items():
+            old_value = getattr(node, field)
+
+            if (
+                type(value) is list
+                and type(old_value) is list
+                and len(value) == len(old_value)
+                and all(map(is_, value, old_value))
+            ):
+                continue
+
+            if value is not old_value:
+                changes[field] = value
+
+        return copy_node(node, changes) if changes else node
+
+    def visit_function_statement(self, node: FunctionStatement) -> Node:
+        name = node.function_name.identifier_literal
+
+        # the function's own name is visible inside it for recursion, and
+        # declared after the parameters, so it hides one with the same name
+        self.__scopes.enter_scope()
+        parameters = [
+            self.__declare(parameter, parameter.parameter_name)
+            for parameter in node.parameters
+        ]
+        function_name = self.__declare(node.function_name, name)
+        slot = self.slots[id(function_name)]
+
+        body = self.visit(node.body)
+        self.__scopes.leave_scope()
+
+        # and only visible outside once its body is done
+        self.__scopes.define(name, slot)
+
+        return self.__updated(
+            node, parameters=parameters, function_name=function_name, body=body
+        )
+
+    def visit_assignment_statement(self, node: AssignmentStatement) -> Node:
+        value = self.visit(node.value)
+
+        name = node.identifier.identifier_literal
+        slot = self.__scopes.lookup_local(name)
+
+        if slot is None:
+            identifier = self.__declare(node.identifier, name)
+        else:
+            identifier = self.__bind(node.identifier, slot)
+
+        return self.__updated(node, identifier=identifier, value=value)
+
+    def visit_reassignment_statement(self, node: ReassignmentStatement) -> Node:
+        identifier = self.visit(node.identifier)
+        value = self.visit(node.value)
+
+        return self.__updated(node, identifier=identifier, value=value)
+
+    def visit_if_statement(self, node: IfStatement) -> Node:
+        self.__scopes.enter_scope()
+        condition = self.visit(node.condition)
+        consequence = self.visit(node.consequence)
+        alternative = self.visit(node.alternative)
+        self.__scopes.leave_scope()
+
+        return self.__updated(
+            node, condition=condition, consequence=consequence, alternative=alternative
+        )
+
+    def visit_while_loop(self, node: WhileLoop) -> Node:
+        self.__scopes.enter_scope()
+        condition = self.visit(node.condition)
+        consequence = self.visit(node.consequence)
+        self.__scopes.leave_scope()
+
+        return self.__updated(node, condition=condition, consequence=consequence)
+
+    def visit_for_loop(self, node: ForLoop) -> Node:
+        # the range is evaluated before the loop variable exists
+        range_start = self.visit(node.range_start)
+        range_end = self.visit(node.range_end)
+        step = self.visit(node.step) if node.step is not None else None
+
+        self.__scopes.enter_scope()
+        identifier = self.__declare(node.identifier, node.identifier.identifier_literal)
+        block_statement = self.visit(node.block_statement)
+        self.__scopes.leave_scope()
+
+        return self.__updated(
+            node,
+            identifier=identifier,
+            range_start=range_start,
+            range_end=range_end,
+            step=step,
+            block_statement=block_statement,
+        )
+
+    def visit_function_call(self, node: CallExpression) -> Node:
+        # the compiler evaluates the arguments before it looks up the function
+        arguments = self.visit_list(node.arguments)
+        function_name = self.visit(node.function_name)
+
+        return self.__updated(node, function_name=function_name, arguments=arguments)
+
+    def visit_identifier_literal(self, node: IdentifierLiteral) -> Node:
+        slot = self.__scopes.lookup(node.identifier_literal)
+
+        if slot is None:
+            self.errors.append(f"Undefined variable {node.identifier_literal}")
+            return node
+
+        return self.__bind(node, slot)
@@ -0,0 +1,67 @@
+from bisect import bisect_right
+from typing import Optional
+
+
+class Source:
+    def __init__(
+        self,
+        source: str | bytes | list[str],
+        offset: int = 0,
+        line: int = 0,
+        column: int = 0,
+    ) -> None:
+        if isinstance(source, bytes):
+            source = source.decode()
+        elif isinstance(source, list):
+            source = "".join(source)
+
+        self.text: str = source
+
+        # where text starts in the whole program, for sources that only hold
+        # one window of a streamed file
+        self.offset = offset
+        self.first_line = line
+        self.first_column = column
+
+        # only built the first time a diagnostic asks for a line/column
+        self.__line_starts: Optional[list[int]] = None
+
+    def __len__(self) -> int:
+        return len(self.text)
+
+    @property
+    def line_starts(self) -> list[int]:
+        if self.__line_starts is None:
+            self.__line_starts = self.__build_line_starts()
+        return self.__line_starts
+
+    def __build_line_starts(self) -> list[int]:
+        line_starts = [0]
+        find = self.text.find
+
+        newline = find("\n")
+        while newline != -1:
+            line_starts.append(newline + 1)
+            newline = find("\n", newline + 1)
+
+        return line_starts
+
+    def line(self, offset: int) -> int:
+        return (
+            bisect_right(self.line_starts, offset - self.offset) - 1 + self.first_line
+        )
+
+    def position(self, offset: int) -> tuple[int, int]:
+        row = self.line(offset) - self.first_line
+        column = offset - self.offset - self.line_starts[row]
+
+        if row == 0:
+            column += self.first_column
+
+        return row + self.first_line, column
+
+    def end_position(self) -> tuple[int, int]:
+        return self.position(self.offset + len(self.text))
+
+    def slice(self, start: int, end: int) -> str:
+        return self.text[start - self.offset : end - self.offset]
@@ -0,0 +1,206 @@
+from llvmlite import ir
+
+
+def successors(block: ir.Block) -> list[ir.Block]:
+    terminator = block.terminator
+    if terminator is None:
+        return []
+
+    return [operand for operand in terminator.operands if type(operand) is ir.Block]
+
+
+class SSABuilder:
+    # Builds SSA form for one function while its code is generated, as in
+    # Braun et al., "Simple and Efficient Construction of Static Single
+    # Assignment Form" (CC 2013). A write records a variable's value for the
+    # current block. A read in a block without one asks the predecessors,
+    # and where several of them meet, a phi merges their values.
+    #
+    # The compiler reports the edges out of every block once its terminator
+    # is emitted, and seals a block when all of its predecessors are known.
+    # A read in a block that is not sealed yet, like a loop header before
+    # its back edge, gets an incomplete phi that is filled in by seal().
+    # Phis that merge only one value are removed again, and finish()
+    # redirects the instructions that were already using them.
+    #
+    # Variables are the Resolver's slot numbers. Reads walk the predecessors
+    # with explicit stacks, so long chains of blocks cannot overflow the
+    # recursion limit.
+    def __init__(self, builder: ir.IRBuilder) -> None:
+        self.__builder = builder
+
+        # the value of every variable at the end of each block that wrote it,
+        # or that a read passed through
+        self.__definitions: dict[int, dict[ir.Block, ir.Value]] = {}
+
+        self.__predecessors: dict[ir.Block, list[ir.Block]] = {}
+        self.__linked: set[ir.Block] = set()
+        self.__sealed: set[ir.Block] = set()
+        self.__incomplete: dict[ir.Block, dict[int, ir.PhiInstr]] = {}
+
+        # removed phis and what replaces them, and the phis using each phi
+        self.__replaced: dict[ir.PhiInstr, ir.Value] = {}
+        self.__users: dict[ir.PhiInstr, list[ir.PhiInstr]] = {}
+
+    def write(self, variable: int, block: ir.Block, value: ir.Value) -> None:
+        self.__definitions.setdefault(variable, {})[block] = value
+
+    def read(self, variable: int, block: ir.Block, value_type: ir.Type) -> ir.Value:
+        definitions = self.__definitions.setdefault(variable, {})
+
+        # phis still reading their predecessors' values, as
+        # (phi, predecessors, values read so far, blocks to define with the
+        # phi's final value), and the single predecessor blocks the current
+        # read has passed through
+        stack: list[tuple[ir.PhiInstr, list[ir.Block], list[ir.Value], list]] = []
+        path: list[ir.Block] = []
+
+        while True:
+            value = definitions.get(block)
+
+            if value is None and block not in self.__sealed:
+                value = self.__phi(block, value_type)
+                self.__incomplete.setdefault(block, {})[variable] = value
+                definitions[block] = value
+
+            elif value is None:
+                predecessors = self.__predecessors.get(block, [])
+                if len(predecessors) == 1:
+                    path.append(block)
+                    block = predecessors[0]
+                    continue
+
+                # defined before its operands are read, which ends loops
+                phi = self.__phi(block, value_type)
+                definitions[block] = phi
+                stack.append((phi, predecessors, [], path))
+                path = []
+
+            while stack:
+                phi, predecessors, values, phi_path = stack[-1]
+
+                if value is not None:
+                    for passed in path:
+                        definitions[passed] = value
+                    values.append(value)
+
+                if len(values) < len(predecessors):
+                    block = predecessors[len(values)]
+                    path = []
+                    break
+
+                stack.pop()
+                value = self.__add_operands(phi, predecessors, values)
+                definitions[phi.parent] = value
+                path = phi_path
+
+            else:
+                for passed in path:
+                    definitions[passed] = value
+                return self.__current(value)
+
+    def link(self, *blocks: ir.Block) -> None:
+        # records the edges out of terminated blocks, each block only once
+        for block in blocks:
+            if block in self.__linked or block.terminator is None:
+                continue
+
+            self.__linked.add(block)
+            for successor in successors(block):
+                self.__predecessors.setdefault(successor, []).append(block)
+
+    def seal(self, block: ir.Block) -> None:
+        # all predecessors of block are linked
+        self.__sealed.add(block)
+        predecessors = self.__predecessors.get(block, [])
+
+        for variable, phi in self.__incomplete.pop(block, {}).items():
+            values = [
+                self.read(variable, predecessor, phi.type)
+                for predecessor in predecessors
+            ]
+            self.__add_operands(phi, predecessors, values)
+
+    def finish(self, function: ir.Function) -> None:
+        # point the uses of removed phis at what replaced them
+        if not self.__replaced:
+            return
+
+        replaced = self.__replaced
+        for block in function.blocks:
+            for instruction in block.instructions:
+                if type(instruction) is ir.PhiInstr:
+                    instruction.incomings = [
+                        (self.__current(value), incoming)
+                        for value, incoming in instruction.incomings
+                    ]
+                    continue
+
+                for operand in instruction.operands:
+                    if type(operand) is ir.PhiInstr and operand in replaced:
+                        instruction.replace_usage(operand, self.__current(operand))
+
+    def __current(self, value: ir.Value) -> ir.Value:
+        while type(value) is ir.PhiInstr and value in self.__replaced:
+            value = self.__replaced[value]
+        return value
+
+    def __phi(self, block: ir.Block, value_type: ir.Type) -> ir.PhiInstr:
+        builder = self.__builder
+        current = builder.block
+
+        builder.position_at_start(block)
+        phi = builder.phi(value_type)
+        builder.position_at_end(current)
+
+        return phi
+
+    def __add_operands(
+        self, phi: ir.PhiInstr, predecessors: list[ir.Block], values: list[ir.Value]
+    ) -> ir.Value:
+        for value, predecessor in zip(values, predecessors):
+            value = self.__current(value)
+            phi.add_incoming(value, predecessor)
+
+            if type(value) is ir.PhiInstr:
+                self.__users.setdefault(value, []).append(phi)
+
+        return self.__remove_trivial(phi)
+
+    def __remove_trivial(self, phi: ir.PhiInstr) -> ir.Value:
+        # A phi whose operands are one value and itself is replaced by that
+        # value, which can make the phis using it trivial in turn.
+        worklist = [phi]
+
+        while worklist:
+            candidate = worklist.pop()
+            if candidate in self.__replaced:
+                continue
+
+            same = None
+            for value, _ in candidate.incomings:
+                value = self.__current(value)
+                if value is same or value is candidate:
+                    continue
+                if same is not None:
+                    break
+                same = value
+
+            else:
+                if same is None:
+                    # unreachable, or read before any write
+                    same = ir.Constant(candidate.type, ir.Undefined)
+
+                self.__replaced[candidate] = same
+
+                block = candidate.parent
+                block.instructions.remove(candidate)
+                if self.__builder.block is block:
+                    self.__builder.position_at_end(block)
+
+                users = self.__users.pop(candidate, [])
+                if type(same) is ir.PhiInstr:
+                    self.__users.setdefault(same, []).extend(users)
+                worklist.extend(users)
+
+        return self.__current(phi)
@@ -0,0 +1,15 @@
+import sys
+
+
+class SymbolTable:
+    # Hands out one canonical string object per name. Interned names are
+    # shared by every AST node and scope that mentions them, and dict probes
+    # with them short-circuit on identity. Names go through sys.intern,
+    # which forgets a name once nothing refers to it, so a long session that
+    # keeps parsing edited sources does not collect every name it has seen.
+    @staticmethod
+    def intern(name: str) -> str:
+        return sys.intern(name)
+
+
+SYMBOLS = SymbolTable()
@@ -1,5 +1,7 @@
 from enum import Enum
-from typing import Any
+from typing import Optional
+
+from _source import Source
 
 
 class TokenType(Enum):
@@ -33,6 +35,7 @@ class TokenType(Enum):
     COLON = "COLON"
     ARROW = "ARROW"
     COMMA = "COMMA"
+    HASH = "HASH"
 
     # KEYWORDS
     LET = "LET"
@@ -80,24 +83,56 @@ KEYWORDS: dict[str, TokenType] = {
 TYPE_KEYWORDS = ["int", "float", "bool"]
 
 
-def lookup_identifier(identifier: str):
-    token_type = KEYWORDS.get(identifier)
-    if token_type is not None:
-        return token_type
+# keywords and type names folded into one table, so classifying a word is a
+# single dict probe
+IDENTIFIER_TYPES: dict[str, TokenType] = {
+    **KEYWORDS,
+    **{type_keyword: TokenType.TYPE for type_keyword in TYPE_KEYWORDS},
+}
+
 
-    elif identifier in TYPE_KEYWORDS:
-        return TokenType.TYPE
+def lookup_identifier(identifier: str) -> TokenType:
+    return IDENTIFIER_TYPES.get(identifier, TokenType.IDENTIFIER)
 
-    return TokenType.IDENTIFIER
+
+TOKEN_TYPES: list[TokenType] = list(TokenType)
+
+TOKEN_TYPE_IDS: dict[TokenType, int] = {
+    token_type: token_id for token_id, token_type in enumerate(TOKEN_TYPES)
+}
+
+
+# (type, start, end, value) as produced by the lexer engines. Numeric tokens
+# carry their decoded value, every other token carries None.
+RawToken = tuple[TokenType, int, int, Optional[int | float]]
 
 
 class Token:
+    __slots__ = ("token_type", "start", "end", "source", "value")
+
     def __init__(
-        self, token_type: TokenType, token_literal: Any, token_position: tuple[int, int]
+        self,
+        token_type: TokenType,
+        start: int,
+        end: int,
+        source: Source,
+        value: Optional[int | float] = None,
     ) -> None:
         self.token_type = token_type
-        self.token_literal = token_literal
-        self.token_position = token_position
+        self.start = start
+        self.end = end
+        self.source = source
+        self.value = value
+
+    @property
+    def token_literal(self) -> str:
+        if self.token_type is TokenType.EOF:
+            return "EOF"
+        return self.source.slice(self.start, self.end)
+
+    @property
+    def token_position(self) -> tuple[int, int]:
+        return self.source.position(self.start)
 
     def __str__(self) -> str:
         return f"Token: {self.token_type}, Literal: {self.token_literal}, Position: {self.token_position}"
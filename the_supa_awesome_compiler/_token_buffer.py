@@ -0,0 +1,135 @@
+from array import array
+from typing import Callable, Iterable, Iterator, Optional
+
+from _source import Source
+from _token import TokenType, Token, RawToken, TOKEN_TYPES, TOKEN_TYPE_IDS
+
+
+# tokens whose literal is a name that later phases use as a dict key
+NAME_TOKENS = frozenset((TokenType.IDENTIFIER, TokenType.TYPE))
+NAME_TOKEN_IDS = frozenset(TOKEN_TYPE_IDS[token_type] for token_type in NAME_TOKENS)
+EOF_ID = TOKEN_TYPE_IDS[TokenType.EOF]
+
+
+class TokenBuffer:
+    # one column per token field instead of one Token object per token. The
+    # buffer always ends with an EOF token. Starts and ends are offsets in
+    # the whole program, which source may only hold a tail of.
+    def __init__(self, source: Source) -> None:
+        self.source = source
+
+        self.types = array("H")
+        self.starts = array("I")
+        self.ends = array("I")
+        # decoded INT/FLOAT values, None for every other token
+        self.values: list[Optional[int | float]] = []
+
+    @classmethod
+    def from_raw_tokens(
+        cls, source: Source, raw_tokens: Iterable[RawToken]
+    ) -> "TokenBuffer":
+        buffer = cls(source)
+        buffer.extend(raw_tokens)
+        buffer.append_eof()
+
+        return buffer
+
+    def extend(self, raw_tokens: Iterable[RawToken]) -> None:
+        append_type = self.types.append
+        append_start = self.starts.append
+        append_end = self.ends.append
+        append_value = self.values.append
+        type_ids = TOKEN_TYPE_IDS
+
+        for token_type, start, end, value in raw_tokens:
+            append_type(type_ids[token_type])
+            append_start(start)
+            append_end(end)
+            append_value(value)
+
+    def append_eof(self) -> None:
+        end = self.source.offset + len(self.source)
+
+        self.types.append(EOF_ID)
+        self.starts.append(end)
+        self.ends.append(end)
+        self.values.append(None)
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    def __iter__(self) -> Iterator[Token]:
+        for index in range(len(self.types)):
+            yield self.token(index)
+
+    def token_type(self, index: int) -> TokenType:
+        return TOKEN_TYPES[self.types[index]]
+
+    def literal(self, index: int) -> str:
+        if self.types[index] == EOF_ID:
+            return "EOF"
+
+        # the source may start part way into a streamed program
+        source = self.source
+        offset = source.offset
+        return source.text[self.starts[index] - offset : self.ends[index] - offset]
+
+    def position(self, index: int) -> tuple[int, int]:
+        return self.source.position(self.starts[index])
+
+    def token(self, index: int) -> Token:
+        return Token(
+            TOKEN_TYPES[self.types[index]],
+            self.starts[index],
+            self.ends[index],
+            self.source,
+            self.values[index],
+        )
+
+
+class TokenWindow(TokenBuffer):
+    # The part of a token stream a parser is working on. Tokens are read
+    # from next_token as the parser reaches them and dropped once it is past
+    # them, so a streamed program is never held in full. The window keeps
+    # each Token as well, for its literal, as there is no one source text.
+    def __init__(self, next_token: Callable[[], Token]) -> None:
+        super().__init__(Source(""))
+        self.next_token = next_token
+        self.tokens: list[Token] = []
+        self.exhausted = False
+
+    def fill(self, count: int) -> None:
+        # reads up to count more tokens, the last of them EOF at the end
+        next_token = self.next_token
+        append_token = self.tokens.append
+        type_ids = TOKEN_TYPE_IDS
+
+        for _ in range(count):
+            token = next_token()
+
+            append_token(token)
+            self.types.append(type_ids[token.token_type])
+            self.starts.append(token.start)
+            self.ends.append(token.end)
+            self.values.append(token.value)
+
+            if token.token_type is TokenType.EOF:
+                self.exhausted = True
+                return
+
+    def drop(self, count: int) -> None:
+        # forgets the first count tokens; the indices of the rest move down
+        del self.tokens[:count]
+        del self.types[:count]
+        del self.starts[:count]
+        del self.ends[:count]
+        del self.values[:count]
+
+    def literal(self, index: int) -> str:
+        return self.tokens[index].token_literal
+
+    def position(self, index: int) -> tuple[int, int]:
+        return self.tokens[index].token_position
+
+    def token(self, index: int) -> Token:
+        return self.tokens[index]
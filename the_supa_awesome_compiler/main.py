@@ -1,34 +1,57 @@
-import json
+import sys
 
-from _lexer import Lexer
+from _lexer import Lexer, LexerEngine
+from _token import TokenType
 from _parser import Parser
 from _compiler import Compiler
+from _llvm_pipeline import OptimizationLevel, Pipeline, SizeLevel
 
 from llvmlite import ir
 import llvmlite.binding as llvm
 from ctypes import CFUNCTYPE, c_int
+from typing import Optional
 
 LEXER_DEBUG: bool = False
 COMPILER_DEBUG: bool = False
 RUN_PARSER: bool = True
 RUN_COMPILER: bool = True
 RUN_CODE: bool = True
+AST_JSON: bool = False
+AST_BINARY: bool = False
+LEXER_ENGINE: LexerEngine = LexerEngine.SCANNER
 
-if __name__ == "__main__":
-    with open("../tests/func.marsh", "r") as f:
-        source_code = [line for line in f.readlines()]
+# build SSA form with phis directly instead of allocas for mem2reg
+SSA_CODEGEN: bool = False
+
+OPT_LEVEL: OptimizationLevel = OptimizationLevel.O2
+SIZE_LEVEL: SizeLevel = SizeLevel.SPEED
+# run exactly these passes instead, e.g. ["sroa", "instruction_combining", "gvn"]
+CUSTOM_PASSES: Optional[list[str]] = None
+TIME_PASSES: bool = False
+# also compile ahead of time into this object file
+OBJECT_PATH: Optional[str] = None
+
+SOURCE_PATH: str = "../tests/func.marsh"
 
+if __name__ == "__main__":
     if LEXER_DEBUG:
         print("======DEBUG LEXER======")
-        debug_lexer = Lexer(source_code)
-        while debug_lexer.current_char is not None:
-            print(debug_lexer.next_token())
+        debug_lexer = Lexer.from_path(SOURCE_PATH, engine=LEXER_ENGINE)
+        while (token := debug_lexer.next_token()).token_type is not TokenType.EOF:
+            print(token)
     if RUN_PARSER:
-        parser = Parser(Lexer(source_code))
+        parser = Parser(Lexer.from_path(SOURCE_PATH, engine=LEXER_ENGINE))
         program = parser.parse_program()
-        print(program.json_repr())
-        with open("../debug/ast.json", "w") as f:
-            json.dump(program.json_repr(), f, indent=4)
+
+        if AST_BINARY:
+            with open("../debug/ast.bin", "wb") as f:
+                program.dump(f)
+
+        if AST_JSON:
+            program.write_json(sys.stdout)
+            print()
+            with open("../debug/ast.json", "w") as f:
+                program.write_json(f, indent=4)
 
     if COMPILER_DEBUG:
         if len(parser.errors):
@@ -38,7 +61,7 @@ if __name__ == "__main__":
             exit(1)
 
     if RUN_COMPILER:
-        compiler = Compiler()
+        compiler = Compiler(ssa=SSA_CODEGEN)
 
         # try:
         compiler.compile(program)
@@ -55,7 +78,7 @@ if __name__ == "__main__":
 
         print("Compilation complete! IR written to ir.ll")
 
-    if RUN_CODE:
+    if RUN_CODE or OBJECT_PATH:
         llvm.initialize()
         llvm.initialize_native_target()
         llvm.initialize_all_asmprinters()
@@ -65,9 +88,22 @@ if __name__ == "__main__":
         except Exception as e:
             print(e)
 
-        target_machine = llvm.Target.from_default_triple().create_target_machine()
+        pipeline = Pipeline(OPT_LEVEL, SIZE_LEVEL, CUSTOM_PASSES, TIME_PASSES)
+        timings = pipeline.run(llvm_ir_parsed, pipeline.target_machine())
+        if timings:
+            print(timings)
+
+        with open("../debug/ir_opt.ll", "w") as f:
+            f.write(str(llvm_ir_parsed))
+
+    if OBJECT_PATH:
+        with open(OBJECT_PATH, "wb") as f:
+            f.write(pipeline.target_machine().emit_object(llvm_ir_parsed))
 
-        engine = llvm.create_mcjit_compiler(llvm_ir_parsed, target_machine)
+        print(f"Object file written to {OBJECT_PATH}")
+
+    if RUN_CODE:
+        engine = llvm.create_mcjit_compiler(llvm_ir_parsed, pipeline.target_machine())
         engine.finalize_object()
 
         entry = engine.get_function_address("main")
@@ -1,6 +1,12 @@
-import json
+import os
+import sys
+
 from graphviz import Digraph
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from _AST import Program  # noqa: E402
+
 
 class ASTVisualizer:
     def __init__(self):
@@ -44,8 +50,8 @@ class ASTVisualizer:
         self.graph.render(filename, view=True)
 
 
-with open("../../debug/ast.json") as f:
-    ast_json = json.load(f)
+with open("../../debug/ast.bin", "rb") as f:
+    ast_json = Program.load(f).json_repr()
 
 visualizer = ASTVisualizer()
 visualizer.draw_ast(ast_json)